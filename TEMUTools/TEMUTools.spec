@@ -1,12 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
+import sys
 
+# 标签页模块由main.py在第一次选中时按名称导入，PyInstaller分析不到，
+# 隐藏导入列表与 build.py 共用同一份 TAB_MODULES
+sys.path.insert(0, SPECPATH)
+from build import TAB_MODULES
 
 a = Analysis(
-    ['src\\main.py'],
+    ['src/main.py'],
     pathex=[],
     binaries=[],
     datas=[('assets', 'assets'), ('src/config', 'config')],
-    hiddenimports=['PIL._tkinter_finder'],
+    hiddenimports=['PIL._tkinter_finder'] + TAB_MODULES,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -32,7 +37,7 @@ exe = EXE(
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
-    icon=['assets\\icon.ico'],
+    icon=['assets/icon.ico'],
 )
 coll = COLLECT(
     exe,
@@ -0,0 +1,222 @@
+"""
+商品列表Excel导出基准测试
+对比旧的逐单元格设置样式的普通Workbook导出和新的只写模式流式导出，
+以及依次导出三种模板和一键导出（一次展平后依次写入），
+并对比一键导出改为多线程、多进程并行写入各个文件的效果：
+每种方式在独立子进程中运行，输出每秒写入行数和进程峰值内存
+
+用法: python benchmarks/bench_excel_export.py [SKU行数，默认50000]
+"""
+
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+SKUS_PER_PRODUCT = 5
+
+
+def make_products(sku_rows: int):
+    """生成与pageQuery返回结构一致的模拟商品数据"""
+    products = []
+    for i in range((sku_rows + SKUS_PER_PRODUCT - 1) // SKUS_PER_PRODUCT):
+        products.append({
+            'productId': 600000000 + i,
+            'productName': f'测试商品 {i} 纯棉短袖T恤 夏季新款',
+            'productType': 1,
+            'sourceType': 0,
+            'goodsId': 700000000 + i,
+            'mainImageUrl': f'https://img.example.com/main/{i}.jpg',
+            'createdAt': 1700000000000 + i * 1000,
+            'leafCat': {'catId': 30000 + i % 50, 'catName': '短袖T恤'},
+            'productSkuSummaries': [{
+                'productSkuId': 800000000 + i * SKUS_PER_PRODUCT + j,
+                'extCode': f'SKU-{i}-{j}',
+                'supplierPrice': 1999 + j * 100,
+                'thumbUrl': f'https://img.example.com/sku/{i}/{j}.jpg',
+                'productSkuSpecList': [
+                    {'parentSpecName': '颜色', 'specName': '黑色'},
+                    {'parentSpecName': '尺码', 'specName': ['S', 'M', 'L', 'XL', 'XXL'][j % 5]}
+                ]
+            } for j in range(SKUS_PER_PRODUCT)]
+        })
+    return products
+
+
+def legacy_export(products, file_path):
+    """旧实现：普通Workbook，每个单元格单独设置样式并新建Alignment对象"""
+    from datetime import datetime
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
+    from modules.config.config import category_config
+    from modules.product_list.excel_exporter import PRODUCT_LIST_COLUMNS
+
+    excel_data = []
+    for product in products:
+        base_info = {
+            '商品ID': product['productId'],
+            '商品名称': product['productName'],
+            '商品类型': product['productType'],
+            '来源类型': product['sourceType'],
+            '商品编码': product['goodsId'],
+            '主图URL': product['mainImageUrl'],
+            '创建时间': datetime.fromtimestamp(product['createdAt']/1000).strftime('%Y-%m-%d %H:%M:%S'),
+            '类目ID': product['leafCat']['catId'],
+            '类目名称': product['leafCat']['catName']
+        }
+        for sku in product['productSkuSummaries']:
+            sku_info = base_info.copy()
+            supplier_price = sku['supplierPrice'] / 100
+            cat_id = product.get("leafCat", {}).get("catId")
+            price_threshold = category_config.get_price_threshold_by_category_id(cat_id)
+            price_difference = supplier_price - price_threshold if price_threshold not in (None, 0) else None
+            sku_info.update({
+                'SKU ID': sku['productSkuId'],
+                'SKU编码': sku['extCode'],
+                '供应商价格': supplier_price,
+                '底线价格': price_threshold,
+                '价格差额': price_difference,
+                'SKU图片': sku['thumbUrl']
+            })
+            for spec in sku['productSkuSpecList']:
+                sku_info[f'{spec["parentSpecName"]}'] = spec['specName']
+            excel_data.append(sku_info)
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "商品列表"
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                    top=Side(style='thin'), bottom=Side(style='thin'))
+    for col, header in enumerate(PRODUCT_LIST_COLUMNS, 1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cell.border = border
+        ws.column_dimensions[get_column_letter(col)].width = 20
+    for row, data in enumerate(excel_data, 2):
+        for col, header in enumerate(PRODUCT_LIST_COLUMNS, 1):
+            cell = ws.cell(row=row, column=col, value=data.get(header, ''))
+            cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+            cell.border = border
+    wb.save(file_path)
+    return len(excel_data)
+
+
+def streaming_export(products, file_path):
+    """新实现：只写模式 + 命名样式，行数据由生成器产出"""
+    from modules.product_list.excel_exporter import export_product_list
+    return export_product_list(products, file_path)
+
+
+def sequential_templates(products, file_path):
+    """依次单独导出三种模板，每个导出各自遍历一遍商品数据"""
+    from modules.product_list import excel_exporter
+    save_dir = os.path.dirname(file_path)
+    rows = excel_exporter.export_product_list(products, os.path.join(save_dir, 'list.xlsx'))
+    excel_exporter.export_product_code_template(products, os.path.join(save_dir, 'code.xlsx'))
+    sku_ids = list(excel_exporter.iter_sku_ids(products))
+    step = excel_exporter.MAX_INVENTORY_ROWS_PER_FILE
+    for i in range(0, len(sku_ids), step):
+        excel_exporter.export_inventory_template(sku_ids[i:i + step], os.path.join(save_dir, f'inventory-{i}.xlsx'))
+    return rows
+
+
+def all_templates(products, file_path):
+    """一键导出三种模板"""
+    from modules.product_list.excel_exporter import export_all_templates
+    export_all_templates(products, os.path.dirname(file_path), 'bench')
+    return sum(len(p['productSkuSummaries']) for p in products)
+
+
+def _write_job(kind, file_path, columns):
+    from modules.product_list import excel_exporter
+    if kind == 'list':
+        return excel_exporter.write_sheet(file_path, '商品列表', excel_exporter.PRODUCT_LIST_COLUMNS,
+                                          zip(*columns), wrap_text=True)
+    if kind == 'code':
+        return excel_exporter.write_sheet(file_path, '商品码模板', excel_exporter.PRODUCT_CODE_COLUMNS, zip(*columns))
+    return excel_exporter.export_inventory_template(columns[0], file_path)
+
+
+def _parallel_templates(executor_class, products, file_path):
+    """一次展平后，每个文件作为一个任务并行写入"""
+    from modules.product_list.excel_exporter import MAX_INVENTORY_ROWS_PER_FILE, ProductRows
+    save_dir = os.path.dirname(file_path)
+    rows = ProductRows.from_products(products)
+    jobs = [('list', os.path.join(save_dir, 'list.xlsx'), rows.list_columns),
+            ('code', os.path.join(save_dir, 'code.xlsx'), rows.code_columns)]
+    sku_ids = rows.sku_ids
+    for i in range(0, len(sku_ids), MAX_INVENTORY_ROWS_PER_FILE):
+        jobs.append(('inventory', os.path.join(save_dir, f'inventory-{i}.xlsx'),
+                     [sku_ids[i:i + MAX_INVENTORY_ROWS_PER_FILE]]))
+    with executor_class(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+        for future in [executor.submit(_write_job, *job) for job in jobs]:
+            future.result()
+    return len(rows)
+
+
+def thread_templates(products, file_path):
+    """一键导出，多线程并行写入各个文件"""
+    return _parallel_templates(ThreadPoolExecutor, products, file_path)
+
+
+def process_templates(products, file_path):
+    """一键导出，多进程并行写入各个文件（列数据需要序列化传给子进程）"""
+    return _parallel_templates(ProcessPoolExecutor, products, file_path)
+
+
+EXPORTS = {
+    'legacy': legacy_export,
+    'streaming': streaming_export,
+    'seq-all': sequential_templates,
+    'all': all_templates,
+    'threads': thread_templates,
+    'processes': process_templates
+}
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值内存（MB），不支持的平台返回-1"""
+    try:
+        import resource
+    except ImportError:
+        return -1.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位是KB，macOS是字节
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_one(mode: str, sku_rows: int):
+    products = make_products(sku_rows)
+    export = EXPORTS[mode]
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, f'{mode}.xlsx')
+        start = time.perf_counter()
+        rows = export(products, file_path)
+        elapsed = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)) / (1024 * 1024)
+    print(f"{mode:<10}{rows:>10}{elapsed:>10.2f}{rows / elapsed:>12.0f}{peak_rss_mb():>14.1f}{size_mb:>10.1f}")
+
+
+def main():
+    sku_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"{'模式':<8}{'行数':>8}{'耗时(秒)':>8}{'行/秒':>9}{'峰值内存(MB)':>8}{'文件(MB)':>6}")
+    for mode in EXPORTS:
+        # 每种方式在独立进程中运行，峰值内存互不影响
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--run', mode, str(sku_rows)], check=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        run_one(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
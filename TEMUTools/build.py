@@ -3,6 +3,23 @@ import sys
 import shutil
 import subprocess
 
+# 与 src/main.py 中 TABS 的模块保持一致，TEMUTools.spec 从这里读取隐藏导入
+TAB_MODULES = [
+    "modules.compliance_uploader.gui",
+    "modules.product_list.gui",
+    "modules.real_picture_uploader.gui",
+    "modules.jit_open.gui",
+    "modules.stock_setter.gui",
+    "modules.price_review.gui",
+    "modules.confirm_upload.gui",
+    "modules.cert_checker.gui",
+    "modules.manual_checker.gui",
+    "modules.bid_management.gui",
+    "modules.violation_list.gui",
+    "modules.category_manager.gui",
+    "modules.system_config.gui",
+]
+
 def build_executable():
     """打包可执行文件"""
     print("开始打包...")
@@ -36,26 +53,13 @@ def build_executable():
     safe_remove_tree("build")
     safe_remove_tree("dist")
     
-    if os.path.exists("TEMUTools.spec"):
-        try:
-            os.remove("TEMUTools.spec")
-            print("已清理spec文件")
-        except Exception as e:
-            print(f"清理spec文件时出错: {e}")
-    
-    # 创建打包命令
-    sep = ';' if sys.platform.startswith('win') else ':'
+    # 打包选项（窗口模式、图标、资源文件、隐藏导入）都在 TEMUTools.spec 中，
+    # 直接使用spec打包，不再由命令行参数重新生成spec
     cmd = [
         "pyinstaller",
-        "--name=TEMUTools",
-        "--windowed",  # 不显示控制台窗口
-        "--icon=assets/icon.ico",  # 应用图标
-        f"--add-data=assets{sep}assets",  # 添加资源文件
-        f"--add-data=src/config{sep}config",  # 添加配置文件目录
-        "--hidden-import=PIL._tkinter_finder",  # 添加隐藏导入
         "--noconfirm",  # 不询问确认
         "--clean",  # 清理临时文件
-        "src/main.py"  # 主程序入口
+        "TEMUTools.spec"
     ]
     
     # 执行打包命令
@@ -0,0 +1,149 @@
+"""
+测试共用的fixture：各模块都使用独立的实例（不是全局单例），数据库和日志文件放在 tmp_path 下，
+测试不会读写 src/cache、src/logs 和真实配置
+"""
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from src.modules.bid_management.crawler import BidManagementCrawler
+from src.modules.bid_management.history import BidHistory
+from src.modules.catalogue.client import CatalogueClient
+from src.modules.config.store import ConfigStore
+from src.modules.jobs import JobJournal
+from src.modules.network.concurrency import ConcurrencyController
+from src.modules.network.engine import AsyncHttpEngine
+from src.modules.network.rate_limiter import RateLimiter
+from src.modules.network.replay import DEFAULT_REPLAY_CONFIG, ReplayServer
+from src.modules.network.request_log import RequestLog
+from src.modules.network.response_cache import ResponseCache
+from src.modules.network.retry import RetryPolicy
+from src.modules.price_review.crawler import PriceReviewCrawler
+
+
+class FakeSystemConfig:
+    """
+    代替SystemConfig：get_<name>_config() 返回 sections[name]（默认空字典，即使用模块的默认配置），
+    get_auth_snapshot() 返回固定的店铺，不读写 system_config.json
+    """
+
+    def __init__(self):
+        self.sections = {}
+        self.mallid = "mall-1"
+
+    def get_auth_snapshot(self):
+        return 1, "", self.mallid
+
+    def __getattr__(self, name):
+        if name.startswith("get_") and name.endswith("_config"):
+            section = name[len("get_"):-len("_config")]
+            return lambda: self.sections.get(section, {})
+        raise AttributeError(name)
+
+
+@pytest.fixture
+def system_config():
+    return FakeSystemConfig()
+
+
+@pytest.fixture
+def job_journal(tmp_path, system_config):
+    """使用临时数据库的独立任务日志"""
+    return JobJournal(db_path=str(tmp_path / "jobs.db"), system_config=system_config)
+
+
+@pytest.fixture
+def price_review_crawler(request_stub, job_journal):
+    """核价爬虫，请求替身不会发出真实请求，任务日志写到临时数据库"""
+    return PriceReviewCrawler("", logging.getLogger("test"), request=request_stub, journal=job_journal)
+
+
+@pytest.fixture
+def bid_history(tmp_path, system_config):
+    """使用临时数据库的独立竞价历史"""
+    return BidHistory(db_path=str(tmp_path / "bid_history.db"), system_config=system_config)
+
+
+@pytest.fixture
+def bid_crawler(request_stub, job_journal, bid_history):
+    """竞价爬虫，请求替身不会发出真实请求，任务日志和竞价历史写到临时数据库"""
+    return BidManagementCrawler(logging.getLogger("test"), request=request_stub, journal=job_journal,
+                                history=bid_history)
+
+
+@pytest.fixture
+def catalogue_client(tmp_path, system_config, request_stub):
+    """使用临时数据库的独立商品目录客户端"""
+    return CatalogueClient(db_path=str(tmp_path / "catalogue.db"), system_config=system_config, request=request_stub)
+
+
+@pytest.fixture
+def rate_limiter():
+    """独立的限流器，各测试用 reload() 设置限速规则"""
+    return RateLimiter(config={})
+
+
+# 并发控制测试的基准配置，用例通过 concurrency_controller(**overrides) 覆盖个别项
+CONCURRENCY_CONFIG = {"initial": 4, "min": 1, "max": 6, "window": 10, "p95_latency_threshold": 1.0,
+                      "error_rate_threshold": 0.1, "decrease_factor": 0.5, "cooldown": 5.0}
+
+
+@pytest.fixture
+def concurrency_controller():
+    """创建独立并发控制器的工厂，不影响网络层正在使用的并发上限"""
+    return lambda **overrides: ConcurrencyController(config=dict(CONCURRENCY_CONFIG, **overrides))
+
+
+@pytest.fixture
+def request_stub():
+    """代替NetworkRequest：分页等模块只用到请求实例的异步引擎和日志，不会发出真实请求"""
+    return SimpleNamespace(engine=AsyncHttpEngine(), logger=logging.getLogger("test"))
+
+
+@pytest.fixture
+def retry_policy():
+    """独立的重试策略，各测试用 reload() 设置重试规则"""
+    return RetryPolicy(config={})
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    """使用临时数据库的独立响应缓存"""
+    return ResponseCache(db_path=str(tmp_path / "responses.db"), config={})
+
+
+@pytest.fixture
+def request_log(tmp_path):
+    """请求日志写到临时目录的独立实例"""
+    return RequestLog(log_dir=str(tmp_path / "logs"), config={})
+
+
+@pytest.fixture
+def config_store():
+    """独立的配置存储，快速轮询文件变化，测试结束时停止监视线程"""
+    store = ConfigStore(poll_interval=0.01)
+    yield store
+    store.close(timeout=5)
+
+
+@pytest.fixture
+def replay_server():
+    """
+    创建回放桩服务的工厂：replay_server(entries, start=False, **config)，
+    start=True 时在后台线程中开始服务；测试结束时关闭所有桩服务
+    """
+    servers = []
+
+    def create(entries, start=False, **config):
+        server = ReplayServer(entries, dict(DEFAULT_REPLAY_CONFIG, **config))
+        if start:
+            server.start()
+        servers.append((server, start))
+        return server
+
+    yield create
+    for server, started in servers:
+        if started:
+            server.shutdown()
+        server.server_close()
@@ -1,27 +1,78 @@
+import time
+
+# 尽早记录启动时间，启动耗时统计从这里开始计算
+_PROCESS_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 import re
+import importlib
 from collections import defaultdict
-from modules.product_list.gui import ProductListTab
-from modules.link_checker.gui import LinkCheckerTab
-from modules.violation_list.gui import ViolationListTab
-from modules.system_config.gui import SystemConfigTab
 from modules.logger.gui import LogFrame
 from modules.logger.logger import Logger
-from modules.price_review.gui import PriceReviewTab
-from modules.jit_open.gui import JitOpenTab
-from modules.confirm_upload.gui import ConfirmUploadTab
-from modules.compliance_uploader.gui import ComplianceUploaderTab
-from modules.jit_sign.gui import JitSignTab
-from modules.real_picture_uploader.gui import RealPictureUploaderTab
-from modules.stock_setter.gui import StockSetterTab
-from modules.jit_sign_bak.gui import JitSignTab as JitSignTabBak
-from modules.bid_management.gui import BidManagementTab
-from modules.category_manager.gui import CategoryManagerTab
-from modules.cert_checker.gui import CertCheckerGUI
-from modules.manual_checker.gui import ManualCheckerGUI
-from modules.system_config.websocket_cookie import start_websocket_server
+from modules.logger.startup_profile import StartupProfile
+
+# 各标签页: (属性名, 标题, 模块, 类名)
+# 标签页在第一次被选中时才导入模块并构建，没用到的模块（以及openpyxl、网络库等依赖）不会在启动时加载；
+# 模块为None表示本文件中定义的类
+TABS = [
+    ("compliance_tab", "合规批量上传", "modules.compliance_uploader.gui", "ComplianceUploaderTab"),
+    ("product_list_tab", "商品码、库存", "modules.product_list.gui", "ProductListTab"),
+    ("real_picture_tab", "上传实拍图", "modules.real_picture_uploader.gui", "RealPictureUploaderTab"),
+    ("jit_open_tab", "JIT开通", "modules.jit_open.gui", "JitOpenTab"),
+    # ("jit_sign_tab", "JIT签署", "modules.jit_sign.gui", "JitSignTab"),
+    ("stock_setter_tab", "批量设置库存", "modules.stock_setter.gui", "StockSetterTab"),
+    ("price_review_tab", "核价管理", "modules.price_review.gui", "PriceReviewTab"),
+    ("confirm_upload_tab", "确认上新", "modules.confirm_upload.gui", "ConfirmUploadTab"),
+    # 资质排查
+    ("cert_checker_tab", "资质排查", "modules.cert_checker.gui", "CertCheckerGUI"),
+    # 说明书排查
+    ("manual_checker_tab", "说明书排查", "modules.manual_checker.gui", "ManualCheckerGUI"),
+    ("bid_management_tab", "竞价管理", "modules.bid_management.gui", "BidManagementTab"),
+    ("link_checker_tab", "链接检查", None, "LinkCheckerTab"),
+    ("violation_list_tab", "违规列表", "modules.violation_list.gui", "ViolationListTab"),
+    # 签署JIT(废弃)
+    # ("jit_sign_tab_bak", "JIT签署(废弃)", "modules.jit_sign_bak.gui", "JitSignTab"),
+    # 品类配置管理
+    ("category_manager_tab", "品类配置", "modules.category_manager.gui", "CategoryManagerTab"),
+    ("system_config_tab", "系统配置", "modules.system_config.gui", "SystemConfigTab"),
+]
+
+
+class LazyTab(ttk.Frame):
+    """
+    标签页占位框架，第一次被选中时才构建真正的标签页
+
+    资质排查、说明书排查的界面类会调用 parent.add(frame, text=...) 把自己加到Notebook上，
+    这里提供同名的add方法，把它们放进占位框架中
+    """
+
+    def __init__(self, parent, module_name, class_name):
+        super().__init__(parent)
+        self.module_name = module_name
+        self.class_name = class_name
+        self.content = None
+        self._loading_label = ttk.Label(self, text="正在加载...")
+        self._loading_label.pack(pady=20)
+
+    def add(self, widget, **kwargs):
+        widget.pack(expand=True, fill='both')
+
+    def build(self):
+        """导入模块并构建标签页，返回标签页实例"""
+        if self.module_name is None:
+            tab_class = globals()[self.class_name]
+        else:
+            tab_class = getattr(importlib.import_module(self.module_name), self.class_name)
+        content = tab_class(self)
+        # ttk.Frame子类需要自己放进占位框架；调用了add()的界面类已经放好了
+        if isinstance(content, tk.Widget) and not content.winfo_manager():
+            content.pack(expand=True, fill='both')
+        self._loading_label.destroy()
+        self.content = content
+        return content
+
 
 class LinkCheckerTab(ttk.Frame):
     def __init__(self, parent):
@@ -279,64 +330,22 @@ def should_skip_file(filename):
 class TEMUToolsApp:
     """TEMU工具集主程序"""
     
-    def __init__(self, root):
+    def __init__(self, root, profile=None):
         self.root = root
         self.root.title("TEMU工具集 V1.6.0")
         self.logger = Logger()
+        self.profile = profile or StartupProfile()
         
-        # 创建标签页
+        # 创建标签页（只创建占位框架，第一次选中时才构建）
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(expand=True, fill='both', padx=5, pady=5)
         
-        self.compliance_tab = ComplianceUploaderTab(self.notebook)
-        self.notebook.add(self.compliance_tab, text="合规批量上传")
-
-        self.product_list_tab = ProductListTab(self.notebook)
-        self.notebook.add(self.product_list_tab, text="商品码、库存")
-
-        self.real_picture_tab = RealPictureUploaderTab(self.notebook)
-        self.notebook.add(self.real_picture_tab, text="上传实拍图")
-        
-        self.jit_open_tab = JitOpenTab(self.notebook)
-        self.notebook.add(self.jit_open_tab, text="JIT开通")
-
-        # self.jit_sign_tab = JitSignTab(self.notebook)
-        # self.notebook.add(self.jit_sign_tab, text="JIT签署")
-
-        self.stock_setter_tab = StockSetterTab(self.notebook)
-        self.notebook.add(self.stock_setter_tab, text="批量设置库存")
-
-        self.price_review_tab = PriceReviewTab(self.notebook)
-        self.notebook.add(self.price_review_tab, text="核价管理")
-
-        self.confirm_upload_tab = ConfirmUploadTab(self.notebook)
-        self.notebook.add(self.confirm_upload_tab, text="确认上新")
-
-        # 资质排查
-        self.cert_checker_tab = CertCheckerGUI(self.notebook)
-
-        # 说明书排查
-        self.manual_checker_tab = ManualCheckerGUI(self.notebook)
-
-        self.bid_management_tab = BidManagementTab(self.notebook)
-        self.notebook.add(self.bid_management_tab, text="竞价管理")
-        
-        self.link_checker_tab = LinkCheckerTab(self.notebook)
-        self.notebook.add(self.link_checker_tab, text="链接检查")
-
-        self.violation_list_tab = ViolationListTab(self.notebook)
-        self.notebook.add(self.violation_list_tab, text="违规列表")
-
-        # 签署JIT(废弃)
-        # self.jit_sign_tab_bak = JitSignTabBak(self.notebook)
-        # self.notebook.add(self.jit_sign_tab_bak, text="JIT签署(废弃)")
-        
-        # 品类配置管理
-        self.category_manager_tab = CategoryManagerTab(self.notebook)
-        self.notebook.add(self.category_manager_tab, text="品类配置")
-        
-        self.system_config_tab = SystemConfigTab(self.notebook)
-        self.notebook.add(self.system_config_tab, text="系统配置")
+        self.lazy_tabs = {}
+        for attr, title, module_name, class_name in TABS:
+            placeholder = LazyTab(self.notebook, module_name, class_name)
+            self.notebook.add(placeholder, text=title)
+            self.lazy_tabs[str(placeholder)] = (attr, title, placeholder)
+            setattr(self, attr, None)
         
         # 添加日志框架
         self.log_frame = LogFrame(root)
@@ -344,20 +353,47 @@ class TEMUToolsApp:
         
         # 设置窗口大小和位置
         self.setup_window()
+        self.profile.mark("构建窗口")
         
-        # 在后台线程中启动WebSocket服务器，不阻塞主线程
-        import threading
-        threading.Thread(target=self._start_websocket_server_background, daemon=True).start()
+        # 首次绘制完成后再构建当前标签页、启动WebSocket服务器
+        self.root.after_idle(self._after_first_paint)
         
         # 记录启动日志
         self.logger.info("TEMU工具集已启动")
     
+    def _on_tab_changed(self, event=None):
+        """切换到还没构建的标签页时构建它"""
+        selected = self.notebook.select()
+        entry = self.lazy_tabs.get(selected)
+        if entry is None:
+            return
+        attr, title, placeholder = entry
+        if placeholder.content is not None:
+            return
+        try:
+            with self.profile.measure(title):
+                setattr(self, attr, placeholder.build())
+            self.logger.info(f"标签页 {title} 已加载，耗时 {self.profile.durations[title] * 1000:.0f}ms")
+        except Exception as e:
+            self.logger.error(f"加载标签页 {title} 失败: {str(e)}")
+    
+    def _after_first_paint(self):
+        """窗口第一次绘制后执行：记录耗时，构建当前标签页，启动后台服务"""
+        self.root.update_idletasks()
+        self.profile.mark("首次绘制")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._on_tab_changed()
+        self.profile.mark("首个标签页")
+        self.logger.info(self.profile.report())
+        
+        # 在后台线程中启动WebSocket服务器，不阻塞主线程
+        import threading
+        threading.Thread(target=self._start_websocket_server_background, daemon=True).start()
+    
     def _start_websocket_server_background(self):
         """在后台线程中启动WebSocket服务器"""
-        import time
-        # 稍微延迟一下，确保GUI完全初始化
-        time.sleep(0.5)
         try:
+            from modules.system_config.websocket_cookie import start_websocket_server
             start_websocket_server()
             # 注意：这里不能直接调用self.logger，因为这是在后台线程中
             print("✅ WebSocket服务器启动请求已发送 (ws://localhost:8765)")
@@ -385,9 +421,21 @@ class TEMUToolsApp:
         self.root.minsize(800, 600)
 
 def main():
+    profile = StartupProfile(_PROCESS_START)
+    profile.mark("导入")
     root = tk.Tk()
-    app = TEMUToolsApp(root)
+    app = TEMUToolsApp(root, profile)
     root.mainloop()
+    
+    # 退出时记录响应缓存的效果
+    from modules.network.response_cache import ResponseCache
+    stats = ResponseCache().get_stats()
+    app.logger.info(f"响应缓存统计: 命中 {stats['hit']} 次, 未命中 {stats['miss']} 次, "
+                    f"304续期 {stats['revalidated']} 次, 共节省请求耗时 {stats['saved_seconds']:.2f} 秒")
+
+    # 停止配置文件的监视线程
+    from modules.config.store import ConfigStore
+    ConfigStore().close(timeout=1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
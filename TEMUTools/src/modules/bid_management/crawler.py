@@ -2,13 +2,17 @@
 竞价管理核心业务逻辑
 """
 import json
-import time
-import random
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
 from typing import List, Dict, Optional, Any, Tuple
 from decimal import Decimal, ROUND_DOWN
 from ..network.request import NetworkRequest
+from ..network.paginator import fetch_pages, dedupe_items, page_count
 from ..config.config import category_config, bid_config
+from ..jobs import Job, JobJournal
+from .history import BidHistory
 from .models import (
     BidOrderListResponse, BidOrderItem, BidDetailResponse, 
     BidResult, AdjustItem, AdjustSku, PriceAdjustRequest,
@@ -20,10 +24,14 @@ from .models import (
 class BidManagementCrawler:
     """竞价管理爬虫类"""
     
-    def __init__(self, logger: logging.Logger = None, progress_callback=None):
+    def __init__(self, logger: logging.Logger = None, progress_callback=None, stop_flag_callback=None,
+                 request: Optional[NetworkRequest] = None, journal: Optional[JobJournal] = None,
+                 history: Optional[BidHistory] = None):
         self.logger = logger or logging.getLogger(__name__)
         self.progress_callback = progress_callback
-        self.request = NetworkRequest()
+        self.stop_flag_callback = stop_flag_callback or (lambda: False)
+        # 网络请求、任务日志和竞价历史在测试时可以传入替身
+        self.request = request or NetworkRequest()
         self.base_url = "https://agentseller.temu.com/api/kiana"
         
         # API端点
@@ -37,19 +45,13 @@ class BidManagementCrawler:
         self.max_page_size = bid_config.get_max_page_size()
         self.enable_price_threshold_check = bid_config.is_price_threshold_check_enabled()
         
-        # 获取随机延时配置
-        self.delay_min, self.delay_max = bid_config.get_random_delay_range()
-        
-    def random_delay(self, min_sec: float = None, max_sec: float = None):
-        """随机延时"""
-        if min_sec is None:
-            min_sec = self.delay_min
-        if max_sec is None:
-            max_sec = self.delay_max
-        delay = random.uniform(min_sec, max_sec)
-        self.logger.info(f"随机延时 {delay:.2f} 秒")
-        time.sleep(delay)
+        # 批量竞价的任务日志（中断后再次运行时继续）
+        self.journal = journal or JobJournal()
+        self.job: Optional[Job] = None
         
+        # 竞价详情历史（分析竞争最低价的变化，跳过肯定竞不上的竞价单）
+        self.history = history or BidHistory()
+
     def update_progress(self, message: str, current: int = None, total: int = None):
         """更新进度"""
         if self.progress_callback:
@@ -58,7 +60,10 @@ class BidManagementCrawler:
     
     def get_pending_invitations(self, page: int = 1, page_size: int = 10) -> Optional[BidOrderListResponse]:
         """获取待确认邀约列表"""
-        self.random_delay()
+        return self.request.engine.run(self.aget_pending_invitations(page, page_size))
+    
+    async def aget_pending_invitations(self, page: int = 1, page_size: int = 10) -> Optional[BidOrderListResponse]:
+        """获取待确认邀约列表（协程）"""
         
         data = {
             "pageSize": page_size,
@@ -68,7 +73,7 @@ class BidManagementCrawler:
         }
         
         self.logger.info(f"获取待确认邀约列表，页码: {page}, 页大小: {page_size}")
-        response = self.request.post(self.search_url, data)
+        response = await self.request.apost(self.search_url, data)
         
         if not response or not response.get("success"):
             self.logger.error(f"获取待确认邀约失败: {response}")
@@ -79,7 +84,10 @@ class BidManagementCrawler:
     
     def get_failed_bids(self, page: int = 1, page_size: int = 10) -> Optional[BidOrderListResponse]:
         """获取竞价失败列表"""
-        self.random_delay()
+        return self.request.engine.run(self.aget_failed_bids(page, page_size))
+    
+    async def aget_failed_bids(self, page: int = 1, page_size: int = 10) -> Optional[BidOrderListResponse]:
+        """获取竞价失败列表（协程）"""
         
         data = {
             "pageSize": page_size,
@@ -88,7 +96,7 @@ class BidManagementCrawler:
         }
         
         self.logger.info(f"获取竞价失败列表，页码: {page}, 页大小: {page_size}")
-        response = self.request.post(self.search_url, data)
+        response = await self.request.apost(self.search_url, data)
         
         if not response or not response.get("success"):
             self.logger.error(f"获取竞价失败列表失败: {response}")
@@ -97,6 +105,39 @@ class BidManagementCrawler:
         result = response.get("result", {})
         return self._parse_order_list_response(result)
     
+    def _collect_tab_items(self, label: str, first_response: Optional[BidOrderListResponse],
+                           tab_id: int, fetch_page) -> List[BidOrderItem]:
+        """根据第一页中的tab统计数，并发获取该tab剩余的所有页
+        
+        Args:
+            label: 列表名称，用于日志
+            first_response: 第一页的响应
+            tab_id: tabAggregationList中对应的priceComparingItemTab
+            fetch_page: 获取指定页的协程函数
+        """
+        if not first_response:
+            return []
+        
+        count = 0
+        for tab in first_response.tabAggregationList:
+            if tab.priceComparingItemTab == tab_id:
+                count = tab.count
+                break
+        
+        self.logger.info(f"{label}总数: {count}")
+        
+        total_pages = page_count(count, self.max_page_size)
+        items = list(first_response.orderItemList or [])
+        if total_pages <= 1:
+            return items
+        
+        self.update_progress(f"并发获取{label}第 2-{total_pages} 页")
+        pages = fetch_pages(self.request, fetch_page, range(2, total_pages + 1))
+        for page, response in pages.items():
+            if response and response.orderItemList:
+                items.extend(response.orderItemList)
+        return items
+    
     def get_all_pending_and_failed_items(self) -> List[BidOrderItem]:
         """获取所有待处理的竞价商品"""
         all_items = []
@@ -104,61 +145,27 @@ class BidManagementCrawler:
         # 先获取第一页来确定总数
         self.update_progress("获取待确认邀约数据...")
         pending_response = self.get_pending_invitations(page=1, page_size=self.max_page_size)
-        
-        if pending_response:
-            # 计算待确认邀约的总页数
-            pending_count = 0
-            for tab in pending_response.tabAggregationList:
-                if tab.priceComparingItemTab == 1:  # 待邀约
-                    pending_count = tab.count
-                    break
-            
-            self.logger.info(f"待确认邀约总数: {pending_count}")
-            
-            # 获取所有待确认邀约页面
-            pending_pages = (pending_count + self.max_page_size - 1) // self.max_page_size
-            for page in range(1, pending_pages + 1):
-                self.update_progress(f"获取待确认邀约第 {page}/{pending_pages} 页")
-                if page == 1:
-                    response = pending_response
-                else:
-                    response = self.get_pending_invitations(page, self.max_page_size)
-                
-                if response and response.orderItemList:
-                    all_items.extend(response.orderItemList)
+        all_items.extend(self._collect_tab_items(
+            "待确认邀约", pending_response, 1,  # 待邀约
+            lambda page: self.aget_pending_invitations(page, self.max_page_size)
+        ))
         
         # 获取竞价失败列表
         self.update_progress("获取竞价失败数据...")
         failed_response = self.get_failed_bids(page=1, page_size=self.max_page_size)
+        all_items.extend(self._collect_tab_items(
+            "竞价失败", failed_response, 5,  # 竞价失败
+            lambda page: self.aget_failed_bids(page, self.max_page_size)
+        ))
         
-        if failed_response:
-            # 计算竞价失败的总数
-            failed_count = 0
-            for tab in failed_response.tabAggregationList:
-                if tab.priceComparingItemTab == 5:  # 竞价失败
-                    failed_count = tab.count
-                    break
-            
-            self.logger.info(f"竞价失败总数: {failed_count}")
-            
-            # 获取所有竞价失败页面
-            failed_pages = (failed_count + self.max_page_size - 1) // self.max_page_size
-            for page in range(1, failed_pages + 1):
-                self.update_progress(f"获取竞价失败第 {page}/{failed_pages} 页")
-                if page == 1:
-                    response = failed_response
-                else:
-                    response = self.get_failed_bids(page, self.max_page_size)
-                
-                if response and response.orderItemList:
-                    all_items.extend(response.orderItemList)
+        # 翻页期间列表有变动时，同一订单可能出现在相邻两页
+        all_items = dedupe_items(all_items, key=lambda item: (item.productId, item.priceComparingOrderId))
         
         self.logger.info(f"总共获取到 {len(all_items)} 个待处理商品")
         return all_items
     
     def get_bid_detail(self, product_id: int, price_comparing_order_id: str) -> Optional[BidDetailResponse]:
         """获取竞价详情"""
-        self.random_delay()
         
         data = {
             "productId": product_id,
@@ -177,7 +184,6 @@ class BidManagementCrawler:
     
     def confirm_invitation(self, product_id: int, price_comparing_order_id: str) -> bool:
         """确认邀约"""
-        self.random_delay()
         
         data = {
             "productId": product_id,
@@ -196,7 +202,6 @@ class BidManagementCrawler:
     
     def adjust_price(self, adjust_request: PriceAdjustRequest) -> bool:
         """调整价格"""
-        self.random_delay()
         
         data = {
             "adjustItems": [
@@ -286,6 +291,14 @@ class BidManagementCrawler:
         
         self.logger.info(f"开始处理商品竞价: {product_name} (ID: {product_id})")
         
+        # 上次运行已经发出调价请求的商品必须重新获取详情确认结果，其余商品先看历史记录是否肯定竞不上
+        category_ids = item.targetProductVO.catIdList if item.targetProductVO else []
+        decision = self.job.decision_of(self._job_key(item)) if self.job is not None else None
+        if not decision:
+            skipped = self._skip_by_history(item, category_ids)
+            if skipped is not None:
+                return skipped
+        
         # 获取竞价详情
         detail = self.get_bid_detail(product_id, order_id)
         if not detail:
@@ -311,6 +324,7 @@ class BidManagementCrawler:
             min_price = float(min_price_str)
             
             self.logger.info(f"当前价格: {current_price}, 最低价格: {min_price}")
+            self.history.record(product_id, detail, current_price, min_price)
             
         except (ValueError, AttributeError) as e:
             self.logger.error(f"解析价格失败: {e}")
@@ -326,8 +340,22 @@ class BidManagementCrawler:
                 needBid=False
             )
         
+        # 上次运行已经发出了调价请求但没有确认结果：当前价格已经不高于当时的竞价价格，说明调价已生效，不再重复降价
+        if decision and current_price <= decision.get("bidPrice", 0):
+            self.logger.info(f"商品 {product_name}: 上次运行已调价至 {decision.get('bidPrice')}，跳过")
+            return BidResult(
+                productId=product_id,
+                productName=product_name,
+                priceComparingOrderId=order_id,
+                originalPrice=decision.get("originalPrice", current_price),
+                bidPrice=current_price,
+                minPrice=min_price,
+                success=True,
+                message="上次运行已调价",
+                needBid=True
+            )
+        
         # 计算竞价价格（传入商品类别信息用于价格阈值检查）
-        category_ids = item.targetProductVO.catIdList if item.targetProductVO else []
         bid_price, need_bid, reason = self.calculate_bid_price(current_price, min_price, category_ids)
         
         if not need_bid:
@@ -345,6 +373,8 @@ class BidManagementCrawler:
             )
         
         self.logger.info(f"计算竞价价格: {bid_price}")
+        if self.job is not None:
+            self.job.mark_decided(self._job_key(item), {"originalPrice": current_price, "bidPrice": bid_price})
         
         # 确认邀约
         if not self.confirm_invitation(product_id, order_id):
@@ -452,55 +482,182 @@ class BidManagementCrawler:
                 needBid=True
             )
     
-    def process_all_bids(self) -> List[BidResult]:
-        """处理所有竞价"""
+    def _skip_by_history(self, item: BidOrderItem, category_ids: List[int]) -> Optional[BidResult]:
+        """最近的竞价历史显示减价后一定低于类别价格阈值时，不获取详情直接跳过（返回跳过的结果），否则返回None"""
+        if not self.enable_price_threshold_check or not category_ids:
+            return None
+        price_threshold = category_config.get_price_threshold_by_category_ids(category_ids)
+        if price_threshold is None:
+            return None
+        snapshot = self.history.unwinnable(item.priceComparingOrderId, self.bid_reduction, price_threshold)
+        if snapshot is None:
+            return None
+        self.history.record_skip(item.priceComparingOrderId)
+        reason = (f"近期竞价历史中最低价最高为 {snapshot.minPrice}，减价后低于类别价格阈值({price_threshold})，"
+                  f"不参与竞价（未获取详情）")
+        self.logger.info(f"商品 {item.targetProductVO.name}: {reason}")
+        current_price = snapshot.currentPrice if snapshot.currentPrice is not None else 0
+        return BidResult(
+            productId=item.productId,
+            productName=item.targetProductVO.name,
+            priceComparingOrderId=item.priceComparingOrderId,
+            originalPrice=current_price,
+            bidPrice=current_price,
+            minPrice=snapshot.minPrice,
+            success=True,
+            message=reason,
+            needBid=False,
+            skipped=True
+        )
+    
+    def _job_key(self, item: BidOrderItem) -> str:
+        """竞价条目在任务日志中的键"""
+        return f"{item.productId}:{item.priceComparingOrderId}"
+    
+    def _load_job_items(self, job: Job) -> List[BidOrderItem]:
+        """获取待处理商品：总是重新获取最新的列表（日志中的条目可能已经截止或被处理），
+        继续上次任务时只跳过日志中已完成的条目"""
+        items = []
+        skipped = 0
+        for item in self.get_all_pending_and_failed_items():
+            key = self._job_key(item)
+            job.add_item(key, asdict(item))
+            if job.is_applied(key):
+                skipped += 1
+            else:
+                items.append(item)
+        job.set_fetch_complete()
+        if job.resumed:
+            self.logger.info(f"继续上次未完成的竞价任务，跳过已完成的 {skipped} 个商品，剩余 {len(items)} 个商品")
+        return items
+    
+    def process_all_bids(self, resume: bool = True, max_workers: Optional[int] = None) -> List[BidResult]:
+        """处理所有竞价
+        
+        每个商品的处理状态记录在任务日志中，中断后再次运行时跳过已完成的商品，
+        只处理剩余的和失败的商品。
+        不同商品由线程池并发处理，同一个商品的多个竞价单在同一个线程中按顺序处理，
+        邀约截止时间早的商品先处理
+        
+        Args:
+            resume: 是否继续上次未完成的任务
+            max_workers: 最大线程数，默认取并发控制器的上限（实际在途请求数由网络层自适应控制）
+        """
         self.update_progress("开始获取待处理商品...")
         
+        job = self.journal.open("bid_management", {"bid_reduction": self.bid_reduction}, resume=resume)
+        self.job = job
+        try:
+            # 本线程和线程池发出的请求都记录为属于这个任务，退出时（包括异常）取消标注
+            with job.active():
+                results = self._process_job_items(job, max_workers)
+        except Exception:
+            # 保留任务日志，再次运行时继续
+            job.finish(stopped=True)
+            raise
+        finally:
+            self.job = None
+        job.finish(stopped=self.stop_flag_callback())
+        return results
+    
+    def _process_and_record(self, job: Job, item: BidOrderItem) -> BidResult:
+        """处理单个商品竞价并立即把结果记录到任务日志"""
+        try:
+            result = self.process_single_bid(item)
+        except Exception as e:
+            self.logger.error(f"处理商品 {item.targetProductVO.name} 时发生异常: {e}")
+            job.mark_failed(self._job_key(item), f"处理异常: {e}")
+            return BidResult(
+                productId=item.productId,
+                productName=item.targetProductVO.name,
+                priceComparingOrderId=item.priceComparingOrderId,
+                originalPrice=0,
+                bidPrice=0,
+                minPrice=0,
+                success=False,
+                message=f"处理异常: {e}",
+                needBid=False
+            )
+        
+        # 记录结果（根据历史跳过的竞价单没有确认当前状态，不记为已完成）
+        if result.skipped:
+            self.logger.info(f"⏭️ {result.productName}: {result.message}")
+        elif result.success:
+            job.mark_applied(self._job_key(item), result.message)
+            if result.needBid:
+                self.logger.info(f"✅ {result.productName}: 竞价成功 ({result.originalPrice} -> {result.bidPrice})")
+            else:
+                self.logger.info(f"ℹ️ {result.productName}: {result.message}")
+        else:
+            job.mark_failed(self._job_key(item), result.message)
+            self.logger.error(f"❌ {result.productName}: {result.message}")
+        return result
+    
+    def _process_product_items(self, job: Job, indexed_items: List[Tuple[int, BidOrderItem]]) -> List[Tuple[int, BidResult]]:
+        """按顺序处理同一个商品的所有竞价单（前一个调价完成后才读取下一个的竞价详情）"""
+        results = []
+        for index, item in indexed_items:
+            if self.stop_flag_callback():
+                break
+            results.append((index, self._process_and_record(job, item)))
+        return results
+    
+    def _group_by_product(self, items: List[BidOrderItem]) -> List[List[Tuple[int, BidOrderItem]]]:
+        """按商品分组（保留每个竞价单在列表中的位置），邀约截止时间最早的商品排在前面"""
+        groups: Dict[int, List[Tuple[int, BidOrderItem]]] = OrderedDict()
+        for index, item in enumerate(items):
+            groups.setdefault(item.productId, []).append((index, item))
+        return sorted(groups.values(), key=lambda group: min(item.endTime or float("inf") for _, item in group))
+    
+    def _process_job_items(self, job: Job, max_workers: Optional[int] = None) -> List[BidResult]:
         # 获取所有待处理商品
-        items = self.get_all_pending_and_failed_items()
+        items = self._load_job_items(job)
         if not items:
             self.logger.warning("没有找到待处理的竞价商品")
             return []
         
-        self.logger.info(f"开始处理 {len(items)} 个商品的竞价")
-        results = []
-        
-        for i, item in enumerate(items, 1):
-            self.update_progress(f"处理第 {i}/{len(items)} 个商品竞价", i, len(items))
-            
-            try:
-                result = self.process_single_bid(item)
-                results.append(result)
+        groups = self._group_by_product(items)
+        if max_workers is None:
+            max_workers = self.request.concurrency.max_limit
+        max_workers = max(1, min(max_workers, len(groups)))
+        self.logger.info(f"开始处理 {len(items)} 个商品的竞价（{len(groups)} 个商品，{max_workers} 个线程）")
+        
+        slots: List[Optional[BidResult]] = [None] * len(items)
+        done = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(job.bind(self._process_product_items), job, group) for group in groups]
+            for future in as_completed(futures):
+                for index, result in future.result():
+                    slots[index] = result
+                    done += 1
+                self.update_progress(f"已处理 {done}/{len(items)} 个商品竞价", done, len(items))
                 
-                # 记录结果
-                if result.success:
-                    if result.needBid:
-                        self.logger.info(f"✅ {result.productName}: 竞价成功 ({result.originalPrice} -> {result.bidPrice})")
-                    else:
-                        self.logger.info(f"ℹ️ {result.productName}: {result.message}")
-                else:
-                    self.logger.error(f"❌ {result.productName}: {result.message}")
-                    
-            except Exception as e:
-                self.logger.error(f"处理商品 {item.targetProductVO.name} 时发生异常: {e}")
-                results.append(BidResult(
-                    productId=item.productId,
-                    productName=item.targetProductVO.name,
-                    priceComparingOrderId=item.priceComparingOrderId,
-                    originalPrice=0,
-                    bidPrice=0,
-                    minPrice=0,
-                    success=False,
-                    message=f"处理异常: {e}",
-                    needBid=False
-                ))
+                if self.stop_flag_callback():
+                    self.logger.info("用户手动停止竞价处理，正在取消剩余任务...")
+                    for f in futures:
+                        f.cancel()
+                    break
+        
+        # 停止时正在处理的商品会处理完当前竞价单，把它们的结果也收集起来
+        for future in futures:
+            if future.done() and not future.cancelled():
+                for index, result in future.result():
+                    slots[index] = result
+        
+        # 结果顺序与待处理列表一致；被停止而没有处理的商品不在结果中，下次运行时继续
+        results = [result for result in slots if result is not None]
+        if self.stop_flag_callback():
+            self.update_progress(f"竞价处理已停止，已处理 {len(results)}/{len(items)} 个商品，再次运行时将从中断处继续")
+            return results
         
         # 统计结果
         success_count = sum(1 for r in results if r.success)
         bid_count = sum(1 for r in results if r.needBid and r.success)
-        no_bid_count = sum(1 for r in results if not r.needBid and r.success)
+        no_bid_count = sum(1 for r in results if not r.needBid and r.success and not r.skipped)
+        skipped_count = sum(1 for r in results if r.skipped)
         
-        self.update_progress(f"竞价处理完成！成功: {success_count}, 实际竞价: {bid_count}, 无需竞价: {no_bid_count}")
+        self.update_progress(f"竞价处理完成！成功: {success_count}, 实际竞价: {bid_count}, 无需竞价: {no_bid_count}, "
+                             f"根据历史跳过: {skipped_count}")
         
         return results
     
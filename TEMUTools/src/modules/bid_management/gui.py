@@ -311,7 +311,8 @@ class BidManagementTab(ttk.Frame):
             # 创建爬虫实例（配置会自动从配置文件加载）
             self.crawler = BidManagementCrawler(
                 logger=self.logger,
-                progress_callback=self.update_progress
+                progress_callback=self.update_progress,
+                stop_flag_callback=lambda: not self.is_processing
             )
             
             self.log_message("开始竞价处理...")
@@ -399,7 +400,7 @@ class BidManagementTab(ttk.Frame):
                         '竞价价格': result.bidPrice,
                         '最低价格': result.minPrice,
                         '是否需要竞价': '是' if result.needBid else '否',
-                        '处理结果': '成功' if result.success else '失败',
+                        '处理结果': '跳过' if result.skipped else ('成功' if result.success else '失败'),
                         '消息': result.message
                     })
                     
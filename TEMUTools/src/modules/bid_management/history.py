@@ -0,0 +1,242 @@
+"""
+竞价历史
+每次获取到的竞价详情都记录到本地SQLite（WAL模式）中，按商品ID和竞价单ID建索引，
+用于分析竞争对手最低价的变化，也用于在获取详情前判断竞价单是否值得处理：
+最近一段时间内竞争最低价一直低到减价后会跌破品类价格底线的竞价单，直接跳过，省下详情请求；
+跳过的竞价单不会产生新的记录，所以连续跳过一定次数后会重新获取一次详情，确认最低价是否回升
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from ..system_config.config import SystemConfig
+
+# 默认竞价历史配置，可在 system_config.json 的 "bid_history" 中覆盖
+DEFAULT_BID_HISTORY_CONFIG = {
+    "enabled": True,
+    # 是否保存完整的竞价详情（JSON），关闭时只保存价格
+    "store_detail": True,
+    # 是否根据历史跳过肯定竞不上的竞价单（需要同时开启价格底线检查）
+    "skip_unwinnable": True,
+    # 只参考这么多小时内的记录
+    "lookback_hours": 24,
+    # 同一个竞价单至少有这么多条记录，并且每一条都竞不上，才跳过
+    "min_observations": 2,
+    # 连续跳过这么多次后重新获取一次详情（0表示一直跳过，直到记录超出 lookback_hours）
+    "probe_every": 5,
+    # 竞价历史保留天数
+    "keep_days": 90
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bid_snapshots (
+    mallid TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    order_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    current_price REAL,
+    min_price REAL,
+    win_price INTEGER,
+    comparing_count INTEGER,
+    end_time INTEGER,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bid_snapshots_product ON bid_snapshots (mallid, product_id, ts);
+CREATE INDEX IF NOT EXISTS idx_bid_snapshots_order ON bid_snapshots (mallid, order_id, ts);
+CREATE TABLE IF NOT EXISTS bid_skips (
+    mallid TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bid_skips_order ON bid_skips (mallid, order_id, ts);
+"""
+
+
+def _default_db_path() -> str:
+    """竞价历史数据库路径：打包环境放在可执行文件旁边，开发环境放在源码目录下"""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(base_path, 'cache', 'bid_history.db')
+
+
+@dataclass
+class BidSnapshot:
+    """一次获取竞价详情时看到的价格（元）"""
+    productId: int
+    priceComparingOrderId: str
+    ts: float
+    currentPrice: Optional[float]
+    minPrice: Optional[float]
+    winSupplierPrice: Optional[int]
+    comparingProductCount: Optional[int]
+    endTime: Optional[int]
+
+
+class BidHistory:
+    """
+    竞价历史 - 单例
+
+    - record() 保存一次竞价详情
+    - series() / order_series() 按时间顺序返回某个商品 / 竞价单的价格记录
+    - unwinnable() 根据竞价单最近的记录判断按当前减价金额竞价是否一定会跌破价格底线
+    - record_skip() 记录一次根据历史跳过的竞价单，连续跳过 probe_every 次后 unwinnable() 不再跳过
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, db_path: Optional[str] = None, system_config: Optional[SystemConfig] = None):
+        # 指定数据库路径或配置时创建独立的历史库（测试使用），不影响全局共享的实例
+        if db_path is not None or system_config is not None:
+            history = super().__new__(cls)
+            history._init_history(db_path, system_config)
+            return history
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_history()
+        return cls._instance
+
+    def _init_history(self, db_path: Optional[str] = None, system_config: Optional[SystemConfig] = None):
+        self.logger = logging.getLogger('bid_history')
+        self.system_config = system_config or SystemConfig()
+        self.db_path = db_path or _default_db_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # 共用一个连接（自动提交），写入由锁串行化
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._cleanup()
+
+    @property
+    def config(self) -> Dict:
+        merged = dict(DEFAULT_BID_HISTORY_CONFIG)
+        merged.update(self.system_config.get_bid_history_config())
+        return merged
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get("enabled", True))
+
+    def _mallid(self) -> str:
+        return self.system_config.get_auth_snapshot()[2]
+
+    def record(self, product_id: int, detail: Any, current_price: Optional[float], min_price: Optional[float]):
+        """
+        保存一次竞价详情
+
+        Args:
+            product_id: 商品ID
+            detail: 竞价详情（BidDetailResponse）
+            current_price: 解析出的当前价格（元）
+            min_price: 解析出的竞争最低价（元）
+        """
+        config = self.config
+        if not config.get("enabled", True):
+            return
+        payload = json.dumps(asdict(detail), ensure_ascii=False, separators=(",", ":")) \
+            if config.get("store_detail", True) else None
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT INTO bid_snapshots (mallid, product_id, order_id, ts, current_price, min_price, "
+                    "win_price, comparing_count, end_time, detail) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self._mallid(), product_id, str(detail.priceComparingOrderId), time.time(),
+                     current_price, min_price, detail.winSupplierPrice, detail.comparingProductCount,
+                     detail.endTime, payload)
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"保存竞价历史失败: {str(e)}")
+
+    def _query(self, where: str, params: tuple, since: Optional[float]) -> List[BidSnapshot]:
+        sql = ("SELECT product_id, order_id, ts, current_price, min_price, win_price, comparing_count, end_time "
+               f"FROM bid_snapshots WHERE mallid = ? AND {where}")
+        params = (self._mallid(),) + params
+        if since is not None:
+            sql += " AND ts >= ?"
+            params += (since,)
+        with self._db_lock:
+            rows = self._conn.execute(sql + " ORDER BY ts", params).fetchall()
+        return [BidSnapshot(*row) for row in rows]
+
+    def series(self, product_id: int, since: Optional[float] = None) -> List[BidSnapshot]:
+        """某个商品的价格记录（所有竞价单），按时间顺序；since 为时间戳，只返回之后的记录"""
+        return self._query("product_id = ?", (product_id,), since)
+
+    def order_series(self, price_comparing_order_id: str, since: Optional[float] = None) -> List[BidSnapshot]:
+        """某个竞价单的价格记录，按时间顺序"""
+        return self._query("order_id = ?", (str(price_comparing_order_id),), since)
+
+    def record_skip(self, price_comparing_order_id: str):
+        """记录一次根据历史跳过（没有获取详情）的竞价单"""
+        if not self.enabled:
+            return
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT INTO bid_skips (mallid, order_id, ts) VALUES (?, ?, ?)",
+                    (self._mallid(), str(price_comparing_order_id), time.time())
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"保存竞价跳过记录失败: {str(e)}")
+
+    def skips_since(self, price_comparing_order_id: str, since: float) -> int:
+        """某个竞价单在since之后被跳过的次数"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM bid_skips WHERE mallid = ? AND order_id = ? AND ts > ?",
+                (self._mallid(), str(price_comparing_order_id), since)
+            ).fetchone()
+        return row[0]
+
+    def unwinnable(self, price_comparing_order_id: str, bid_reduction: float,
+                   price_threshold: float) -> Optional[BidSnapshot]:
+        """
+        根据竞价单最近的记录判断竞价是否一定会跌破价格底线
+
+        同一个商品的不同竞价单竞争对手不同，只参考这个竞价单自己的记录：
+        最近 lookback_hours 小时内至少有 min_observations 条记录，
+        并且其中最高的竞争最低价减去减价金额后仍低于价格底线时，返回最低价最高的那条记录，否则返回None。
+        最后一条记录之后已经连续跳过 probe_every - 1 次时返回None，让这次重新获取详情
+
+        Args:
+            price_comparing_order_id: 竞价单ID
+            bid_reduction: 减价金额（元）
+            price_threshold: 类别价格底线（元）
+        """
+        config = self.config
+        if not config.get("enabled", True) or not config.get("skip_unwinnable", True):
+            return None
+        since = time.time() - float(config["lookback_hours"]) * 3600
+        snapshots = [s for s in self.order_series(price_comparing_order_id, since) if s.minPrice is not None]
+        if len(snapshots) < max(1, int(config["min_observations"])):
+            return None
+        highest = max(snapshots, key=lambda s: s.minPrice)
+        if highest.minPrice - bid_reduction >= price_threshold:
+            return None
+        probe_every = int(config.get("probe_every", 0))
+        if probe_every > 0 and self.skips_since(price_comparing_order_id, snapshots[-1].ts) >= probe_every - 1:
+            return None
+        return highest
+
+    def _cleanup(self):
+        """删除超过保留天数的记录"""
+        cutoff = time.time() - float(self.config["keep_days"]) * 86400
+        try:
+            with self._db_lock:
+                self._conn.execute("DELETE FROM bid_snapshots WHERE ts < ?", (cutoff,))
+                self._conn.execute("DELETE FROM bid_skips WHERE ts < ?", (cutoff,))
+        except sqlite3.Error as e:
+            self.logger.warning(f"清理竞价历史失败: {str(e)}")
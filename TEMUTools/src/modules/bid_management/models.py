@@ -177,3 +177,4 @@ class BidResult:
     success: bool
     message: str
     needBid: bool  # 是否需要竞价
+    skipped: bool = False  # 根据竞价历史跳过（没有获取详情，不记为已完成）
@@ -0,0 +1,12 @@
+"""
+商品目录模块
+
+统一封装 skc/pageQuery 接口，维护本地商品目录快照，供各模块在本地筛选
+"""
+
+from .client import CatalogueClient, sku_stock_total
+
+__all__ = [
+    'CatalogueClient',
+    'sku_stock_total'
+]
@@ -0,0 +1,363 @@
+"""
+商品目录快照客户端
+统一封装 skc/pageQuery：整个店铺的商品目录只爬取一次，保存到本地SQLite快照中，
+在有效期（TTL）内各模块的筛选条件都在本地快照上执行，不再各自重新翻页；
+过期后按店铺的创建时间水位线增量同步，并定期全量对账
+"""
+
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from ..network.request import NetworkRequest
+from ..network.paginator import iter_pages, iter_unique, page_count
+from ..system_config.config import SystemConfig
+
+# 默认快照配置，可在 system_config.json 的 "catalogue" 中覆盖
+DEFAULT_CATALOGUE_CONFIG = {
+    "enabled": True,
+    # 快照有效期（秒），过期后下次使用时重新爬取
+    "ttl_seconds": 600,
+    # 爬取快照时每页数量
+    "page_size": 100,
+    # 快照过期后是否增量同步：只拉取创建时间比水位线新的商品（接口按创建时间倒序返回）
+    "incremental": True,
+    # 增量同步发现不了删除和已有商品的变更，超过这个间隔（秒）后做一次全量对账
+    "full_sync_interval_seconds": 3600
+}
+
+# 筛选结果要用来计算写请求（例如按当前库存算出的库存差值）时，快照中已有商品的数据最多允许多旧（秒）。
+# 增量同步只插入新商品，已有商品的库存只在全量同步时更新，所以按上次全量同步的时间计算
+WRITE_MAX_AGE_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    mallid TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    total INTEGER NOT NULL,
+    watermark INTEGER,
+    full_synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    mallid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    product_skc_id INTEGER NOT NULL,
+    product_id INTEGER,
+    created_at INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (mallid, product_skc_id)
+);
+CREATE INDEX IF NOT EXISTS idx_items_position ON items (mallid, position);
+"""
+
+
+def sku_stock_total(item: Dict[str, Any]) -> int:
+    """条目下所有SKU的虚拟库存之和，对应pageQuery的jitStockQuantitySection筛选"""
+    return sum(sku.get("virtualStock", 0) or 0 for sku in item.get("productSkuSummaries", []))
+
+
+def _default_db_path() -> str:
+    """快照数据库路径：打包环境放在可执行文件旁边，开发环境放在源码目录下"""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(base_path, 'cache', 'catalogue.db')
+
+
+class CatalogueClient:
+    """
+    商品目录快照客户端 - 单例
+
+    - items() 返回当前店铺的完整商品目录（原始的pageQuery条目），快照过期时自动重新爬取
+    - select() 在快照上执行本地筛选
+    - invalidate() 在批量修改商品（如改库存）后调用，让下次使用时重新爬取
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    query_url = "https://agentseller.temu.com/visage-agent-seller/product/skc/pageQuery"
+
+    def __new__(cls, db_path: Optional[str] = None, system_config: Optional[SystemConfig] = None,
+                request: Optional[NetworkRequest] = None):
+        # 指定数据库路径、配置或请求实例时创建独立的客户端（测试使用），不影响全局共享的快照
+        if db_path is not None or system_config is not None or request is not None:
+            client = super().__new__(cls)
+            client._init_client(db_path, system_config, request)
+            return client
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_client()
+        return cls._instance
+
+    def _init_client(self, db_path: Optional[str] = None, system_config: Optional[SystemConfig] = None,
+                     request: Optional[NetworkRequest] = None):
+        self.logger = logging.getLogger('catalogue')
+        self.request = request or NetworkRequest()
+        self.system_config = system_config or SystemConfig()
+        self.db_path = db_path or _default_db_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # 同一时间只允许一个线程刷新快照，其他线程等待后直接复用结果
+        self._refresh_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # 旧版本的快照表没有水位线字段，补上
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(snapshots)")}
+            for column, column_type in (("watermark", "INTEGER"), ("full_synced_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE snapshots ADD COLUMN {column} {column_type}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开数据库连接，退出时提交事务并关闭连接"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def config(self) -> Dict:
+        merged = dict(DEFAULT_CATALOGUE_CONFIG)
+        merged.update(self.system_config.get_catalogue_config())
+        return merged
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get("enabled", True))
+
+    def _mallid(self) -> str:
+        return self.system_config.get_auth_snapshot()[2]
+
+    def snapshot_age(self, mallid: Optional[str] = None) -> Optional[float]:
+        """当前店铺快照的年龄（秒），没有快照时返回None"""
+        mallid = self._mallid() if mallid is None else mallid
+        with self._connect() as conn:
+            row = conn.execute("SELECT fetched_at FROM snapshots WHERE mallid = ?", (mallid,)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def is_fresh(self, mallid: Optional[str] = None) -> bool:
+        """快照是否存在且在有效期内"""
+        age = self.snapshot_age(mallid)
+        return age is not None and age < float(self.config["ttl_seconds"])
+
+    def _synced_within(self, mallid: str, max_age: float) -> bool:
+        """上次全量同步是否在max_age秒以内"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT full_synced_at FROM snapshots WHERE mallid = ?", (mallid,)).fetchone()
+        return row is not None and row[0] is not None and time.time() - row[0] < max_age
+
+    def invalidate(self, mallid: Optional[str] = None):
+        """让当前店铺的快照失效（保留数据，下次使用时重新爬取）"""
+        mallid = self._mallid() if mallid is None else mallid
+        with self._connect() as conn:
+            conn.execute("DELETE FROM snapshots WHERE mallid = ?", (mallid,))
+        self.logger.info("商品目录快照已失效")
+
+    def items(self, refresh: bool = False, stop_flag_callback: Optional[Callable[[], bool]] = None,
+              max_age: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        获取当前店铺的完整商品目录
+
+        Args:
+            refresh: 是否忽略有效期强制重新爬取
+            stop_flag_callback: 停止标志回调
+            max_age: 已有商品的数据最多允许多旧（秒），上次全量同步早于这个时间时先全量同步
+
+        Returns:
+            商品条目列表（按接口返回顺序），爬取失败或被停止时返回None
+        """
+        mallid = self._mallid()
+
+        def stale() -> bool:
+            return max_age is not None and not self._synced_within(mallid, max_age)
+
+        if refresh or stale() or not self.is_fresh(mallid):
+            with self._refresh_lock:
+                # 等锁期间可能已经有其他线程刷新过了
+                full = refresh or stale()
+                if full or not self.is_fresh(mallid):
+                    if not self.sync(full=full, stop_flag_callback=stop_flag_callback):
+                        return None
+        return self._load(mallid)
+
+    def sync(self, full: bool = False, stop_flag_callback: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        同步当前店铺的快照
+
+        没有快照、没有水位线、关闭了增量同步或距上次全量同步超过对账间隔时做全量同步，
+        否则只拉取比水位线新的商品
+
+        Args:
+            full: 是否强制全量同步
+            stop_flag_callback: 停止标志回调
+
+        Returns:
+            是否同步成功
+        """
+        mallid = self._mallid()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT watermark, full_synced_at FROM snapshots WHERE mallid = ?", (mallid,)
+            ).fetchone()
+        config = self.config
+        if (full or row is None or row[0] is None or row[1] is None
+                or not config.get("incremental", True)
+                or time.time() - row[1] >= float(config["full_sync_interval_seconds"])):
+            return self._refresh(mallid, stop_flag_callback)
+        return self._sync_incremental(mallid, row[0], stop_flag_callback)
+
+    def select(self, predicate: Callable[[Dict[str, Any]], bool], required_fields: Iterable[str] = (),
+               stop_flag_callback: Optional[Callable[[], bool]] = None,
+               max_age: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        在快照上本地筛选商品
+
+        Args:
+            predicate: 筛选函数，接收原始条目，返回是否保留
+            required_fields: 筛选依赖的条目字段；快照条目中没有这些字段时无法在本地筛选
+            stop_flag_callback: 停止标志回调
+            max_age: 已有商品的数据最多允许多旧（秒）；结果要用来计算写请求时传入 WRITE_MAX_AGE_SECONDS
+
+        Returns:
+            筛选后的条目；快照未启用、获取失败或缺少所需字段时返回None，调用方应退回到服务端筛选
+        """
+        if not self.enabled:
+            return None
+        items = self.items(stop_flag_callback=stop_flag_callback, max_age=max_age)
+        if items is None:
+            return None
+        missing = [field for field in required_fields if items and field not in items[0]]
+        if missing:
+            self.logger.warning(f"商品目录快照缺少字段 {missing}，改用服务端筛选")
+            return None
+        return [item for item in items if predicate(item)]
+
+    def _load(self, mallid: str) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM items WHERE mallid = ? ORDER BY position", (mallid,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    async def _afetch_page(self, page: int, page_size: int) -> Optional[Dict]:
+        """获取指定页的商品目录（协程），返回接口的result字段"""
+        result = await self.request.apost(self.query_url, data={"page": page, "pageSize": page_size})
+        if not result or not result.get("success"):
+            error_msg = result.get('errorMsg', '未知错误') if result else '无返回'
+            self.logger.error(f"获取商品目录第 {page} 页失败: {error_msg}")
+            return None
+        return result.get("result", {})
+
+    def _crawl(self, stop_flag_callback: Optional[Callable[[], bool]] = None) -> Optional[List[Dict[str, Any]]]:
+        """完整爬取一次商品目录，任何一页失败都返回None（不完整的目录不能作为快照）"""
+        page_size = int(self.config["page_size"])
+        first = self.request.engine.run(self._afetch_page(1, page_size))
+        if first is None:
+            return None
+        total = first.get("total", 0)
+        self.logger.info(f"开始爬取商品目录快照，共 {total} 个商品")
+
+        items = list(first.get("pageItems", []))
+        for page, page_data in iter_pages(
+            self.request,
+            lambda page: self._afetch_page(page, page_size),
+            range(2, page_count(total, page_size) + 1),
+            stop_flag_callback
+        ):
+            if page_data is None:
+                return None
+            items.extend(page_data.get("pageItems", []))
+
+        if stop_flag_callback and stop_flag_callback():
+            return None
+        # 翻页期间有商品新增时，同一SKC可能在相邻两页重复出现
+        return list(iter_unique(items, key=lambda item: item["productSkcId"]))
+
+    def _crawl_newer(self, watermark: int,
+                     stop_flag_callback: Optional[Callable[[], bool]] = None) -> Optional[List[Dict[str, Any]]]:
+        """从第一页开始翻页，直到遇到不比水位线新的商品为止，返回所有更新的商品"""
+        page_size = int(self.config["page_size"])
+        newer = []
+        # 大部分时候第一页就能碰到水位线，只少量预取
+        for page, page_data in iter_pages(
+            self.request,
+            lambda page: self._afetch_page(page, page_size),
+            itertools.count(1),
+            stop_flag_callback,
+            prefetch=2
+        ):
+            if page_data is None:
+                return None
+            page_items = page_data.get("pageItems", [])
+            newer.extend(item for item in page_items if (item.get("createdAt") or 0) > watermark)
+            if not page_items or any((item.get("createdAt") or 0) <= watermark for item in page_items):
+                break
+            self.logger.info(f"第 {page} 页全部是新商品，继续翻页")
+
+        if stop_flag_callback and stop_flag_callback():
+            return None
+        return list(iter_unique(newer, key=lambda item: item["productSkcId"]))
+
+    def _sync_incremental(self, mallid: str, watermark: int,
+                          stop_flag_callback: Optional[Callable[[], bool]] = None) -> bool:
+        """增量同步：把比水位线新的商品插到快照最前面"""
+        newer = self._crawl_newer(watermark, stop_flag_callback)
+        if newer is None:
+            self.logger.error("商品目录增量同步未完成，本次不更新快照")
+            return False
+        with self._connect() as conn:
+            first_position = conn.execute(
+                "SELECT COALESCE(MIN(position), 0) FROM items WHERE mallid = ?", (mallid,)
+            ).fetchone()[0]
+            start = first_position - len(newer)
+            conn.executemany(
+                "INSERT OR REPLACE INTO items (mallid, position, product_skc_id, product_id, created_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [self._row(mallid, start + offset, item) for offset, item in enumerate(newer)]
+            )
+            total = conn.execute("SELECT COUNT(*) FROM items WHERE mallid = ?", (mallid,)).fetchone()[0]
+            new_watermark = max([watermark] + [item.get("createdAt") or 0 for item in newer])
+            conn.execute(
+                "UPDATE snapshots SET fetched_at = ?, total = ?, watermark = ? WHERE mallid = ?",
+                (time.time(), total, new_watermark, mallid)
+            )
+        self.logger.info(f"商品目录增量同步完成，新增 {len(newer)} 个商品，共 {total} 个商品")
+        return True
+
+    @staticmethod
+    def _row(mallid: str, position: int, item: Dict[str, Any]) -> tuple:
+        return (mallid, position, item["productSkcId"], item.get("productId"), item.get("createdAt"),
+                json.dumps(item, ensure_ascii=False))
+
+    def _refresh(self, mallid: str, stop_flag_callback: Optional[Callable[[], bool]] = None) -> bool:
+        """重新爬取并整体替换当前店铺的快照"""
+        items = self._crawl(stop_flag_callback)
+        if items is None:
+            self.logger.error("商品目录快照爬取未完成，本次不更新快照")
+            return False
+        rows = [self._row(mallid, position, item) for position, item in enumerate(items)]
+        watermark = max([item.get("createdAt") or 0 for item in items], default=0)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM items WHERE mallid = ?", (mallid,))
+            conn.executemany(
+                "INSERT INTO items (mallid, position, product_skc_id, product_id, created_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (mallid, fetched_at, total, watermark, full_synced_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (mallid, now, len(items), watermark, now)
+            )
+        self.logger.info(f"商品目录快照已全量更新，共 {len(items)} 个商品")
+        return True
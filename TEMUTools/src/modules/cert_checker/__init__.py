@@ -8,7 +8,6 @@
 """
 
 from .crawler import CertChecker, CertType, CertProduct
-from .gui import CertCheckerGUI
 
 __all__ = [
     'CertChecker',
@@ -16,3 +15,11 @@ __all__ = [
     'CertProduct',
     'CertCheckerGUI'
 ]
+
+
+def __getattr__(name):
+    # 界面类按需导入，命令行模式只使用爬虫时不需要tkinter
+    if name == 'CertCheckerGUI':
+        from .gui import CertCheckerGUI
+        return CertCheckerGUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,10 @@
 import logging
-import time
-import random
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from ..network.request import NetworkRequest
+from ..catalogue.client import CatalogueClient, WRITE_MAX_AGE_SECONDS
+from ..network.paginator import fetch_pages, dedupe_items, page_count
 
 
 @dataclass
@@ -45,14 +45,11 @@ class CertChecker:
         self.update_stock_url = "https://agentseller.temu.com/darwin-mms/api/kiana/foredawn/sales/stock/updateMmsSkuSalesStock"
         
         self.request = NetworkRequest()
+        self.catalogue = CatalogueClient()
         self.page_size = 500  # 每页查询500个商品
         self.max_cert_types_per_request = 500  # 每次最多查询500个资质类型
         self.low_stock_products = []  # 库存 < 998的商品
         
-    def random_delay(self):
-        """随机延时，避免请求过于频繁"""
-        time.sleep(random.uniform(0.5, 1.5))
-        
     def get_all_cert_types(self) -> List[CertType]:
         """获取所有资质类型（排除GCC）
         
@@ -100,79 +97,114 @@ class CertChecker:
             self.logger.error(f"获取资质类型异常: {str(e)}")
             return []
     
-    def get_products_by_cert_types(self, cert_type_ids: List[int]) -> List[CertProduct]:
+    def _to_product(self, item: Dict) -> CertProduct:
+        """把pageQuery条目转换为商品对象"""
+        return CertProduct(
+            productId=item["productId"],
+            productSkcId=item["productSkcId"],
+            productName=item["productName"],
+            productSkuSummaries=item["productSkuSummaries"],
+            requireCertTypes=item.get("requireCertTypes", [])
+        )
+    
+    async def _aquery_products_page(self, cert_type_ids: List[int], page: int) -> Optional[Dict]:
+        """查询指定页的商品（协程）
+        
+        Returns:
+            接口返回的result字段，失败返回None
+        """
+        self.logger.info(f"正在查询第 {page} 页商品...")
+        
+        data = {
+            "requireCertTypes": cert_type_ids,
+            "page": page,
+            "pageSize": self.page_size
+        }
+        
+        try:
+            result = await self.request.apost(self.query_products_url, data=data)
+            
+            if not result or not result.get("success"):
+                error_msg = result.get('errorMsg', '未知错误') if result else '无返回'
+                self.logger.error(f"查询第 {page} 页商品失败: {error_msg}")
+                return None
+            
+            page_data = result.get("result", {})
+            self.logger.info(f"第 {page} 页获取到 {len(page_data.get('pageItems', []))} 个商品")
+            return page_data
+            
+        except Exception as e:
+            self.logger.error(f"查询第 {page} 页商品异常: {str(e)}")
+            return None
+    
+    def get_products_by_cert_types(self, cert_type_ids: List[int], max_age: Optional[float] = None) -> List[CertProduct]:
         """根据资质类型查询商品
         
+        先查询第一页拿到总数，再并发查询剩余的页
+        
         Args:
             cert_type_ids: 资质类型ID列表（最多500个）
+            max_age: 使用商品目录快照时，快照中商品数据最多允许多旧（秒），超过时先全量同步
             
         Returns:
             商品列表
         """
         self.logger.info(f"开始查询需要资质的商品，资质类型数: {len(cert_type_ids)}")
         
-        page = 1
-        all_products = []
+        # 检查是否被用户停止
+        if self.stop_flag_callback():
+            self.logger.info("用户手动停止查询商品。")
+            return []
         
-        while True:
-            # 检查是否被用户停止
-            if self.stop_flag_callback():
-                self.logger.info("用户手动停止查询商品。")
-                break
-            
-            self.logger.info(f"正在查询第 {page} 页商品...")
-            
-            data = {
-                "requireCertTypes": cert_type_ids,
-                "page": page,
-                "pageSize": self.page_size
-            }
-            
-            try:
-                result = self.request.post(self.query_products_url, data=data)
-                
-                if not result or not result.get("success"):
-                    error_msg = result.get('errorMsg', '未知错误') if result else '无返回'
-                    self.logger.error(f"查询第 {page} 页商品失败: {error_msg}")
-                    break
-                
-                page_data = result.get("result", {})
-                page_items = page_data.get("pageItems", [])
-                total = page_data.get("total", 0)
-                
-                if page == 1:
-                    self.logger.info(f"本批次共找到 {total} 个需要资质的商品")
-                
-                # 解析商品数据
-                for item in page_items:
-                    all_products.append(CertProduct(
-                        productId=item["productId"],
-                        productSkcId=item["productSkcId"],
-                        productName=item["productName"],
-                        productSkuSummaries=item["productSkuSummaries"],
-                        requireCertTypes=item.get("requireCertTypes", [])
-                    ))
-                
-                self.logger.info(f"第 {page} 页获取到 {len(page_items)} 个商品")
-                
-                # 检查是否还有下一页
-                if page * self.page_size >= total:
-                    break
-                
-                page += 1
-                # 随机延时
-                self.random_delay()
-                
-            except Exception as e:
-                self.logger.error(f"查询第 {page} 页商品异常: {str(e)}")
-                break
+        # 优先在本地商品目录快照上筛选：要求的资质类型与本批次有交集
+        cert_type_set = set(cert_type_ids)
+        items = self.catalogue.select(
+            lambda item: bool(cert_type_set.intersection(item.get("requireCertTypes") or [])),
+            required_fields=("requireCertTypes",),
+            stop_flag_callback=self.stop_flag_callback,
+            max_age=max_age
+        )
+        if items is not None:
+            self.logger.info(f"从商品目录快照中筛选出 {len(items)} 个需要资质的商品")
+            return [self._to_product(item) for item in items]
+        
+        first_page = self.request.engine.run(self._aquery_products_page(cert_type_ids, 1))
+        if not first_page:
+            return []
+        
+        total = first_page.get("total", 0)
+        self.logger.info(f"本批次共找到 {total} 个需要资质的商品")
+        
+        pages = fetch_pages(
+            self.request,
+            lambda page: self._aquery_products_page(cert_type_ids, page),
+            range(2, page_count(total, self.page_size) + 1),
+            self.stop_flag_callback
+        )
+        
+        page_items = list(first_page.get("pageItems", []))
+        for page, page_data in pages.items():
+            if page_data:
+                page_items.extend(page_data.get("pageItems", []))
+        
+        if self.stop_flag_callback():
+            self.logger.info("用户手动停止查询商品。")
+        
+        # 翻页期间商品有变动时，同一SKC可能出现在相邻两页
+        page_items = dedupe_items(page_items, key=lambda item: item["productSkcId"])
+        
+        # 解析商品数据
+        all_products = [self._to_product(item) for item in page_items]
         
         self.logger.info(f"本批次查询完成，共获取到 {len(all_products)} 个商品")
         return all_products
     
-    def get_all_cert_products(self) -> List[CertProduct]:
+    def get_all_cert_products(self, max_age: Optional[float] = None) -> List[CertProduct]:
         """获取所有需要资质的商品（分批查询）
         
+        Args:
+            max_age: 使用商品目录快照时，快照中商品数据最多允许多旧（秒），超过时先全量同步
+            
         Returns:
             所有商品列表
         """
@@ -206,7 +238,7 @@ class CertChecker:
             self.logger.info(f"{'='*60}\n")
             
             # 查询本批次的商品
-            batch_products = self.get_products_by_cert_types(batch_cert_ids)
+            batch_products = self.get_products_by_cert_types(batch_cert_ids, max_age)
             
             if batch_products:
                 all_products.extend(batch_products)
@@ -214,10 +246,6 @@ class CertChecker:
             else:
                 self.logger.info(f"第 {batch_num} 批次没有找到商品")
             
-            # 批次间随机延时
-            if batch_num < batch_count:
-                self.random_delay()
-        
         # 3. 去重（同一个商品可能出现在不同批次中）
         unique_products = {}
         for product in all_products:
@@ -271,6 +299,7 @@ class CertChecker:
             if not sku_list:
                 return {"success": True, "errorMsg": "无需设置库存"}
             
+            # 一次请求只能包含一个SKC，同一SKC的SKU一起提交（见 StockBatchSetter.set_stock）
             data = {
                 "productId": product.productId,
                 "productSkcId": product.productSkcId,
@@ -284,17 +313,18 @@ class CertChecker:
             self.logger.error(f"设置商品 {product.productName} 库存异常: {str(e)}")
             return {"success": False, "errorMsg": str(e)}
     
-    def batch_set_stock_to_zero(self, max_workers: int = 5) -> Dict:
+    def batch_set_stock_to_zero(self, max_workers: Optional[int] = None) -> Dict:
         """批量将商品库存设为0
         
         Args:
-            max_workers: 最大线程数
+            max_workers: 最大线程数，默认取并发控制器的上限（实际在途请求数由网络层自适应控制）
             
         Returns:
             批量处理结果统计
         """
         # 1. 获取所有需要资质的商品
-        products = self.get_all_cert_products()
+        # 库存差值按查询到的当前库存计算，快照中的库存必须是刚同步的
+        products = self.get_all_cert_products(max_age=WRITE_MAX_AGE_SECONDS)
         
         if not products:
             self.logger.warning("没有找到需要资质的商品")
@@ -309,6 +339,9 @@ class CertChecker:
         success_count = 0
         failed_count = 0
         
+        if max_workers is None:
+            max_workers = self.request.concurrency.max_limit
+
         # 2. 使用线程池并发设置库存
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 提交所有任务
@@ -324,6 +357,9 @@ class CertChecker:
                 # 检查是否被用户停止
                 if self.stop_flag_callback():
                     self.logger.info("用户手动停止批量设置库存。")
+                    # 还没开始的请求不再发出
+                    for f in future_to_product:
+                        f.cancel()
                     break
                 
                 try:
@@ -344,8 +380,9 @@ class CertChecker:
                 if self.progress_callback:
                     self.progress_callback(idx, total)
                 
-                # 随机延时
-                self.random_delay()
+        # 库存已经变了，快照中的库存数据不再可信
+        if success_count:
+            self.catalogue.invalidate()
         
         # 3. 最终统计
         self.logger.info(f"\n{'='*60}")
@@ -4,6 +4,7 @@ import threading
 import logging
 from datetime import datetime
 from .crawler import CertChecker
+from ..logger.gui import LogHandler
 
 
 class CertCheckerGUI:
@@ -172,22 +173,7 @@ class CertCheckerGUI:
     
     def add_text_handler(self):
         """添加文本框日志handler"""
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record)
-                
-                def append():
-                    self.text_widget.insert(tk.END, msg + '\n')
-                    self.text_widget.see(tk.END)
-                
-                # 使用after方法在主线程中更新UI
-                self.text_widget.after(0, append)
-        
-        text_handler = TextHandler(self.log_text)
+        text_handler = LogHandler(self.log_text)
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         text_handler.setFormatter(formatter)
         self.logger.addHandler(text_handler)
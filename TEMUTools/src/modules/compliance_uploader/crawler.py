@@ -1,6 +1,4 @@
 import logging
-import time
-import random
 from typing import List, Dict, Any, Optional
 from ..network.request import NetworkRequest
 
@@ -21,16 +19,10 @@ class ComplianceUploader:
         ]
         self.template_cache = {}
 
-    def random_delay(self, min_sec=1, max_sec=2):
-        delay = random.uniform(min_sec, max_sec)
-        self.logger.info(f"请求前随机延时 {delay:.2f} 秒")
-        time.sleep(delay)
-
     def get_pending_products(self, task_type: int) -> List[Dict[str, Any]]:
         """
         获取未上传指定合规类型的商品列表（只查第一页）
         """
-        self.random_delay()
         url = f"{self.base_url}/page_query"
         data = {
             "page_num": 1,
@@ -55,7 +47,6 @@ class ComplianceUploader:
         if task_type in self.template_cache:
             self.logger.info(f"模板已缓存，直接复用，task_type={task_type}")
             return self.template_cache[task_type]
-        self.random_delay()
         url = f"{self.base_url}/query_template"
         data = {"similar_batch_operate": True, "wait_task_list": [{"task_type": task_type}]}
         self.logger.info(f"请求模板，task_type={task_type}，请求体: {data}")
@@ -76,7 +67,6 @@ class ComplianceUploader:
         """
         批量上传合规信息
         """
-        self.random_delay()
         url = f"{self.base_url}/batch_edit_compliance"
         good_info_list = []
         for p in products:
@@ -7,6 +7,7 @@ from datetime import datetime
 from .crawler import ComplianceUploader
 from ..system_config.config import SystemConfig
 from ..network.event_manager import EventManager
+from ..logger.gui import LogHandler
 
 class ComplianceUploaderTab(ttk.Frame):
     def __init__(self, parent):
@@ -59,23 +60,11 @@ class ComplianceUploaderTab(ttk.Frame):
         main_frame.rowconfigure(1, weight=1)
 
     def setup_logging(self):
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                logging.Handler.__init__(self)
-                self.text_widget = text_widget
-            def emit(self, record):
-                msg = self.format(record)
-                def append():
-                    self.text_widget.configure(state='normal')
-                    self.text_widget.insert(tk.END, msg + '\n')
-                    self.text_widget.see(tk.END)
-                    self.text_widget.configure(state='disabled')
-                self.text_widget.after(0, append)
         self.logger = logging.getLogger('compliance_uploader')
         self.logger.setLevel(logging.INFO)
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
-        text_handler = TextHandler(self.log_text)
+        text_handler = LogHandler(self.log_text)
         text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         self.logger.addHandler(text_handler)
         log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
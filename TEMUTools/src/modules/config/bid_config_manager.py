@@ -1,8 +1,9 @@
-import json
 import os
 import sys
 from typing import Dict, List, Optional
 
+from .store import ConfigStore
+
 class BidConfigManager:
     """竞价配置管理器"""
 
@@ -20,17 +21,15 @@ class BidConfigManager:
                 'bid_management_config.json'
             )
 
+        self._store = ConfigStore()
+
+    def _config(self) -> Dict:
+        """当前配置快照（只读，不访问磁盘，文件被修改后自动更新）"""
+        return self._store.get(self.config_file, default=self._get_default_config())
+
     def _load_config(self) -> Dict:
-        """加载配置文件"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                return self._get_default_config()
-        except Exception as e:
-            print(f"加载竞价配置失败: {e}")
-            return self._get_default_config()
+        """加载配置（返回副本，可修改后通过save_config保存）"""
+        return self._store.snapshot(self.config_file, default=self._get_default_config()).copy()
 
     def _get_default_config(self) -> Dict:
         """获取默认配置"""
@@ -47,15 +46,13 @@ class BidConfigManager:
     def save_config(self, config: Dict):
         """保存配置"""
         try:
-            os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            self._store.save(self.config_file, config, indent=2)
         except Exception as e:
             print(f"保存竞价配置失败: {e}")
 
     def get_bid_reduction(self) -> float:
         """获取减价金额"""
-        config = self._load_config()
+        config = self._config()
         return float(config.get("bid_reduction", 0.2))
 
     def set_bid_reduction(self, reduction: float):
@@ -66,17 +63,17 @@ class BidConfigManager:
 
     def get_max_page_size(self) -> int:
         """获取最大页面大小"""
-        config = self._load_config()
+        config = self._config()
         return int(config.get("max_page_size", 100))
 
     def is_price_threshold_check_enabled(self) -> bool:
         """是否启用价格底线检查"""
-        config = self._load_config()
+        config = self._config()
         return bool(config.get("enable_price_threshold_check", True))
 
     def get_random_delay_range(self) -> tuple:
         """获取随机延时范围"""
-        config = self._load_config()
+        config = self._config()
         return (
             float(config.get("random_delay_min", 1.0)),
             float(config.get("random_delay_max", 3.0))
@@ -84,5 +81,5 @@ class BidConfigManager:
 
     def get_adjust_reason(self) -> int:
         """获取价格调整原因代码"""
-        config = self._load_config()
+        config = self._config()
         return int(config.get("adjust_reason", 6))
@@ -1,14 +1,38 @@
-import json
 import os
 import sys
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from .store import ConfigStore
+
+
+class _CategoryIndex:
+    """品类配置的只读索引，配置文件快照变化时整体重建，通过一次赋值替换"""
+
+    def __init__(self, categories: List[Dict], version: int):
+        self.version = version
+        self.categories = categories
+        self.enabled = [cat for cat in categories if cat.get("enabled", True)]
+        # 同一个cate_id配置了多条时，与原来的顺序查找一样取第一条
+        self.by_cate_id: Dict[int, Dict] = {}
+        for cat in categories:
+            self.by_cate_id.setdefault(cat.get("cate_id"), cat)
+        self.enabled_by_cate_id: Dict[int, Dict] = {}
+        for cat in self.enabled:
+            self.enabled_by_cate_id.setdefault(cat.get("cate_id"), cat)
+        self.by_id: Dict[int, Dict] = {}
+        for cat in categories:
+            self.by_id.setdefault(cat.get("id"), cat)
+
 
 class CategoryConfigManager:
     """商品类别配置管理器"""
 
-    def __init__(self):
-        # 处理打包环境和开发环境的路径差异
-        if getattr(sys, 'frozen', False):
+    def __init__(self, config_file: Optional[str] = None, store: Optional[ConfigStore] = None):
+        # 处理打包环境和开发环境的路径差异（测试时可以直接指定配置文件）
+        if config_file:
+            self.config_file = config_file
+        elif getattr(sys, 'frozen', False):
             # 打包环境：从可执行文件目录查找配置
             base_path = sys._MEIPASS
             self.config_file = os.path.join(base_path, 'config', 'category_config.json')
@@ -19,41 +43,40 @@ class CategoryConfigManager:
                 'config',
                 'category_config.json'
             )
-        self._categories_cache = None
-
-    def _load_config(self) -> Dict:
-        """加载配置文件"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                return {"categories": []}
-        except Exception as e:
-            print(f"加载品类配置失败: {e}")
-            return {"categories": []}
+        self._store = store or ConfigStore()
+        self._index: Optional[_CategoryIndex] = None
+        self._index_lock = threading.Lock()
+
+    def _get_index(self) -> _CategoryIndex:
+        """获取品类索引，配置文件快照变化后（本进程保存或外部修改）重建"""
+        snapshot = self._store.snapshot(self.config_file, default={"categories": []})
+        index = self._index
+        if index is None or index.version != snapshot.version:
+            with self._index_lock:
+                index = self._index
+                if index is None or index.version != snapshot.version:
+                    index = _CategoryIndex(snapshot.data.get("categories", []), snapshot.version)
+                    self._index = index
+        return index
 
     def get_categories(self, enabled_only: bool = False) -> List[Dict]:
         """
-        获取品类配置
+        获取品类配置（返回缓存的列表，调用方不要修改）
 
         参数:
             enabled_only: 是否只返回启用的品类，默认False返回所有
         """
-        if self._categories_cache is None:
-            config = self._load_config()
-            self._categories_cache = config.get("categories", [])
-
+        index = self._get_index()
         if enabled_only:
-            return [cat for cat in self._categories_cache if cat.get("enabled", True)]
-        return self._categories_cache
+            return index.enabled
+        return index.categories
 
     def get_price_threshold_by_category_id(self, cate_id: int, enable_only=False) -> Optional[float]:
         """根据品类ID获取价格阈值"""
-        categories = self.get_categories(enabled_only=enable_only)
-        for category in categories:
-            if category.get("cate_id") == cate_id:
-                return float(category.get("price_threshold", 0))
+        index = self._get_index()
+        category = (index.enabled_by_cate_id if enable_only else index.by_cate_id).get(cate_id)
+        if category is not None:
+            return float(category.get("price_threshold", 0))
         return None
 
     def get_price_threshold_by_category_ids(self, cate_id_list: List[int]) -> Optional[float]:
@@ -69,19 +92,26 @@ class CategoryConfigManager:
 
     def get_category_info_by_id(self, cate_id: int) -> Optional[Dict]:
         """根据品类ID获取完整的品类信息（保留向后兼容）"""
-        categories = self.get_categories()
-        for category in categories:
-            if category.get("cate_id") == cate_id:
-                return category
-        return None
+        return self._get_index().by_cate_id.get(cate_id)
 
     def get_category_by_id(self, category_id: int) -> Optional[Dict]:
         """根据内部唯一ID获取品类信息"""
-        categories = self.get_categories()
-        for category in categories:
-            if category.get("id") == category_id:
-                return category
-        return None
+        return self._get_index().by_id.get(category_id)
+
+    def lookup_many(self, cate_ids: Iterable[int], enabled_only: bool = False) -> List[Optional[Dict]]:
+        """
+        批量按品类ID查找品类信息
+
+        参数:
+            cate_ids: 品类ID序列
+            enabled_only: 是否只查找启用的品类
+
+        返回:
+            与cate_ids一一对应的品类信息列表，未配置的为None
+        """
+        index = self._get_index()
+        lookup = (index.enabled_by_cate_id if enabled_only else index.by_cate_id).get
+        return [lookup(cate_id) for cate_id in cate_ids]
 
     def get_code_mapping_by_category_id(self, cate_id: int) -> Optional[str]:
         """根据品类ID获取商品码映射"""
@@ -102,14 +132,14 @@ class CategoryConfigManager:
         return None
 
     def refresh_cache(self):
-        """刷新缓存"""
-        self._categories_cache = None
+        """立即重新读取配置文件（文件被修改后也会在一秒内自动更新）"""
+        self._store.reload(self.config_file)
 
     def _get_next_id(self, categories: List[Dict]) -> int:
         """获取下一个自增ID"""
         if not categories:
             return 1
-        max_id = max(cat.get('id', 0) for cat in categories)
+        max_id = max(cat.get('id') or 0 for cat in categories)
         return max_id + 1
 
     def save_categories(self, categories: List[Dict]) -> bool:
@@ -117,6 +147,8 @@ class CategoryConfigManager:
         try:
             from datetime import datetime
 
+            # 复制一份再分配ID，不修改调用方传入的列表和品类
+            categories = [dict(category) for category in categories]
             # 确保每个品类都有ID，如果没有则自动分配
             for category in categories:
                 if 'id' not in category or category['id'] is None:
@@ -126,9 +158,9 @@ class CategoryConfigManager:
                 "categories": categories,
                 "last_update": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-            self.refresh_cache()
+            snapshot = self._store.save(self.config_file, config, indent=2)
+            # 用保存后的快照重建索引并整体替换，其他线程不会看到重建到一半的索引
+            self._index = _CategoryIndex(snapshot.data.get("categories", []), snapshot.version)
             return True
         except Exception as e:
             print(f"保存品类配置失败: {e}")
@@ -136,7 +168,7 @@ class CategoryConfigManager:
 
     def add_category(self, category: Dict) -> bool:
         """添加品类"""
-        categories = self.get_categories()
+        categories = list(self.get_categories())
         categories.append(category)
         return self.save_categories(categories)
 
@@ -149,7 +181,8 @@ class CategoryConfigManager:
             updated_data: 要更新的数据
             use_internal_id: True表示使用内部唯一ID，False表示使用cate_id（默认True）
         """
-        categories = self.get_categories()
+        # 复制一份再修改，正在读取的线程看到的快照保持不变
+        categories = [dict(cat) for cat in self.get_categories()]
         for i, cat in enumerate(categories):
             if use_internal_id:
                 if cat.get("id") == category_id:
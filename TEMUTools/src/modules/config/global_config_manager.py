@@ -1,8 +1,9 @@
-import json
 import os
 import sys
 from typing import Dict, List, Optional
 
+from .store import ConfigStore
+
 class GlobalConfigManager:
     """全局配置管理器"""
     def __init__(self):
@@ -18,43 +19,27 @@ class GlobalConfigManager:
                 'config',
                 'global_config.json'
             )
-        self._config_cache = None
-
+        self._store = ConfigStore()
 
-    def _load_config(self) -> Dict:
-        """加载配置文件"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                return {}
-        except Exception as e:
-            print(f"加载全局配置失败: {e}")
-            return {}
 
     def get_config(self) -> Dict:
-        """获取全局配置"""
-        if self._config_cache is None:
-            self._config_cache = self._load_config()
-        return self._config_cache
+        """获取全局配置（只读快照，文件被修改后自动更新）"""
+        return self._store.get(self.config_file, default={})
 
     def refresh_cache(self):
-        """刷新缓存"""
-        self._config_cache = None
+        """立即重新读取配置文件"""
+        self._store.reload(self.config_file)
 
     def update_config(self, updated_data: Dict) -> bool:
         """更新全局配置"""
-        config = self.get_config()
+        config = self._store.snapshot(self.config_file, default={}).copy()
         config.update(updated_data)
         return self.save_config(config)
 
     def save_config(self, config: Dict) -> bool:
         """保存全局配置"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-            self.refresh_cache()
+            self._store.save(self.config_file, config, indent=2)
             return True
         except Exception as e:
             print(f"保存全局配置失败: {e}")
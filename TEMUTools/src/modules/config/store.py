@@ -0,0 +1,202 @@
+"""
+配置文件存储模块
+所有JSON配置文件只在首次使用和文件变化时解析一次，读取时直接返回内存中的快照；
+后台线程按修改时间轮询已加载的文件，发现外部修改后重新解析并整体替换快照
+"""
+
+import copy
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 轮询文件修改时间的间隔（秒）
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+class ConfigSnapshot:
+    """某个配置文件在某一时刻的解析结果（只读，需要修改时先copy()）"""
+
+    __slots__ = ("path", "data", "version", "_stamp")
+
+    def __init__(self, path: str, data: Any, version: int, stamp: Optional[Tuple[int, int]]):
+        self.path = path
+        self.data = data
+        self.version = version
+        self._stamp = stamp
+
+    def copy(self) -> Any:
+        """返回数据的深拷贝，可以自由修改后通过ConfigStore.save()保存"""
+        return copy.deepcopy(self.data)
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    """文件的 (修改时间, 大小)，文件不存在时为None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ConfigStore:
+    """
+    配置存储 - 单例
+
+    - get() / snapshot() 读取内存中的快照，不访问磁盘
+    - save() 原子地写入文件并立即替换快照
+    - reload() 立即重新读取文件（例如其他程序修改了配置）
+    - subscribe() 订阅文件被外部修改的通知
+    - close() 停止后台监视线程（之后再访问会重新启动）
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, poll_interval: Optional[float] = None):
+        # 指定轮询间隔时创建独立的存储（测试使用），不影响全局共享的快照和监视线程
+        if poll_interval is not None:
+            store = super().__new__(cls)
+            store._init_store(poll_interval)
+            return store
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_store()
+        return cls._instance
+
+    def _init_store(self, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self._snapshots: Dict[str, ConfigSnapshot] = {}
+        self._defaults: Dict[str, Any] = {}
+        self._listeners: Dict[str, List[Callable[[ConfigSnapshot], None]]] = {}
+        self._store_lock = threading.RLock()
+        self._version = 0
+        self.poll_interval = poll_interval
+        self._watcher: Optional[threading.Thread] = None
+        # 当前监视线程的停止事件；每个线程有自己的事件，close()后未及时退出的旧线程不会被新线程的启动唤醒
+        self._stop: Optional[threading.Event] = None
+
+    def _read(self, path: str) -> ConfigSnapshot:
+        """从磁盘解析文件，解析失败或文件不存在时使用默认值"""
+        stamp = _stamp(path)
+        data = None
+        if stamp is not None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"加载配置文件失败 {path}: {e}")
+        if data is None:
+            data = copy.deepcopy(self._defaults.get(path, {}))
+        self._version += 1
+        return ConfigSnapshot(path, data, self._version, stamp)
+
+    def snapshot(self, path: str, default: Any = None) -> ConfigSnapshot:
+        """
+        获取配置文件的快照，首次访问时从磁盘加载并开始监视该文件
+
+        Args:
+            path: 配置文件路径
+            default: 文件不存在或解析失败时使用的默认数据
+
+        Returns:
+            配置快照，snapshot.version在文件每次变化后递增
+        """
+        path = os.path.abspath(path)
+        snap = self._snapshots.get(path)
+        if snap is not None:
+            return snap
+        with self._store_lock:
+            snap = self._snapshots.get(path)
+            if snap is None:
+                if default is not None:
+                    self._defaults[path] = default
+                snap = self._read(path)
+                self._snapshots[path] = snap
+                self._ensure_watcher()
+        return snap
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """获取配置数据（只读，需要修改时使用snapshot().copy()）"""
+        return self.snapshot(path, default).data
+
+    def save(self, path: str, data: Any, indent: int = 2) -> ConfigSnapshot:
+        """
+        保存配置：先写入临时文件再替换，读取方不会看到写了一半的文件；
+        保存后立即替换内存中的快照（不会触发外部修改通知）。
+        快照保存的是data的深拷贝，调用方之后修改data不会影响快照
+
+        Raises:
+            OSError: 写入文件失败
+        """
+        path = os.path.abspath(path)
+        with self._store_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=indent)
+            os.replace(tmp_path, path)
+            self._version += 1
+            snap = ConfigSnapshot(path, copy.deepcopy(data), self._version, _stamp(path))
+            self._snapshots[path] = snap
+            self._ensure_watcher()
+        return snap
+
+    def reload(self, path: str) -> ConfigSnapshot:
+        """立即从磁盘重新加载文件，内容有变化时通知订阅者"""
+        path = os.path.abspath(path)
+        with self._store_lock:
+            old = self._snapshots.get(path)
+            if old is not None and old._stamp == _stamp(path):
+                return old
+            snap = self._read(path)
+            self._snapshots[path] = snap
+            self._ensure_watcher()
+        if old is not None:
+            self._notify(snap)
+        return snap
+
+    def subscribe(self, path: str, callback: Callable[[ConfigSnapshot], None]):
+        """订阅文件被外部修改（或reload发现变化）的通知，回调在监视线程中执行"""
+        path = os.path.abspath(path)
+        with self._store_lock:
+            self._listeners.setdefault(path, []).append(callback)
+
+    def _notify(self, snap: ConfigSnapshot):
+        for callback in list(self._listeners.get(snap.path, [])):
+            try:
+                callback(snap)
+            except Exception as e:
+                print(f"配置变更回调失败 {snap.path}: {e}")
+
+    def _ensure_watcher(self):
+        if self._watcher is None:
+            self._stop = threading.Event()
+            self._watcher = threading.Thread(target=self._watch, args=(self._stop,),
+                                             name="ConfigStoreWatcher", daemon=True)
+            self._watcher.start()
+
+    def _watch(self, stop: threading.Event):
+        """轮询已加载文件的修改时间和大小，有变化时重新加载，直到close()设置stop"""
+        while not stop.wait(self.poll_interval):
+            for path, snap in list(self._snapshots.items()):
+                if stop.is_set():
+                    return
+                if _stamp(path) != snap._stamp:
+                    self.reload(path)
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        停止后台监视线程并等待其退出
+
+        Args:
+            timeout: 最多等待的秒数，默认一直等到线程退出
+        """
+        with self._store_lock:
+            watcher, self._watcher = self._watcher, None
+            stop, self._stop = self._stop, None
+        if stop is not None:
+            stop.set()
+        if watcher is not None and watcher is not threading.current_thread():
+            watcher.join(timeout)
@@ -1,6 +1,4 @@
 import json
-import time
-import random
 import logging
 from datetime import datetime, timedelta
 from dataclasses import dataclass
@@ -32,25 +30,6 @@ class ConfirmUploadCrawler:
         self.progress_callback = progress_callback
         self.stop_flag_callback = stop_flag_callback or (lambda: False)
         
-        # 延时配置（单位：秒）
-        self.delay_config = {
-            'page_request': (1, 2),      # 翻页请求延时范围
-            'action': (1, 2),            # 确认操作延时范围
-            'between_items': (1, 2)      # 处理商品之间的延时范围
-        }
-        
-    def random_delay(self, delay_type: str):
-        """随机延时
-        
-        Args:
-            delay_type: 延时类型，对应delay_config中的键
-        """
-        if delay_type in self.delay_config:
-            min_delay, max_delay = self.delay_config[delay_type]
-            delay = random.uniform(min_delay, max_delay)
-            self.logger.debug(f"随机延时 {delay:.2f} 秒 ({delay_type})")
-            time.sleep(delay)
-        
     def get_page_data(self, page: int, page_size: int, days_filter: int = 5) -> Dict:
         """获取指定页码的数据
         
@@ -83,9 +62,6 @@ class ConfirmUploadCrawler:
             self.logger.debug(f"时间范围: {start_time.strftime('%Y-%m-%d %H:%M:%S')} 到 {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
             self.logger.debug(f"请求体: {json.dumps(payload, ensure_ascii=False)}")
             
-            # 添加翻页请求延时
-            self.random_delay('page_request')
-            
             result = self.request.post(self.query_url, data=payload)
             
             if not result:
@@ -165,9 +141,6 @@ class ConfirmUploadCrawler:
                 progress = ((page - start_page + 1) / total_pages) * 100
                 self.progress_callback(progress)
             
-            # 添加翻页延时
-            self.random_delay('page_request')
-            
         return all_data
 
     def confirm_upload(self, products: List[UploadProduct]) -> List[Dict]:
@@ -196,9 +169,6 @@ class ConfirmUploadCrawler:
             self.logger.debug(f"请求URL: {self.confirm_url}")
             self.logger.debug(f"请求体: {json.dumps(payload, ensure_ascii=False)}")
             
-            # 添加确认请求延时
-            self.random_delay('action')
-            
             # 发送请求
             result = self.request.post(self.confirm_url, data=payload)
             
@@ -339,9 +309,6 @@ class ConfirmUploadCrawler:
                     progress = min(90, len(results) // 20 * 10)
                     self.progress_callback(progress)
                 
-                # 批次间延时
-                self.random_delay('page_request')
-                
             # 完成时设置进度为100%
             if self.progress_callback:
                 self.progress_callback(100)
@@ -1,6 +1,4 @@
 import json
-import time
-import random
 import logging
 from datetime import datetime
 from dataclasses import dataclass
@@ -35,25 +33,6 @@ class JitCrawler:
         # 停止标志回调
         self.stop_flag_callback = stop_flag_callback or (lambda: False)
         
-        # 延时配置（单位：秒）
-        self.delay_config = {
-            'page_request': (1, 2),      # 翻页请求延时范围
-            'action': (1, 2),            # 开通JIT操作延时范围
-            'between_items': (1, 2)      # 处理商品之间的延时范围
-        }
-        
-    def random_delay(self, delay_type: str):
-        """随机延时
-        
-        Args:
-            delay_type: 延时类型，对应delay_config中的键
-        """
-        if delay_type in self.delay_config:
-            min_delay, max_delay = self.delay_config[delay_type]
-            delay = random.uniform(min_delay, max_delay)
-            self.logger.debug(f"随机延时 {delay:.2f} 秒 ({delay_type})")
-            time.sleep(delay)
-        
     def get_page_data(self, page: int, page_size: int) -> Dict:
         """获取指定页码的数据"""
         payload = {
@@ -67,9 +46,6 @@ class JitCrawler:
             self.logger.debug(f"请求URL: {self.api_url}")
             self.logger.debug(f"请求体: {json.dumps(payload, ensure_ascii=False)}")
             
-            # 添加翻页请求延时
-            self.random_delay('page_request')
-            
             result = self.request.post(self.api_url, data=payload)
             
             if not result:
@@ -142,9 +118,6 @@ class JitCrawler:
                 progress = ((page - start_page + 1) / total_pages) * 100
                 self.progress_callback(progress)
             
-            # 添加翻页延时
-            self.random_delay('page_request')
-            
         return all_data
 
     def open_jit(self, products: List[JitProduct]) -> List[Dict]:
@@ -174,9 +147,6 @@ class JitCrawler:
             self.logger.debug(f"请求URL: {self.open_jit_url}")
             self.logger.debug(f"请求体: {json.dumps(payload, ensure_ascii=False)}")
             
-            # 添加开通JIT请求延时
-            self.random_delay('action')
-            
             # 发送请求
             result = self.request.post(self.open_jit_url, data=payload)
             
@@ -298,9 +268,6 @@ class JitCrawler:
                     progress = ((page - start_page + 1) / total_pages) * 100
                     self.progress_callback(progress)
                     
-                # 添加翻页请求延时
-                self.random_delay('page_request')
-                
             return results
             
         except Exception as e:
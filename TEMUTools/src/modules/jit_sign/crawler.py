@@ -1,6 +1,4 @@
 import logging
-import time
-import random
 from typing import Dict, List
 from dataclasses import dataclass
 from ..network.request import NetworkRequest
@@ -32,10 +30,6 @@ class JitSignCrawler:
         self.request = NetworkRequest()
         self._stop_flag = False
         
-    def random_delay(self):
-        """随机延时"""
-        time.sleep(random.uniform(1, 2))
-            
     def stop(self):
         """停止爬虫"""
         self._stop_flag = True
@@ -145,7 +139,4 @@ class JitSignCrawler:
                     if self.progress_callback:
                         self.progress_callback(total_processed)
                         
-                # 随机延时
-                self.random_delay()
-                
         return results 
\ No newline at end of file
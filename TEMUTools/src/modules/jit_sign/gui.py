@@ -5,6 +5,7 @@ import threading
 from typing import Optional
 from .crawler import JitSignCrawler, JitSignProduct
 from ..system_config.config import SystemConfig
+from ..logger.gui import LogHandler
 
 class JitSignTab(ttk.Frame):
     """JIT签署标签页"""
@@ -131,23 +132,7 @@ class JitSignTab(ttk.Frame):
         self.logger.setLevel(logging.INFO)
         
         # 添加文本处理器
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record)
-                
-                def append():
-                    self.text_widget.configure(state="normal")
-                    self.text_widget.insert("end", msg + "\n")
-                    self.text_widget.configure(state="disabled")
-                    self.text_widget.see("end")
-                    
-                self.text_widget.after(0, append)
-                
-        handler = TextHandler(self.log_text)
+        handler = LogHandler(self.log_text)
         formatter = logging.Formatter(
             "%(asctime)s - %(levelname)s - %(message)s"
         )
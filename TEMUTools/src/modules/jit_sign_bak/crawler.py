@@ -1,6 +1,4 @@
 import logging
-import time
-import random
 from typing import Dict, List
 from dataclasses import dataclass
 from ..network.request import NetworkRequest
@@ -34,10 +32,6 @@ class JitSignCrawler:
         # 每次签署的最大数量限制
         self.max_batch_size = 20
         
-    def random_delay(self):
-        """随机延时"""
-        time.sleep(random.uniform(1, 2))
-            
     def get_unsigned_products_page(self) -> Dict:
         """获取待签署商品列表数据
         
@@ -168,9 +162,6 @@ class JitSignCrawler:
                 # 即使失败也增加批次计数，避免无限循环
                 batch_count += 1
                 
-            # 随机延时，避免请求过于频繁
-            self.random_delay()
-            
         # 最终统计
         if results:
             total_success = sum(r.get("successNum", 0) for r in results)
@@ -0,0 +1,13 @@
+"""
+批量任务日志模块
+
+核价、竞价、设置库存等批量任务的条目状态记录在本地SQLite中，
+任务中断后再次运行时跳过已完成的条目，只处理剩余的和失败的条目
+"""
+
+from .journal import Job, JobJournal
+
+__all__ = [
+    'Job',
+    'JobJournal'
+]
@@ -0,0 +1,326 @@
+"""
+批量任务日志
+核价、竞价、设置库存等批量任务把每个条目的处理状态记录到本地SQLite（WAL模式）中：
+fetched（已获取）→ decided（已决定操作，写请求可能已发出）→ applied（已完成）/ failed（失败）。
+任务被停止、遇到403或程序崩溃后，下次运行同一任务时从日志继续：
+重新获取最新的列表，日志只用来跳过已完成的条目，剩余的和失败的条目按最新数据处理
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..system_config.config import SystemConfig
+
+# 默认任务日志配置，可在 system_config.json 的 "jobs" 中覆盖
+DEFAULT_JOBS_CONFIG = {
+    # 是否继续未完成的任务，False时每次运行都重新开始（仍会记录日志）
+    "resume": True,
+    # 未完成的任务在这个时间（小时）内再次运行时继续，超过后重新开始
+    "resume_within_hours": 24,
+    # 已结束的任务日志保留天数
+    "keep_days": 7
+}
+
+FETCHED = "fetched"
+DECIDED = "decided"
+APPLIED = "applied"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    mallid TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    fetch_complete INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_kind ON jobs (kind, mallid, updated_at);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    data TEXT,
+    decision TEXT,
+    message TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, item_key)
+);
+"""
+
+# 任务状态：running（运行中或程序崩溃）、stopped（用户停止）都可以继续；completed 不再继续
+_RESUMABLE = ("running", "stopped")
+
+# 当前线程正在处理的任务，由 Job.active() / Job.bind() 设置，供请求日志标注请求所属的任务；
+# 引擎事件循环中的请求协程继承提交请求的线程的上下文，同时运行的多个任务互不干扰
+_current_job: ContextVar[Optional[str]] = ContextVar("current_job_id", default=None)
+
+
+def current_job_id() -> Optional[str]:
+    """当前线程（或请求协程）所属任务的job_id，不在任何任务中时返回None"""
+    return _current_job.get()
+
+
+def _default_db_path() -> str:
+    """任务日志数据库路径：打包环境放在可执行文件旁边，开发环境放在源码目录下"""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(base_path, 'cache', 'jobs.db')
+
+
+class Job:
+    """
+    一次批量任务的日志
+
+    - add_item() 记录获取到的条目（已记录过的条目保留原状态）
+    - mark_decided() / mark_applied() / mark_failed() 更新条目状态
+    - pending() 返回还没完成的条目（用于统计；继续任务时以重新获取的列表为准，不使用日志中的旧数据）
+    - active() / bind() 在当前线程或线程池的函数中标注正在处理这个任务（请求日志据此记录job_id）
+    - finish() 结束任务；被停止时调用 finish(stopped=True)，下次可以继续
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock, job_id: str, kind: str,
+                 resumed: bool, fetch_complete: bool):
+        self._conn = conn
+        self._lock = lock
+        self.job_id = job_id
+        self.kind = kind
+        self.resumed = resumed
+        self.fetch_complete = fetch_complete
+        self._states: Dict[str, str] = {}
+        self._decisions: Dict[str, Any] = {}
+        self._seq = 0
+        if resumed:
+            for key, state, decision, seq in conn.execute(
+                    "SELECT item_key, state, decision, seq FROM job_items WHERE job_id = ?", (job_id,)):
+                self._states[key] = state
+                if decision is not None:
+                    self._decisions[key] = json.loads(decision)
+                self._seq = max(self._seq, seq)
+
+    def _execute(self, sql: str, params: Tuple):
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def add_item(self, key: str, data: Any):
+        """记录获取到的条目，已经记录过的条目只更新数据，不改变状态"""
+        key = str(key)
+        payload = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            if key in self._states:
+                self._conn.execute(
+                    "UPDATE job_items SET data = ? WHERE job_id = ? AND item_key = ?", (payload, self.job_id, key)
+                )
+                return
+            self._seq += 1
+            self._states[key] = FETCHED
+            self._conn.execute(
+                "INSERT INTO job_items (job_id, item_key, seq, state, data, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.job_id, key, self._seq, FETCHED, payload, time.time())
+            )
+
+    def set_fetch_complete(self):
+        """记录所有条目都已获取（继续任务时仍然重新获取列表，条目数据可能已经变化）"""
+        self.fetch_complete = True
+        self._execute("UPDATE jobs SET fetch_complete = 1, updated_at = ? WHERE job_id = ?", (time.time(), self.job_id))
+
+    def state_of(self, key: str) -> Optional[str]:
+        """条目的当前状态，未记录的条目返回None"""
+        return self._states.get(str(key))
+
+    def is_applied(self, key: str) -> bool:
+        return self._states.get(str(key)) == APPLIED
+
+    def decision_of(self, key: str) -> Optional[Any]:
+        """条目上一次记录的决定（例如要调整到的价格），没有时返回None"""
+        return self._decisions.get(str(key))
+
+    def _set_state(self, key: str, state: str, message: Optional[str] = None, decision: Any = None):
+        key = str(key)
+        with self._lock:
+            self._states[key] = state
+            if decision is not None:
+                self._decisions[key] = decision
+                self._conn.execute(
+                    "UPDATE job_items SET state = ?, decision = ?, updated_at = ? WHERE job_id = ? AND item_key = ?",
+                    (state, json.dumps(decision, ensure_ascii=False), time.time(), self.job_id, key)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE job_items SET state = ?, message = ?, attempts = attempts + 1, updated_at = ? "
+                    "WHERE job_id = ? AND item_key = ?",
+                    (state, message, time.time(), self.job_id, key)
+                )
+
+    def mark_decided(self, key: str, decision: Any):
+        """记录即将执行的操作（写请求发出前调用）"""
+        self._set_state(key, DECIDED, decision=decision)
+
+    def mark_applied(self, key: str, message: str = ""):
+        self._set_state(key, APPLIED, message)
+
+    def mark_failed(self, key: str, message: str = ""):
+        self._set_state(key, FAILED, message)
+
+    def pending(self) -> List[Tuple[str, Any, str]]:
+        """
+        还没完成的条目（未处理、已决定但未确认完成、失败），按获取顺序
+
+        Returns:
+            [(key, data, state)]
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_key, data, state FROM job_items WHERE job_id = ? AND state != ? ORDER BY seq",
+                (self.job_id, APPLIED)
+            ).fetchall()
+        return [(key, json.loads(data) if data is not None else None, state) for key, data, state in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的条目数"""
+        counts = {FETCHED: 0, DECIDED: 0, APPLIED: 0, FAILED: 0}
+        for state in list(self._states.values()):
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    @contextmanager
+    def active(self) -> Iterator["Job"]:
+        """在with块中，当前线程发出的请求都标注为属于这个任务；退出时（包括抛出异常）恢复原来的标注"""
+        token = _current_job.set(self.job_id)
+        try:
+            yield self
+        finally:
+            _current_job.reset(token)
+
+    def bind(self, func: Callable) -> Callable:
+        """包装提交到线程池或新线程中运行的函数，使其在这个任务中运行"""
+        def run(*args, **kwargs):
+            with self.active():
+                return func(*args, **kwargs)
+        return run
+
+    def finish(self, stopped: bool = False):
+        """结束任务：被停止的任务下次运行时继续，正常结束的任务不再继续"""
+        self._execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+            ("stopped" if stopped else "completed", time.time(), self.job_id)
+        )
+
+
+class JobJournal:
+    """
+    批量任务日志 - 单例
+
+    open() 打开一个任务：同一店铺同一类任务（参数相同）有未完成的日志时继续，否则新建
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, db_path: Optional[str] = None, system_config: Optional[SystemConfig] = None):
+        # 指定数据库路径或配置时创建独立的任务日志（测试使用），不影响全局共享的实例
+        if db_path is not None or system_config is not None:
+            journal = super().__new__(cls)
+            journal._init_journal(db_path, system_config)
+            return journal
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_journal()
+        return cls._instance
+
+    def _init_journal(self, db_path: Optional[str] = None, system_config: Optional[SystemConfig] = None):
+        self.logger = logging.getLogger('jobs')
+        self.system_config = system_config or SystemConfig()
+        self.db_path = db_path or _default_db_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # 所有任务共用一个连接（自动提交），写入由锁串行化
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+    @property
+    def config(self) -> Dict:
+        merged = dict(DEFAULT_JOBS_CONFIG)
+        merged.update(self.system_config.get_jobs_config())
+        return merged
+
+    def open(self, kind: str, params: Optional[Dict] = None, resume: bool = True) -> Job:
+        """
+        打开任务日志
+
+        Args:
+            kind: 任务类型，例如 "price_review"
+            params: 任务参数，参数不同的未完成任务不会被继续
+            resume: 是否继续未完成的任务，False时总是新建
+
+        Returns:
+            任务日志，job.resumed 表示是否继续了上次的任务
+        """
+        from ..network.replay import TrafficReplay
+        if TrafficReplay().replaying:
+            # 回放产生的进度不能被线上运行继续（反之亦然）
+            kind = f"replay:{kind}"
+        mallid = self.system_config.get_auth_snapshot()[2]
+        params_json = json.dumps(params or {}, ensure_ascii=False, sort_keys=True)
+        config = self.config
+        resume = resume and bool(config.get("resume", True))
+        now = time.time()
+        with self._db_lock:
+            # 清理过期的任务日志
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT job_id FROM jobs WHERE updated_at < ?", (now - float(config["keep_days"]) * 86400,)
+            )]
+            for job_id in expired:
+                self._conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+            row = None
+            if resume:
+                row = self._conn.execute(
+                    "SELECT job_id, fetch_complete FROM jobs WHERE kind = ? AND mallid = ? AND params = ? "
+                    "AND status IN (?, ?) AND updated_at >= ? ORDER BY updated_at DESC LIMIT 1",
+                    (kind, mallid, params_json, *_RESUMABLE, now - float(config["resume_within_hours"]) * 3600)
+                ).fetchone()
+            # 同类的其他未完成任务不会再被继续
+            self._conn.execute(
+                "UPDATE jobs SET status = 'completed' WHERE kind = ? AND mallid = ? AND status IN (?, ?) AND job_id != ?",
+                (kind, mallid, *_RESUMABLE, row[0] if row else "")
+            )
+            if row is not None:
+                job_id, fetch_complete = row
+                self._conn.execute("UPDATE jobs SET status = 'running', updated_at = ? WHERE job_id = ?", (now, job_id))
+                job = Job(self._conn, self._db_lock, job_id, kind, True, bool(fetch_complete))
+            else:
+                job_id = uuid.uuid4().hex
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, kind, mallid, params, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, 'running', ?, ?)",
+                    (job_id, kind, mallid, params_json, now, now)
+                )
+                job = Job(self._conn, self._db_lock, job_id, kind, False, False)
+        if job.resumed:
+            counts = job.counts()
+            self.logger.info(
+                f"继续上次未完成的任务 {kind}：已完成 {counts[APPLIED]}，失败 {counts[FAILED]}，"
+                f"未完成 {counts[FETCHED] + counts[DECIDED]}"
+            )
+        return job
@@ -1,36 +1,99 @@
 import logging
+import threading
 import tkinter as tk
+from collections import deque
 from tkinter import ttk
 from .logger import Logger
 
 class LogHandler(logging.Handler):
-    """自定义日志处理器,用于将日志输出到GUI"""
-    
-    def __init__(self, text_widget):
+    """
+    自定义日志处理器,用于将日志输出到GUI
+
+    多线程任务每分钟会产生上千条日志，逐条 after(0, ...) 更新界面会堵塞Tk事件循环：
+    - 日志先放进队列，主线程每隔 flush_interval_ms 毫秒批量写入文本框
+    - 文本框最多保留 max_lines 行，超出的旧日志被删除（完整日志见日志文件）
+    - 积压超过 busy_threshold 条时丢弃DEBUG日志；积压超过 max_lines 条时只保留最新的日志，
+      被省略的条数会在文本框中提示
+    """
+
+    def __init__(self, text_widget, max_lines: int = 2000, flush_interval_ms: int = 100,
+                 busy_threshold: int = 200):
         super().__init__()
         self.text_widget = text_widget
-        
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self.busy_threshold = busy_threshold
+        # deque的append/popleft是线程安全的，超出长度时自动丢弃最旧的日志；
+        # 留出一行给省略提示，一批日志加上提示不会超过 max_lines 行
+        self._pending = deque(maxlen=max(1, max_lines - 1))
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._closed = False
+        # 必须在主线程中创建，定时刷新只在主线程中运行
+        self._schedule()
+
     def emit(self, record):
-        msg = self.format(record)
-        def append():
+        try:
+            pending = len(self._pending)
+            if pending >= self._pending.maxlen or (record.levelno <= logging.DEBUG and pending >= self.busy_threshold):
+                # 队列已满时append会挤掉最旧的一条；积压较多时直接丢弃DEBUG日志
+                with self._dropped_lock:
+                    self._dropped += 1
+                if record.levelno <= logging.DEBUG:
+                    return
+            self._pending.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def _schedule(self):
+        try:
+            self.text_widget.after(self.flush_interval_ms, self._flush)
+        except (RuntimeError, tk.TclError):
+            # GUI组件已销毁或主循环已退出
+            self._closed = True
+
+    def _flush(self):
+        """把队列中的日志批量写入文本框（在主线程中运行）"""
+        if self._closed:
+            return
+        lines = []
+        while self._pending:
             try:
-                self.text_widget.configure(state='normal')
-                self.text_widget.insert(tk.END, msg + '\n')
-                self.text_widget.see(tk.END)
-                self.text_widget.configure(state='disabled')
+                lines.append(self._pending.popleft())
+            except IndexError:
+                break
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            # 省略的条数只在emit中统计；提示放在本批日志前面，队列长度保证它不会被行数上限截掉
+            lines.insert(0, f"（日志过多，已省略 {dropped} 条，完整日志请查看日志文件）")
+        if lines:
+            try:
+                self._append(lines)
             except tk.TclError:
-                # GUI组件已销毁，忽略错误
-                pass
-        
-        # 在主线程中更新GUI，添加异常处理
-        try:
-            self.text_widget.after(0, append)
-        except RuntimeError:
-            # 主线程还未进入主循环或已退出，直接输出到控制台
-            print(f"[GUI未就绪] {msg}")
-        except tk.TclError:
-            # GUI组件已销毁，忽略错误
-            pass
+                # GUI组件已销毁，停止刷新
+                self._closed = True
+                return
+        self._schedule()
+
+    def _append(self, lines):
+        widget = self.text_widget
+        # 用户向上翻看日志时不自动滚动到底部
+        at_bottom = widget.yview()[1] >= 0.999
+        state = widget.cget('state')
+        widget.configure(state='normal')
+        widget.insert(tk.END, '\n'.join(lines) + '\n')
+        # 只保留最新的 max_lines 行（文本末尾总有一个空行）
+        excess = int(widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+        if excess > 0:
+            widget.delete('1.0', f'{excess + 1}.0')
+        widget.configure(state=state)
+        if at_bottom:
+            widget.see(tk.END)
+
+    def close(self):
+        self._closed = True
+        super().close()
 
 class LogFrame(ttk.LabelFrame):
     """日志显示框架"""
@@ -0,0 +1,48 @@
+"""
+启动耗时统计
+记录程序启动各阶段（导入、构建窗口、首次绘制）和每个标签页首次构建的耗时，
+启动完成后写入日志，方便定位启动慢的原因；
+需要更细的导入耗时时可以用 python -X importtime src/main.py 运行
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class StartupProfile:
+    """
+    启动耗时统计
+
+    - mark(name) 记录从进程启动到当前的耗时
+    - measure(name) 统计一段代码的耗时（例如导入并构建某个标签页）
+    - report() 返回可读的统计文本
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        # start 传入程序最开始记录的 time.perf_counter()，不传时从创建本对象开始计时
+        self.start = time.perf_counter() if start is None else start
+        self.marks: List[Tuple[str, float]] = []
+        self.durations: Dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        """记录一个阶段，返回从启动到现在的秒数"""
+        elapsed = time.perf_counter() - self.start
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - begin
+
+    def report(self) -> str:
+        parts = [f"{name} {elapsed * 1000:.0f}ms" for name, elapsed in self.marks]
+        text = "启动耗时: " + ", ".join(parts)
+        if self.durations:
+            slowest = sorted(self.durations.items(), key=lambda item: item[1], reverse=True)
+            text += "；" + ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in slowest)
+        return text
@@ -8,7 +8,6 @@
 """
 
 from .crawler import ManualChecker, ManualProduct
-from .gui import ManualCheckerGUI
 
 __all__ = [
     'ManualChecker',
@@ -16,3 +15,10 @@ __all__ = [
     'ManualCheckerGUI'
 ]
 
+
+def __getattr__(name):
+    # 界面类按需导入，命令行模式只使用爬虫时不需要tkinter
+    if name == 'ManualCheckerGUI':
+        from .gui import ManualCheckerGUI
+        return ManualCheckerGUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
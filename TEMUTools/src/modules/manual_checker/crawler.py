@@ -1,10 +1,9 @@
 import logging
-import time
-import random
-from typing import List, Dict
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from ..network.request import NetworkRequest
+from ..catalogue.client import CatalogueClient, WRITE_MAX_AGE_SECONDS, sku_stock_total
 
 
 @dataclass
@@ -36,22 +35,43 @@ class ManualChecker:
         self.update_stock_url = "https://agentseller.temu.com/darwin-mms/api/kiana/foredawn/sales/stock/updateMmsSkuSalesStock"
         
         self.request = NetworkRequest()
+        self.catalogue = CatalogueClient()
         self.page_size = 500  # 每页查询500个商品
         self.low_stock_products = []  # 记录需要手动处理的商品
 
         
-    def random_delay(self):
-        """随机延时，避免请求过于频繁"""
-        time.sleep(random.uniform(0.5, 1.5))
+    def _to_product(self, item: Dict) -> ManualProduct:
+        """把pageQuery条目转换为商品对象"""
+        return ManualProduct(
+            productId=item["productId"],
+            productSkcId=item["productSkcId"],
+            productName=item["productName"],
+            productSkuSummaries=item["productSkuSummaries"]
+        )
         
-    def get_all_products_without_manual(self) -> List[ManualProduct]:
+    def get_all_products_without_manual(self, max_age: Optional[float] = None) -> List[ManualProduct]:
         """获取所有未上传说明书的商品
         
+        Args:
+            max_age: 使用商品目录快照时，快照中商品数据最多允许多旧（秒），超过时先全量同步
+            
         Returns:
             商品列表
         """
         self.logger.info("开始查询未上传说明书的商品...")
         
+        # 优先在本地商品目录快照上筛选：有库存且需要上传说明书
+        items = self.catalogue.select(
+            lambda item: bool(item.get("needGuideFile")) and sku_stock_total(item) >= 1,
+            required_fields=("needGuideFile", "productSkuSummaries"),
+            stop_flag_callback=self.stop_flag_callback,
+            max_age=max_age
+        )
+        if items is not None:
+            all_products = [self._to_product(item) for item in items]
+            self.logger.info(f"从商品目录快照中筛选出 {len(all_products)} 个未上传说明书的商品")
+            return all_products
+        
         page = 1
         all_products = []
         
@@ -88,12 +108,7 @@ class ManualChecker:
                 
                 # 解析商品数据
                 for item in page_items:
-                    all_products.append(ManualProduct(
-                        productId=item["productId"],
-                        productSkcId=item["productSkcId"],
-                        productName=item["productName"],
-                        productSkuSummaries=item["productSkuSummaries"]
-                    ))
+                    all_products.append(self._to_product(item))
                 
                 self.logger.info(f"第 {page} 页获取到 {len(page_items)} 个商品")
                 
@@ -102,8 +117,6 @@ class ManualChecker:
                     break
                 
                 page += 1
-                # 随机延时
-                self.random_delay()
                 
             except Exception as e:
                 self.logger.error(f"查询第 {page} 页商品异常: {str(e)}")
@@ -155,6 +168,7 @@ class ManualChecker:
                 self.logger.debug(f"商品 {product.productName} 所有SKU库存已为0，无需修改")
                 return {"success": True, "status": "already_zero", "errorMsg": "库存已为0"}
             
+            # 一次请求只能包含一个SKC，同一SKC的SKU一起提交（见 StockBatchSetter.set_stock）
             data = {
                 "productId": product.productId,
                 "productSkcId": product.productSkcId,
@@ -168,17 +182,18 @@ class ManualChecker:
             self.logger.error(f"设置商品 {product.productName} 库存异常: {str(e)}")
             return {"success": False, "errorMsg": str(e)}
     
-    def batch_set_stock_to_zero(self, max_workers: int = 5) -> Dict:
+    def batch_set_stock_to_zero(self, max_workers: Optional[int] = None) -> Dict:
         """批量将商品库存设为0
         
         Args:
-            max_workers: 最大线程数
+            max_workers: 最大线程数，默认取并发控制器的上限（实际在途请求数由网络层自适应控制）
             
         Returns:
             批量处理结果统计
         """
         # 1. 获取所有未上传说明书的商品
-        products = self.get_all_products_without_manual()
+        # 库存差值按查询到的当前库存计算，快照中的库存必须是刚同步的
+        products = self.get_all_products_without_manual(max_age=WRITE_MAX_AGE_SECONDS)
         
         if not products:
             self.logger.warning("没有找到未上传说明书的商品")
@@ -193,6 +208,9 @@ class ManualChecker:
         success_count = 0
         failed_count = 0
 
+        if max_workers is None:
+            max_workers = self.request.concurrency.max_limit
+
         # 2. 使用线程池并发设置库存
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 提交所有任务
@@ -208,6 +226,9 @@ class ManualChecker:
                 # 检查是否被用户停止
                 if self.stop_flag_callback():
                     self.logger.info("用户手动停止批量设置库存。")
+                    # 还没开始的请求不再发出
+                    for f in future_to_product:
+                        f.cancel()
                     break
                 
                 try:
@@ -229,8 +250,9 @@ class ManualChecker:
                 if self.progress_callback:
                     self.progress_callback(idx, total)
                 
-                # 随机延时
-                self.random_delay()
+        # 库存已经变了，快照中的库存数据不再可信
+        if success_count:
+            self.catalogue.invalidate()
         
         # 3. 最终统计
         self.logger.info(f"\n{'='*60}")
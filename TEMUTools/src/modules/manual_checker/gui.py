@@ -5,6 +5,7 @@ import logging
 import os
 from datetime import datetime
 from .crawler import ManualChecker
+from ..logger.gui import LogHandler
 
 
 class ManualCheckerGUI:
@@ -172,22 +173,7 @@ class ManualCheckerGUI:
     
     def add_text_handler(self):
         """添加文本框日志handler"""
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record)
-                
-                def append():
-                    self.text_widget.insert(tk.END, msg + '\n')
-                    self.text_widget.see(tk.END)
-                
-                # 使用after方法在主线程中更新UI
-                self.text_widget.after(0, append)
-        
-        text_handler = TextHandler(self.log_text)
+        text_handler = LogHandler(self.log_text)
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         text_handler.setFormatter(formatter)
         self.logger.addHandler(text_handler)
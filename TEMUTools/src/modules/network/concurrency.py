@@ -0,0 +1,167 @@
+"""
+自适应并发控制模块
+按AIMD（加性增、乘性减）策略动态调整同时在途的请求数：
+延迟和错误率正常时逐步放开并发，遇到429/5xx/403时立即减半
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# 默认并发配置，可在 system_config.json 的 "concurrency" 中覆盖
+DEFAULT_CONCURRENCY_CONFIG = {
+    "enabled": True,
+    # 初始并发数以及上下限
+    "initial": 4,
+    "min": 1,
+    "max": 16,
+    # 每统计多少个请求评估一次是否可以加并发
+    "window": 20,
+    # 窗口内p95延迟（秒）和错误率低于阈值才认为是健康的
+    "p95_latency_threshold": 3.0,
+    "error_rate_threshold": 0.05,
+    # 乘性减的系数，以及两次减并发之间的最小间隔（秒），避免一串失败把并发直接打到最小
+    "decrease_factor": 0.5,
+    "cooldown": 5.0
+}
+
+# 触发减并发的状态码：限流、权限被拒
+BACKOFF_STATUS_CODES = {403, 429}
+
+
+class ConcurrencyController:
+    """
+    自适应并发控制器 - 单例
+
+    - acquire()/release() 只在引擎事件循环线程中调用，用asyncio的Future排队，不需要加锁
+    - record() 记录每个请求的耗时和状态码，并据此调整并发上限
+    - current_limit / in_flight 可在任意线程读取，供GUI显示
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, config: Optional[Dict] = None):
+        # 传入配置时创建独立的控制器（测试使用），不影响全局共享的并发上限
+        if config is not None:
+            controller = super().__new__(cls)
+            controller._init_controller(config)
+            return controller
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_controller()
+        return cls._instance
+
+    def _init_controller(self, config: Optional[Dict] = None):
+        self._in_flight = 0
+        self._waiters = deque()
+        self.reload(config)
+
+    def reload(self, config: Optional[Dict] = None):
+        """重新加载并发配置，并把并发上限重置为初始值"""
+        if config is None:
+            from ..system_config.config import SystemConfig
+            config = SystemConfig().get_concurrency_config()
+        merged = dict(DEFAULT_CONCURRENCY_CONFIG)
+        merged.update(config or {})
+        self.config = merged
+        self.enabled = bool(merged.get("enabled", True))
+        self.min_limit = max(1, int(merged["min"]))
+        self.max_limit = max(self.min_limit, int(merged["max"]))
+        self._limit = min(self.max_limit, max(self.min_limit, int(merged["initial"])))
+        self._window: List[Tuple[float, bool]] = []
+        self._last_decrease = 0.0
+
+    @property
+    def current_limit(self) -> int:
+        """当前允许的最大在途请求数"""
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        """当前在途的请求数"""
+        return self._in_flight
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取当前并发状态，供GUI显示"""
+        return {
+            "limit": self._limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "max": self.max_limit
+        }
+
+    async def acquire(self):
+        """获取一个并发名额，名额不足时排队等待（协程）"""
+        if not self.enabled:
+            return
+        if self._in_flight < self._limit and not self._waiters:
+            self._in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 已经被分配了名额但调用方被取消，需要把名额还回去
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def release(self):
+        """归还一个并发名额，并唤醒排队中的请求"""
+        if not self.enabled:
+            return
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        while self._waiters and self._in_flight < self._limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
+
+    def record(self, latency: float, status_code: Optional[int]):
+        """
+        记录一次请求结果并调整并发上限
+
+        Args:
+            latency: 请求耗时（秒）
+            status_code: HTTP状态码，网络错误时传None
+        """
+        if not self.enabled:
+            return
+        if status_code in BACKOFF_STATUS_CODES or (status_code is not None and status_code >= 500):
+            self._decrease()
+            return
+
+        self._window.append((latency, status_code is None))
+        if len(self._window) < int(self.config["window"]):
+            return
+
+        latencies = sorted(item[0] for item in self._window)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        error_rate = sum(1 for item in self._window if item[1]) / len(self._window)
+        self._window = []
+
+        if error_rate > float(self.config["error_rate_threshold"]):
+            self._decrease()
+        elif p95 <= float(self.config["p95_latency_threshold"]) and self._limit < self.max_limit:
+            self._limit += 1
+            self._wake_waiters()
+
+    def _decrease(self):
+        """乘性减：冷却期内只减一次"""
+        now = time.monotonic()
+        if now - self._last_decrease < float(self.config["cooldown"]):
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, int(self._limit * float(self.config["decrease_factor"])))
+        self._window = []
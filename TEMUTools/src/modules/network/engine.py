@@ -0,0 +1,236 @@
+"""
+异步HTTP引擎模块
+所有NetworkRequest实例共享同一个事件循环线程和同一个长连接池
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# httpx为可选依赖：安装后使用原生asyncio连接池（装了h2时启用HTTP/2），
+# 未安装时退回到线程池 + requests连接池，对调用方保持同样的接口
+try:
+    import httpx
+    # httpx默认会为每个请求打印一条INFO日志，关闭以免刷屏
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = httpx is not None
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HttpResponse:
+    """统一的响应对象，屏蔽httpx和requests之间的差异"""
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str], url: str, http_version: str = "HTTP/1.1"):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+        self.http_version = http_version
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class RequestError(Exception):
+    """网络层错误（连接失败、超时等）"""
+
+
+class ConnectError(RequestError):
+    """连接阶段失败（无法建立连接、连接超时、等待连接池超时），请求一定没有发出"""
+
+
+class HttpStatusError(RequestError):
+    """HTTP状态码错误（4xx/5xx）"""
+
+    def __init__(self, response: HttpResponse):
+        super().__init__(f"HTTP {response.status_code} - {response.url}")
+        self.response = response
+        self.status_code = response.status_code
+
+
+class AsyncHttpEngine:
+    """
+    异步HTTP引擎 - 单例
+
+    - 在后台守护线程中运行一个asyncio事件循环
+    - 所有模块共享一个连接池（HTTP/1.1 keep-alive，可用时为HTTP/2）
+    - 提供协程接口 request()/download()，以及给同步代码使用的 run()/run_all()
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    # 连接池默认参数
+    max_connections = 32
+    max_keepalive_connections = 16
+    timeout = 30.0
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_engine()
+        return cls._instance
+
+    def _init_engine(self):
+        """初始化事件循环线程"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="AsyncHttpEngine", daemon=True)
+        self._thread.start()
+        # 客户端在事件循环线程中首次使用时创建
+        self._client = None
+        self._session = None
+        self._executor = None
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def backend(self) -> str:
+        """当前使用的HTTP后端"""
+        if httpx is None:
+            return "requests"
+        return "httpx-h2" if HTTP2_AVAILABLE else "httpx"
+
+    def _get_client(self):
+        """获取共享的httpx异步客户端"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                ),
+                timeout=self.timeout
+            )
+        return self._client
+
+    def _get_session(self) -> requests.Session:
+        """获取共享的requests会话（未安装httpx时使用）"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_connections)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+            self._executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="http")
+        return self._session
+
+    async def request(self, method: str, url: str, params: Optional[Dict] = None,
+                      json_data: Any = None, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        """
+        发送请求（协程）
+
+        状态码 >= 400 时抛出 HttpStatusError，连接阶段失败抛出 ConnectError，其他网络错误抛出 RequestError
+        """
+        if httpx is not None:
+            try:
+                resp = await self._get_client().request(method, url, params=params, json=json_data, headers=headers)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                raise ConnectError(str(e)) from e
+            except httpx.HTTPError as e:
+                raise RequestError(str(e)) from e
+            response = HttpResponse(resp.status_code, resp.content, dict(resp.headers), str(resp.url), resp.http_version)
+        else:
+            session = self._get_session()
+            call = functools.partial(session.request, method, url, params=params, json=json_data,
+                                     headers=headers, timeout=self.timeout)
+            try:
+                resp = await asyncio.get_running_loop().run_in_executor(self._executor, call)
+            except requests.exceptions.ConnectTimeout as e:
+                raise ConnectError(str(e)) from e
+            except requests.exceptions.RequestException as e:
+                raise RequestError(str(e)) from e
+            response = HttpResponse(resp.status_code, resp.content, dict(resp.headers), resp.url)
+
+        if response.status_code >= 400:
+            raise HttpStatusError(response)
+        return response
+
+    async def download(self, url: str, save_path: str, headers: Optional[Dict[str, str]] = None,
+                       chunk_size: int = 8192) -> None:
+        """流式下载文件（协程）"""
+        if httpx is not None:
+            try:
+                async with self._get_client().stream("GET", url, headers=headers) as resp:
+                    if resp.status_code >= 400:
+                        raise HttpStatusError(HttpResponse(resp.status_code, b"", dict(resp.headers), str(resp.url)))
+                    with open(save_path, 'wb') as f:
+                        async for chunk in resp.aiter_bytes(chunk_size):
+                            f.write(chunk)
+            except httpx.HTTPError as e:
+                raise RequestError(str(e)) from e
+            return
+
+        session = self._get_session()
+
+        def _download():
+            try:
+                resp = session.get(url, headers=headers, stream=True, timeout=self.timeout)
+                if resp.status_code >= 400:
+                    raise HttpStatusError(HttpResponse(resp.status_code, b"", dict(resp.headers), resp.url))
+                with open(save_path, 'wb') as f:
+                    for chunk in resp.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            f.write(chunk)
+            except requests.exceptions.RequestException as e:
+                raise RequestError(str(e)) from e
+
+        await asyncio.get_running_loop().run_in_executor(self._executor, _download)
+
+    def in_loop_thread(self) -> bool:
+        """当前线程是否就是引擎的事件循环线程"""
+        return threading.current_thread() is self._thread
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """在引擎事件循环中执行协程，并在当前线程阻塞等待结果（同步包装）"""
+        if self.in_loop_thread():
+            raise RuntimeError("不能在引擎事件循环线程中同步等待协程，请直接使用await")
+        return self.submit(coro).result(timeout)
+
+    def submit(self, coro: Awaitable) -> Future:
+        """把协程提交到引擎事件循环中执行，立即返回concurrent.futures.Future，不阻塞当前线程"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run_all(self, coros: Iterable[Awaitable], timeout: Optional[float] = None) -> List[Any]:
+        """并发执行多个协程，按传入顺序返回结果；单个协程的异常会作为结果返回"""
+        async def _gather():
+            return await asyncio.gather(*coros, return_exceptions=True)
+        return self.run(_gather(), timeout)
+
+    def shutdown(self):
+        """关闭连接池和事件循环，通常在程序退出时调用"""
+        async def _close():
+            if self._client is not None:
+                await self._client.aclose()
+                self._client = None
+        try:
+            self.run(_close(), timeout=5)
+        except Exception:
+            pass
+        if self._session is not None:
+            self._session.close()
+            self._executor.shutdown(wait=False)
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        with AsyncHttpEngine._lock:
+            AsyncHttpEngine._instance = None
@@ -0,0 +1,102 @@
+"""
+分页并发预取模块
+对于已知总数的分页接口，提前并发发出后续页的请求（由限流器和并发控制器统一节流），
+再按页码顺序交给调用方，并去掉因为数据变动而在相邻两页重复出现的条目
+"""
+
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .request import NetworkRequest
+
+# 流式迭代时默认最多提前发出的页数
+DEFAULT_PREFETCH = 8
+
+
+def page_count(total: int, page_size: int) -> int:
+    """根据总数和每页大小计算总页数"""
+    if total <= 0 or page_size <= 0:
+        return 0
+    return (total + page_size - 1) // page_size
+
+
+def iter_pages(request: NetworkRequest, fetch_page: Callable[[int], Awaitable[Any]],
+               pages: Iterable[int], stop_flag_callback: Optional[Callable[[], bool]] = None,
+               prefetch: int = DEFAULT_PREFETCH) -> Iterator[Tuple[int, Any]]:
+    """
+    按页码顺序逐页产出数据，同时保持最多prefetch页的请求在途
+
+    调用方拿到第一页就可以开始处理，不必等所有页都返回；提前退出迭代时未完成的请求会被取消
+
+    Args:
+        request: 网络请求实例（使用其共享的异步引擎）
+        fetch_page: 接收页码、返回该页结果的协程函数，失败时应返回None
+        pages: 需要获取的页码（按顺序）
+        stop_flag_callback: 停止标志回调，返回True时不再发出新的请求
+        prefetch: 最多提前发出的页数
+
+    Yields:
+        (页码, 结果)，失败、异常或被停止的页结果为None
+    """
+    def _stopped() -> bool:
+        return bool(stop_flag_callback and stop_flag_callback())
+
+    async def _fetch(page: int):
+        # 请求会先在限流器里排队，排到时再检查一次，停止后剩余的页直接跳过
+        if _stopped():
+            return None
+        return await fetch_page(page)
+
+    pending = deque()
+    page_iter = iter(pages)
+    try:
+        while True:
+            while len(pending) < max(1, prefetch) and not _stopped():
+                page = next(page_iter, None)
+                if page is None:
+                    break
+                pending.append((page, request.engine.submit(_fetch(page))))
+            if not pending:
+                return
+            page, future = pending.popleft()
+            try:
+                result = future.result()
+            except Exception as e:
+                request.logger.error(f"第 {page} 页数据获取异常: {str(e)}")
+                result = None
+            yield page, result
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def fetch_pages(request: NetworkRequest, fetch_page: Callable[[int], Awaitable[Any]],
+                pages: Iterable[int], stop_flag_callback: Optional[Callable[[], bool]] = None) -> Dict[int, Any]:
+    """
+    一次性并发获取多页数据
+
+    Returns:
+        按页码排序的 {页码: 结果}，失败、异常的页结果为None；停止后没有发出的页不在结果中
+    """
+    pages = sorted(pages)
+    return dict(iter_pages(request, fetch_page, pages, stop_flag_callback, prefetch=len(pages)))
+
+
+def iter_unique(items: Iterable[Any], key: Callable[[Any], Hashable]) -> Iterator[Any]:
+    """
+    按key去重，保留第一次出现的条目（流式版本）
+
+    翻页期间如果有数据新增或删除，同一条目可能在相邻两页各出现一次
+    """
+    seen = set()
+    for item in items:
+        item_key = key(item)
+        if item_key in seen:
+            continue
+        seen.add(item_key)
+        yield item
+
+
+def dedupe_items(items: Iterable[Any], key: Callable[[Any], Hashable]) -> List[Any]:
+    """按key去重，保留第一次出现的条目"""
+    return list(iter_unique(items, key))
@@ -0,0 +1,131 @@
+"""
+令牌桶限流模块
+按域名和接口路径对所有经过NetworkRequest的请求统一限速，取代各模块自己的随机sleep
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# 默认限流配置，可在 system_config.json 的 "rate_limit" 中覆盖
+DEFAULT_RATE_LIMIT_CONFIG = {
+    "enabled": True,
+    # 每个域名的默认速率（每秒请求数）和突发容量
+    "default_qps": 5.0,
+    "default_burst": 5,
+    # 可选的随机抖动（秒），在拿到令牌后再额外等待，模拟人工操作
+    "jitter_min": 0.0,
+    "jitter_max": 0.0,
+    # 按域名覆盖: {"agentseller.temu.com": {"qps": 5, "burst": 5}}
+    "hosts": {},
+    # 按接口路径额外限速: {"/api/xxx": {"qps": 1, "burst": 1}}
+    "endpoints": {}
+}
+
+
+class TokenBucket:
+    """令牌桶：以固定速率补充令牌，最多积攒burst个"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """预占一个令牌，返回拿到令牌前需要等待的秒数（0表示立即可用）
+
+        令牌允许透支，后来的请求会排在前面的请求之后，保证先到先得
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    全局限流器 - 单例
+
+    每个请求需要同时拿到所在域名的令牌和（如果配置了）该接口路径的令牌
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, config: Optional[Dict] = None):
+        # 传入配置时创建独立的限流器（测试使用），不影响全局共享的实例
+        if config is not None:
+            limiter = super().__new__(cls)
+            limiter.reload(config)
+            return limiter
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance.reload()
+        return cls._instance
+
+    def reload(self, config: Optional[Dict] = None):
+        """重新加载限流配置，已有的令牌桶会被清空重建"""
+        if config is None:
+            from ..system_config.config import SystemConfig
+            config = SystemConfig().get_rate_limit_config()
+        merged = dict(DEFAULT_RATE_LIMIT_CONFIG)
+        merged.update(config or {})
+        self.config = merged
+        self.enabled = bool(merged.get("enabled", True))
+        self.jitter = (float(merged.get("jitter_min", 0)), float(merged.get("jitter_max", 0)))
+        # 直接替换整个字典，正在使用旧令牌桶的请求不受影响
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def _get_bucket(self, key: Tuple[str, str], rule: Dict) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    qps = float(rule.get("qps", self.config["default_qps"]))
+                    burst = int(rule.get("burst", self.config["default_burst"]))
+                    bucket = TokenBucket(qps, burst)
+                    self._buckets[key] = bucket
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """为一次请求预占令牌，返回需要等待的秒数（已包含抖动）"""
+        if not self.enabled:
+            return 0.0
+        parsed = urlparse(url)
+        host, path = parsed.netloc, parsed.path
+
+        host_rule = self.config["hosts"].get(host, {})
+        wait = self._get_bucket(("host", host), host_rule).reserve()
+
+        endpoint_rule = self.config["endpoints"].get(path)
+        if endpoint_rule:
+            wait = max(wait, self._get_bucket(("endpoint", path), endpoint_rule).reserve())
+
+        jitter_min, jitter_max = self.jitter
+        if jitter_max > 0:
+            wait += random.uniform(jitter_min, jitter_max)
+        return wait
+
+    async def acquire(self, url: str):
+        """等待直到该请求允许发出（协程）"""
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def wait(self, url: str):
+        """等待直到该请求允许发出（同步版本，供不经过NetworkRequest的请求使用）"""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
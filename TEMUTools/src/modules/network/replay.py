@@ -0,0 +1,302 @@
+"""
+流量录制/回放模块
+在不访问真实店铺后台的情况下压测、分析和回归测试核价、竞价等批量任务：
+
+- record 模式：正常请求线上接口，同时把每个请求和响应（不含请求头和Cookie）追加到gzip压缩的JSONL录制文件
+- replay 模式：在本机启动一个HTTP桩服务，所有请求改发到桩服务，由它按录制文件返回响应；
+  可以配置额外延迟、抖动和错误注入（按比例返回5xx），限流、并发控制、重试等网络层逻辑照常生效
+
+匹配规则：优先按 请求方法 + 接口路径 + 请求体（规范化JSON）完全匹配，同一个请求录到多次时按顺序轮流返回；
+没有完全匹配的录制时返回该接口最后录到的一个响应（fallback），接口从未录到时返回404
+"""
+
+import base64
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# 默认录制/回放配置，可在 system_config.json 的 "replay" 中覆盖
+DEFAULT_REPLAY_CONFIG = {
+    # off / record / replay
+    "mode": "off",
+    # 录制文件路径（gzip压缩的JSONL）
+    "archive": "",
+    # 回放时每个响应额外等待的毫秒数，以及在[0, jitter_ms]内的随机抖动
+    "latency_ms": 0,
+    "jitter_ms": 0,
+    # 回放时按这个比例随机返回错误状态码（用于测试重试和失败处理）
+    "error_rate": 0.0,
+    "error_statuses": [503],
+    # 没有完全匹配的录制时，是否返回同一接口最后录到的响应
+    "fallback": True
+}
+
+# 录制文件每写入这么多条记录同步刷新一次，程序崩溃时最多丢失这么多条
+_FLUSH_EVERY = 50
+
+
+def _canonical_body(body: Any) -> str:
+    """请求体的规范化表示：JSON按key排序后紧凑序列化，录制和回放两端得到同样的字符串"""
+    if body is None or body == b"" or body == "":
+        return ""
+    if isinstance(body, (bytes, str)):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return body.decode("utf-8", errors="replace") if isinstance(body, bytes) else body
+    return json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _canonical_query(pairs: List[Tuple[str, str]]) -> str:
+    return "&".join(f"{k}={v}" for k, v in sorted(pairs))
+
+
+def request_key(method: str, path: str, query: str, body: str) -> str:
+    return f"{method.upper()} {path}?{query}\n{body}"
+
+
+class TrafficArchive:
+    """录制文件：一行一个请求/响应，gzip压缩"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+        self._unflushed = 0
+
+    def append(self, method: str, url: str, params: Optional[Dict], data: Any, status: int,
+               content: bytes, content_type: Optional[str] = None):
+        """追加一条记录（由录制模式下的请求线程调用）"""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query) + [(str(k), str(v)) for k, v in (params or {}).items()]
+        try:
+            text, encoding = content.decode("utf-8"), None
+        except UnicodeDecodeError:
+            text, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        entry = {
+            "ts": round(time.time(), 3),
+            "method": method.upper(),
+            "host": parts.netloc,
+            "path": parts.path,
+            "query": _canonical_query(query),
+            "body": _canonical_body(data),
+            "status": status,
+            "content_type": content_type,
+            "response": text,
+        }
+        if encoding:
+            entry["encoding"] = encoding
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                # 追加模式会在文件末尾新开一个gzip成员，读取时自动拼接
+                self._file = gzip.open(self.path, "ab")
+            self._file.write(line)
+            self._unflushed += 1
+            if self._unflushed >= _FLUSH_EVERY:
+                self._file.flush()
+                self._unflushed = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @staticmethod
+    def load(path: str) -> List[Dict]:
+        """读取录制文件中的所有记录（末尾不完整的记录被忽略）"""
+        entries = []
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break
+        except EOFError:
+            # 录制时程序被中断，最后一段没有写完
+            pass
+        return entries
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """桩服务的请求处理：查找录制的响应，按配置加上延迟和错误注入"""
+
+    server: "ReplayServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _serve(self):
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length else b""
+        parts = urlsplit(self.path)
+        status, content, content_type = self.server.lookup(
+            self.command, parts.path, _canonical_query(parse_qsl(parts.query)), _canonical_body(body)
+        )
+        self.send_response(status)
+        self.send_header("content-type", content_type or "application/json")
+        self.send_header("content-length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    回放桩服务，在本机随机端口上运行
+
+    - lookup() 按请求找录制的响应
+    - stats 统计完全匹配、fallback、未录到和注入错误的次数
+    """
+
+    daemon_threads = True
+
+    def __init__(self, entries: List[Dict], config: Dict):
+        super().__init__(("127.0.0.1", 0), _ReplayHandler)
+        self.config = config
+        self._exact: Dict[str, List[Dict]] = {}
+        self._by_path: Dict[str, Dict] = {}
+        for entry in entries:
+            key = request_key(entry["method"], entry["path"], entry.get("query", ""), entry.get("body", ""))
+            self._exact.setdefault(key, []).append(entry)
+            self._by_path[f"{entry['method']} {entry['path']}"] = entry
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"exact": 0, "fallback": 0, "missing": 0, "injected": 0}
+        self.entry_count = len(entries)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="replay-server", daemon=True).start()
+
+    def _delay(self):
+        delay = float(self.config["latency_ms"]) + random.uniform(0, float(self.config["jitter_ms"]))
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def lookup(self, method: str, path: str, query: str, body: str) -> Tuple[int, bytes, Optional[str]]:
+        self._delay()
+        if random.random() < float(self.config["error_rate"]):
+            with self._lock:
+                self.stats["injected"] += 1
+            return random.choice(self.config["error_statuses"]), b"", None
+        key = request_key(method, path, query, body)
+        with self._lock:
+            candidates = self._exact.get(key)
+            if candidates:
+                index = self._cursor.get(key, 0)
+                self._cursor[key] = index + 1
+                entry = candidates[index % len(candidates)]
+                self.stats["exact"] += 1
+            else:
+                entry = self._by_path.get(f"{method} {path}") if self.config["fallback"] else None
+                self.stats["fallback" if entry is not None else "missing"] += 1
+        if entry is None:
+            content = json.dumps({"success": False, "errorMsg": f"回放文件中没有录到 {method} {path}"},
+                                 ensure_ascii=False).encode("utf-8")
+            return 404, content, "application/json"
+        if entry.get("encoding") == "base64":
+            content = base64.b64decode(entry["response"])
+        else:
+            content = entry["response"].encode("utf-8")
+        return entry["status"], content, entry.get("content_type")
+
+
+class TrafficReplay:
+    """
+    录制/回放控制器 - 单例
+
+    - configure() 切换模式（命令行参数或测试代码调用），不调用时使用 system_config.json 中的 "replay"
+    - target_url() 回放模式下把请求地址改写到本机桩服务
+    - record() 录制模式下保存请求和响应
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_replay()
+        return cls._instance
+
+    def _init_replay(self):
+        self.logger = logging.getLogger('replay')
+        self.archive: Optional[TrafficArchive] = None
+        self.server: Optional[ReplayServer] = None
+        self.configure()
+
+    def configure(self, config: Optional[Dict] = None):
+        """重新设置录制/回放模式（会关闭当前的录制文件和桩服务）"""
+        if config is None:
+            from ..system_config.config import SystemConfig
+            config = SystemConfig().get_replay_config()
+        merged = dict(DEFAULT_REPLAY_CONFIG)
+        merged.update(config or {})
+        self.close()
+        self.config = merged
+        self.mode = merged["mode"] if merged.get("archive") else "off"
+        self.recording = self.mode == "record"
+        self.replaying = self.mode == "replay"
+        if self.recording:
+            self.archive = TrafficArchive(merged["archive"])
+            self.logger.info(f"录制模式：请求和响应将保存到 {merged['archive']}")
+        elif self.replaying:
+            try:
+                entries = TrafficArchive.load(merged["archive"])
+            except OSError as e:
+                self.logger.error(f"读取录制文件失败，回放模式未开启: {str(e)}")
+                self.mode = "off"
+                self.replaying = False
+                return
+            self.server = ReplayServer(entries, merged)
+            self.server.start()
+            self.logger.info(f"回放模式：从 {merged['archive']} 回放 {len(entries)} 条录制，桩服务 {self.server.base_url}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def target_url(self, url: str) -> str:
+        """回放模式下把请求地址的协议和域名替换为本机桩服务"""
+        if not self.replaying:
+            return url
+        parts = urlsplit(url)
+        target = self.server.base_url + parts.path
+        return f"{target}?{parts.query}" if parts.query else target
+
+    def record(self, method: str, url: str, params: Optional[Dict], data: Any, status: int,
+               content: bytes, content_type: Optional[str] = None):
+        if self.recording:
+            try:
+                self.archive.append(method, url, params, data, status, content, content_type)
+            except OSError as e:
+                self.logger.warning(f"写入录制文件失败: {str(e)}")
+
+    def stats(self) -> Optional[Dict[str, int]]:
+        """回放统计，非回放模式返回None"""
+        return dict(self.server.stats) if self.server is not None else None
+
+    def close(self):
+        """关闭录制文件和桩服务"""
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -1,22 +1,44 @@
-import requests
-import tkinter as tk
-from tkinter import messagebox
-from typing import Dict, Optional, Any
-import threading
+import asyncio
+import json
+import time
+from typing import Dict, Optional, Any, Tuple
 import platform
 import subprocess
-import os
 from ..system_config.config import SystemConfig
 from ..logger.logger import Logger
 from .event_manager import EventManager
+from .engine import AsyncHttpEngine, HttpStatusError, RequestError
+from .rate_limiter import RateLimiter
+from .concurrency import ConcurrencyController
+from .response_cache import ResponseCache
+from .retry import RetryPolicy
+from .request_log import RequestLog, RequestRecord
+from .replay import TrafficReplay
+from ..jobs.journal import current_job_id
 
 class NetworkRequest:
     """网络请求封装类"""
     
+    # 是否允许弹窗提示配置错误；命令行模式下设为False，403只记录日志并发布配置错误事件
+    interactive = True
+    
     def __init__(self):
         self.config = SystemConfig()
         self.logger = Logger()
-        self.session = requests.Session()
+        # 所有实例共享同一个异步引擎和连接池
+        self.engine = AsyncHttpEngine()
+        # 按域名/接口统一限流，取代各模块自己的随机延时
+        self.rate_limiter = RateLimiter()
+        # 根据延迟和429/5xx/403自动调整在途请求数
+        self.concurrency = ConcurrencyController()
+        # 只读接口的持久化响应缓存（只有在配置中设置了TTL的接口才会缓存）
+        self.cache = ResponseCache()
+        # 失败重试策略（写接口只在请求确定没有发出时重试）
+        self.retry = RetryPolicy()
+        # 结构化请求日志（后台线程写入 logs/requests_*.jsonl）
+        self.request_log = RequestLog()
+        # 流量录制/回放（默认关闭）
+        self.replay = TrafficReplay()
         # 用于存储根窗口的引用
         self._root_window = None
         self._is_macos = platform.system() == "Darwin"
@@ -26,6 +48,9 @@ class NetworkRequest:
         
     def _show_config_error_dialog(self, error_msg: str):
         """显示配置错误弹窗 - 跨平台兼容"""
+        if not NetworkRequest.interactive:
+            self.logger.error("请检查 system_config.json 中的Cookie和MallID设置")
+            return
         try:
             if self._is_macos:
                 # macOS: 使用系统原生通知
@@ -78,6 +103,10 @@ class NetworkRequest:
     def _show_windows_dialog(self, error_msg: str):
         """在 Windows 上显示 tkinter 弹窗"""
         try:
+            # 只在需要弹窗时才导入tkinter，命令行模式不依赖图形界面
+            import tkinter as tk
+            from tkinter import messagebox
+            
             # 创建隐藏的根窗口来显示弹窗
             if self._root_window is None:
                 self._root_window = tk.Tk()
@@ -105,159 +134,239 @@ class NetworkRequest:
                     pass
                 self._root_window = None
         
+    # 请求头模板中除cookie/mallid外的固定部分
+    _BASE_HEADERS = {
+        "accept": "*/*",
+        "accept-encoding": "gzip, deflate, br, zstd",
+        "accept-language": "zh-CN,zh;q=0.9,en;q=0.8",
+        "anti-content": "",
+        "cache-control": "max-age=0",
+        "content-type": "application/json",
+        "origin": "https://agentseller.temu.com",
+        "referer": "https://agentseller.temu.com",
+        "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
+        "sec-ch-ua-mobile": "?1",
+        "sec-ch-ua-platform": '"Android"',
+        "sec-fetch-dest": "empty",
+        "sec-fetch-mode": "cors",
+        "sec-fetch-site": "same-origin",
+        "user-agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Mobile Safari/537.36"
+    }
+    
+    # 所有实例共享的请求头缓存: (配置版本号, 请求头字典)
+    _headers_cache: Optional[Tuple[int, Dict[str, str]]] = None
+    
+    def _cached_headers(self) -> Dict[str, str]:
+        """获取缓存的请求头（只读，不要修改返回值）
+        
+        只有当SystemConfig的版本号变化（update_config被调用）时才重新构建
+        """
+        cache = NetworkRequest._headers_cache
+        if cache is not None and cache[0] == self.config.version:
+            return cache[1]
+        version, cookie, mallid = self.config.get_auth_snapshot()
+        headers = dict(self._BASE_HEADERS)
+        headers["cookie"] = cookie
+        headers["mallid"] = mallid
+        NetworkRequest._headers_cache = (version, headers)
+        return headers
+        
     def _get_headers(self) -> Dict[str, str]:
-        """获取请求头"""
-        cookie = self.config.get_cookie()
-        mallid = self.config.get_mallid()
-        return {
-            "accept": "*/*",
-            "accept-encoding": "gzip, deflate, br, zstd",
-            "accept-language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "anti-content": "",
-            "cache-control": "max-age=0",
-            "content-type": "application/json",
-            "cookie": cookie,
-            "mallid": mallid,
-            "origin": "https://agentseller.temu.com",
-            "referer": "https://agentseller.temu.com",
-            "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
-            "sec-ch-ua-mobile": "?1",
-            "sec-ch-ua-platform": '"Android"',
-            "sec-fetch-dest": "empty",
-            "sec-fetch-mode": "cors",
-            "sec-fetch-site": "same-origin",
-            "user-agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Mobile Safari/537.36"
-        }
+        """获取请求头（返回副本，调用方可以自由修改）"""
+        return dict(self._cached_headers())
         
-    def get(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
-        """发送GET请求"""
+    def _handle_forbidden(self, request_type: str):
+        """处理403错误：弹窗提示并发布配置错误事件"""
+        error_msg = f"{request_type}请求失败: 403 Forbidden - 访问被拒绝\n"
+        error_msg += f"可能原因：\n"
+        error_msg += f"1. Cookie已过期或无效\n"
+        error_msg += f"2. MallID配置错误\n"
+        error_msg += f"3. 权限不足\n"
+        error_msg += f"请检查系统配置中的Cookie和MallID设置"
+        self.logger.error(error_msg)
+        # 直接显示弹窗
+        self._show_config_error_dialog(error_msg)
+        # 发布配置错误事件，通知所有订阅的模块停止任务
+        self.event_manager.publish("config_error", error_code=403, error_message=error_msg, request_type=request_type)
+
+    async def _send(self, method: str, url: str, params: Optional[Dict], data: Any,
+                    headers: Dict[str, str]):
+        """在并发控制器的名额内发送请求，并把耗时和状态码反馈给控制器
+        
+        回放模式下请求改发到本机桩服务；录制模式下保存每一次收到的响应（包括重试前的失败响应）
+        """
+        await self.concurrency.acquire()
+        start = time.monotonic()
+        status_code = None
         try:
-            headers = self._get_headers()
-            response = self.session.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            self.logger.info(f"GET请求成功")
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
-                error_msg = f"GET请求失败: 403 Forbidden - 访问被拒绝\n"
-                error_msg += f"可能原因：\n"
-                error_msg += f"1. Cookie已过期或无效\n"
-                error_msg += f"2. MallID配置错误\n"
-                error_msg += f"3. 权限不足\n"
-                error_msg += f"请检查系统配置中的Cookie和MallID设置"
-                self.logger.error(error_msg)
-                # 直接显示弹窗
-                self._show_config_error_dialog(error_msg)
-                # 发布配置错误事件，通知所有订阅的模块停止任务
-                self.event_manager.publish("config_error", error_code=403, error_message=error_msg, request_type="GET")
-                return None
+            response = await self.engine.request(method, self.replay.target_url(url), params=params,
+                                                 json_data=data, headers=headers)
+            status_code = response.status_code
+            if self.replay.recording:
+                self.replay.record(method, url, params, data, response.status_code, response.content,
+                                   response.headers.get("content-type"))
+            return response
+        except HttpStatusError as e:
+            status_code = e.status_code
+            if self.replay.recording:
+                self.replay.record(method, url, params, data, e.status_code, e.response.content,
+                                   e.response.headers.get("content-type"))
+            raise
+        finally:
+            self.concurrency.release()
+            self.concurrency.record(time.monotonic() - start, status_code)
+
+    async def _send_with_retry(self, method: str, url: str, params: Optional[Dict], data: Any,
+                               headers: Dict[str, str], deadline: Optional[float] = None,
+                               record: Optional[RequestRecord] = None):
+        """按重试策略发送请求，每次尝试都重新经过限流器；整个调用不会超过截止时间"""
+        if deadline is None:
+            deadline = self.retry.deadline_for(url)
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            if record is not None:
+                record.attempts = attempt
+            await self.rate_limiter.acquire(url)
+            remaining = deadline - (time.monotonic() - start)
+            try:
+                if remaining <= 0:
+                    raise RequestError(f"超过截止时间 {deadline:.0f} 秒")
+                try:
+                    return await asyncio.wait_for(self._send(method, url, params, data, headers), remaining)
+                except asyncio.TimeoutError:
+                    raise RequestError(f"超过截止时间 {deadline:.0f} 秒") from None
+            except RequestError as e:
+                delay = self.retry.next_delay(method, url, e, attempt, time.monotonic() - start, deadline)
+                if delay is None:
+                    raise
+                self.logger.warning(f"{method}请求第{attempt}次失败: {str(e)}，{delay:.1f}秒后重试, url: {url}")
+                await asyncio.sleep(delay)
+
+    async def _arequest(self, method: str, url: str, params: Optional[Dict] = None,
+                        data: Optional[Dict[str, Any]] = None, bypass_cache: bool = False,
+                        deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送请求并解析JSON响应（协程），失败返回None
+        
+        接口配置了缓存TTL时先查缓存；bypass_cache=True时跳过缓存直接请求，并用新响应刷新缓存。
+        失败时按重试策略自动重试（只有幂等接口会在请求可能已经发出后重试），
+        deadline为整个调用（包括重试）的最长秒数，为None时使用配置值
+        """
+        record = self.request_log.new_record(method, url, current_job_id())
+        payload = data if data is not None else params
+        response_content = None
+        # 录制/回放时不使用响应缓存，保证每个请求都经过网络（录到或由桩服务返回）
+        ttl = self.cache.ttl_for(url) if method in ("GET", "POST") and not self.replay.enabled else None
+        entry = None
+        if ttl:
+            cache_key = self.cache.make_key(method, url, params, data, self.config.get_mallid())
+            if bypass_cache:
+                self.cache.record("bypass")
+                record.cache = "bypass"
             else:
-                self.logger.error(f"GET请求失败: HTTP {e.response.status_code} - {str(e)}")
-                return None
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"GET请求失败: {str(e)}")
-            return None
-            
-    def post(self, url: str, data: Dict[str, Any]) -> Optional[Dict]:
-        """发送POST请求"""
+                entry = await self.cache.alookup(cache_key)
+                if entry is not None and entry.fresh:
+                    self.cache.record("hit", entry.fetch_seconds)
+                    record.cache = "hit"
+                    record.bytes = len(entry.content)
+                    self.request_log.submit(record, payload, entry.content)
+                    return json.loads(entry.content)
         try:
-            headers = self._get_headers()
-            response = self.session.post(url, json=data, headers=headers)
-            response.raise_for_status()
-            self.logger.info(f"POST请求成功, url: {url}, 参数: {data} ,状态码: {response.status_code}, 响应内容: {response.text[:200]}")
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
-                error_msg = f"POST请求失败: 403 Forbidden - 访问被拒绝\n"
-                error_msg += f"可能原因：\n"
-                error_msg += f"1. Cookie已过期或无效\n"
-                error_msg += f"2. MallID配置错误\n"
-                error_msg += f"3. 权限不足\n"
-                error_msg += f"请检查系统配置中的Cookie和MallID设置"
-                self.logger.error(error_msg)
-                # 直接显示弹窗
-                self._show_config_error_dialog(error_msg)
-                # 发布配置错误事件，通知所有订阅的模块停止任务
-                self.event_manager.publish("config_error", error_code=403, error_message=error_msg, request_type="POST")
-                return None
+            headers = self._cached_headers()
+            if entry is not None and entry.etag:
+                # 缓存已过期但有ETag，用条件请求确认内容是否变化
+                headers = dict(headers, **{"if-none-match": entry.etag})
+            start = time.monotonic()
+            response = await self._send_with_retry(method, url, params, data, headers, deadline, record)
+            record.latency = time.monotonic() - record.start
+            response_content = response.content
+            record.status = response.status_code
+            record.bytes = len(response_content)
+            if ttl:
+                if response.status_code == 304 and entry is not None:
+                    await self.cache.atouch(cache_key, ttl)
+                    self.cache.record("revalidated", entry.fetch_seconds)
+                    record.cache = "revalidated"
+                    return json.loads(entry.content)
+                if not bypass_cache:
+                    self.cache.record("miss")
+                    record.cache = "miss"
+            result = response.json()
+            if isinstance(result, dict) and "success" in result:
+                record.success = bool(result["success"])
+            # 只缓存业务上成功的响应
+            if ttl and isinstance(result, dict) and result.get("success", True):
+                await self.cache.astore(cache_key, url, response.content, ttl,
+                                       etag=response.headers.get("etag"), fetch_seconds=time.monotonic() - start)
+            return result
+        except HttpStatusError as e:
+            record.latency = time.monotonic() - record.start
+            response_content = e.response.content
+            record.status = e.status_code
+            record.bytes = len(response_content)
+            record.error = str(e)
+            if e.status_code == 403:
+                # 弹窗会阻塞，放到线程池中执行，避免卡住共享的事件循环
+                await asyncio.get_running_loop().run_in_executor(None, self._handle_forbidden, method)
             else:
-                self.logger.error(f"POST请求失败: HTTP {e.response.status_code} - {str(e)}")
-                return None
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"POST请求失败: {str(e)}")
+                self.logger.error(f"{method}请求失败: HTTP {e.status_code} - {str(e)}")
             return None
-            
-    def put(self, url: str, data: Dict[str, Any]) -> Optional[Dict]:
-        """发送PUT请求"""
-        try:
-            headers = self._get_headers()
-            response = self.session.put(url, json=data, headers=headers)
-            response.raise_for_status()
-            self.logger.info(f"PUT请求成功")
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
-                error_msg = f"PUT请求失败: 403 Forbidden - 访问被拒绝\n"
-                error_msg += f"可能原因：\n"
-                error_msg += f"1. Cookie已过期或无效\n"
-                error_msg += f"2. MallID配置错误\n"
-                error_msg += f"3. 权限不足\n"
-                error_msg += f"请检查系统配置中的Cookie和MallID设置"
-                self.logger.error(error_msg)
-                # 直接显示弹窗
-                self._show_config_error_dialog(error_msg)
-                # 发布配置错误事件，通知所有订阅的模块停止任务
-                self.event_manager.publish("config_error", error_code=403, error_message=error_msg, request_type="PUT")
-                return None
-            else:
-                self.logger.error(f"PUT请求失败: HTTP {e.response.status_code} - {str(e)}")
-                return None
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"PUT请求失败: {str(e)}")
+        except RequestError as e:
+            record.error = str(e)
+            self.logger.error(f"{method}请求失败: {str(e)}")
             return None
-            
-    def delete(self, url: str) -> Optional[Dict]:
-        """发送DELETE请求"""
-        try:
-            headers = self._get_headers()
-            response = self.session.delete(url, headers=headers)
-            response.raise_for_status()
-            self.logger.info(f"DELETE请求成功")
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
-                error_msg = f"DELETE请求失败: 403 Forbidden - 访问被拒绝\n"
-                error_msg += f"可能原因：\n"
-                error_msg += f"1. Cookie已过期或无效\n"
-                error_msg += f"2. MallID配置错误\n"
-                error_msg += f"3. 权限不足\n"
-                error_msg += f"请检查系统配置中的Cookie和MallID设置"
-                self.logger.error(error_msg)
-                # 直接显示弹窗
-                self._show_config_error_dialog(error_msg)
-                # 发布配置错误事件，通知所有订阅的模块停止任务
-                self.event_manager.publish("config_error", error_code=403, error_message=error_msg, request_type="DELETE")
-                return None
-            else:
-                self.logger.error(f"DELETE请求失败: HTTP {e.response.status_code} - {str(e)}")
-                return None
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"DELETE请求失败: {str(e)}")
+        except ValueError as e:
+            record.error = f"响应不是有效的JSON - {str(e)}"
+            self.logger.error(f"{method}请求失败: 响应不是有效的JSON - {str(e)}")
             return None
-            
+        finally:
+            self.request_log.submit(record, payload, response_content)
+
+    async def aget(self, url: str, params: Optional[Dict] = None, bypass_cache: bool = False,
+                   deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送GET请求（协程）"""
+        return await self._arequest("GET", url, params=params, bypass_cache=bypass_cache, deadline=deadline)
+
+    async def apost(self, url: str, data: Dict[str, Any], bypass_cache: bool = False,
+                    deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送POST请求（协程）"""
+        return await self._arequest("POST", url, data=data, bypass_cache=bypass_cache, deadline=deadline)
+
+    async def aput(self, url: str, data: Dict[str, Any], deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送PUT请求（协程）"""
+        return await self._arequest("PUT", url, data=data, deadline=deadline)
+
+    async def adelete(self, url: str, deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送DELETE请求（协程）"""
+        return await self._arequest("DELETE", url, deadline=deadline)
+
+    def get(self, url: str, params: Optional[Dict] = None, bypass_cache: bool = False,
+            deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送GET请求"""
+        return self.engine.run(self.aget(url, params, bypass_cache, deadline))
+
+    def post(self, url: str, data: Dict[str, Any], bypass_cache: bool = False,
+             deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送POST请求"""
+        return self.engine.run(self.apost(url, data, bypass_cache, deadline))
+
+    def put(self, url: str, data: Dict[str, Any], deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送PUT请求"""
+        return self.engine.run(self.aput(url, data, deadline))
+
+    def delete(self, url: str, deadline: Optional[float] = None) -> Optional[Dict]:
+        """发送DELETE请求"""
+        return self.engine.run(self.adelete(url, deadline))
+
     def download_file(self, url: str, save_path: str) -> bool:
         """下载文件"""
         try:
-            headers = self._get_headers()
-            response = self.session.get(url, headers=headers, stream=True)
-            response.raise_for_status()
-            
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            self.rate_limiter.wait(url)
+            headers = self._cached_headers()
+            self.engine.run(self.engine.download(url, save_path, headers=headers))
             return True
-        except requests.exceptions.RequestException as e:
+        except RequestError as e:
             self.logger.error(f"文件下载失败: {str(e)}")
             return False
             
@@ -0,0 +1,256 @@
+"""
+请求日志模块
+每个HTTP请求记录一行JSON（接口、状态码、耗时、字节数、重试次数、所属任务），
+写入 logs/requests_YYYYMMDD.jsonl，便于事后用脚本统计慢接口和失败率。
+请求线程只把记录放进队列，序列化和写文件都在后台线程中完成；
+请求体和响应内容只按采样率（以及失败时）记录，并截断到配置的长度
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+# 默认请求日志配置，可在 system_config.json 的 "request_log" 中覆盖
+DEFAULT_REQUEST_LOG_CONFIG = {
+    "enabled": True,
+    # 记录请求体和响应内容的比例（0~1），0表示只记录请求的统计信息
+    "payload_sample_rate": 0.0,
+    # 失败的请求（HTTP错误、网络错误、业务success为false）总是记录请求体和响应内容
+    "payload_on_failure": True,
+    # 请求体和响应内容最多记录的字符数
+    "max_payload_chars": 2000,
+    # 队列中最多积压的记录数，写入跟不上时丢弃新记录（不阻塞请求）
+    "max_queue": 10000,
+    # 请求日志文件保留天数
+    "keep_days": 7
+}
+
+
+def _default_log_dir() -> str:
+    """日志目录：打包环境放在可执行文件旁边，开发环境放在源码目录下"""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(base_path, 'logs')
+
+
+class RequestRecord:
+    """一次请求的记录，在请求过程中逐步填写，完成后交给 RequestLog.submit()"""
+
+    __slots__ = ("ts", "method", "url", "job", "start", "status", "latency", "bytes",
+                 "attempts", "cache", "success", "error", "request", "response")
+
+    def __init__(self, method: str, url: str, job: Optional[str] = None):
+        self.ts = time.time()
+        self.method = method
+        self.url = url
+        self.job = job
+        self.start = time.monotonic()
+        self.status: Optional[int] = None
+        self.latency: Optional[float] = None
+        self.bytes = 0
+        self.attempts = 0
+        self.cache: Optional[str] = None
+        self.success: Optional[bool] = None
+        self.error: Optional[str] = None
+        # 采样到的请求体和响应内容（原始对象，在后台线程中序列化和截断）
+        self.request: Any = None
+        self.response: Any = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or (self.status is not None and self.status >= 400) or self.success is False
+
+
+class RequestLog:
+    """
+    请求日志 - 单例
+
+    - new_record() 创建一条请求记录
+    - submit() 把记录放进队列（不做任何格式化），由后台线程写入JSONL文件
+    - flush() 等待队列中的记录全部写入（退出前或测试时使用）
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, log_dir: Optional[str] = None, config: Optional[Dict] = None):
+        # 指定日志目录或配置时创建独立的请求日志（测试使用），不影响全局共享的实例
+        if log_dir is not None or config is not None:
+            request_log = super().__new__(cls)
+            request_log._init_log(log_dir, config)
+            return request_log
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_log()
+        return cls._instance
+
+    def _init_log(self, log_dir: Optional[str] = None, config: Optional[Dict] = None):
+        self.logger = logging.getLogger('request_log')
+        self.log_dir = log_dir or _default_log_dir()
+        # 队列中是RequestRecord，或flush()放入的Event
+        self._queue: queue.Queue = queue.Queue()
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self.reload(config)
+
+    def reload(self, config: Optional[Dict] = None):
+        """重新加载请求日志配置"""
+        if config is None:
+            from ..system_config.config import SystemConfig
+            config = SystemConfig().get_request_log_config()
+        merged = dict(DEFAULT_REQUEST_LOG_CONFIG)
+        merged.update(config or {})
+        self.config = merged
+        self.enabled = bool(merged.get("enabled", True))
+        self.sample_rate = float(merged["payload_sample_rate"])
+        self.payload_on_failure = bool(merged["payload_on_failure"])
+        self.max_payload_chars = int(merged["max_payload_chars"])
+        self.max_queue = int(merged["max_queue"])
+
+    def new_record(self, method: str, url: str, job: Optional[str] = None) -> RequestRecord:
+        return RequestRecord(method, url, job)
+
+    def submit(self, record: RequestRecord, request_payload: Any = None, response_payload: Any = None):
+        """
+        提交一条已完成的请求记录
+
+        Args:
+            record: 请求记录
+            request_payload: 请求体/查询参数，只在被采样或失败时记录
+            response_payload: 响应内容（bytes或str），只在被采样或失败时记录
+        """
+        if not self.enabled:
+            return
+        if record.latency is None:
+            record.latency = time.monotonic() - record.start
+        if (self.payload_on_failure and record.failed) or (self.sample_rate and random.random() < self.sample_rate):
+            record.request = request_payload
+            record.response = response_payload
+        if self._queue.qsize() >= self.max_queue:
+            with self._dropped_lock:
+                self._dropped += 1
+            return
+        self._ensure_writer()
+        self._queue.put(record)
+
+    def flush(self, timeout: float = 5.0):
+        """等待队列中的记录全部写入文件"""
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="request-log-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._cleanup()
+        current_day = None
+        file = None
+        while True:
+            batch: List[Any] = [self._queue.get()]
+            # 一次取出积压的所有记录，合并成一次写入
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            waiters = []
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    continue
+                lines.append(self._to_json(item))
+            with self._dropped_lock:
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                lines.append(json.dumps({"ts": time.time(), "dropped": dropped}))
+            if lines:
+                day = datetime.now().strftime("%Y%m%d")
+                try:
+                    if day != current_day:
+                        if file is not None:
+                            file.close()
+                        file = open(os.path.join(self.log_dir, f"requests_{day}.jsonl"), "a", encoding="utf-8")
+                        current_day = day
+                    file.write("\n".join(lines) + "\n")
+                    file.flush()
+                except OSError as e:
+                    self.logger.warning(f"写入请求日志失败: {str(e)}")
+            for waiter in waiters:
+                waiter.set()
+
+    def _payload(self, value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            text = value[:self.max_payload_chars * 4].decode("utf-8", errors="replace")
+        elif isinstance(value, str):
+            text = value
+        else:
+            try:
+                text = json.dumps(value, ensure_ascii=False, default=str)
+            except (TypeError, ValueError, RuntimeError):
+                text = repr(value)
+        if len(text) > self.max_payload_chars:
+            text = text[:self.max_payload_chars] + "...(truncated)"
+        return text
+
+    def _to_json(self, record: RequestRecord) -> str:
+        parsed = urlparse(record.url)
+        entry = {
+            "ts": round(record.ts, 3),
+            "method": record.method,
+            "host": parsed.netloc,
+            "endpoint": parsed.path,
+            "status": record.status,
+            "latency_ms": round((record.latency or 0) * 1000, 1),
+            "bytes": record.bytes,
+            "retries": max(0, record.attempts - 1),
+            "job": record.job,
+        }
+        if record.cache is not None:
+            entry["cache"] = record.cache
+        if record.success is not None:
+            entry["success"] = record.success
+        if record.error is not None:
+            entry["error"] = record.error
+        if record.request is not None:
+            entry["request"] = self._payload(record.request)
+        if record.response is not None:
+            entry["response"] = self._payload(record.response)
+        return json.dumps(entry, ensure_ascii=False)
+
+    def _cleanup(self):
+        """删除超过保留天数的请求日志文件"""
+        cutoff = time.time() - float(self.config["keep_days"]) * 86400
+        try:
+            for name in os.listdir(self.log_dir):
+                if name.startswith("requests_") and name.endswith(".jsonl"):
+                    path = os.path.join(self.log_dir, name)
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+        except OSError as e:
+            self.logger.warning(f"清理请求日志失败: {str(e)}")
@@ -0,0 +1,245 @@
+"""
+HTTP响应缓存模块
+为很少变化的只读接口（资质类型枚举、合规模板等）提供持久化缓存：
+按 URL + 请求体 + mallid 作为key，每个接口单独配置TTL，磁盘上按LRU限制条数和总大小。
+网络层的协程通过 alookup() / astore() / atouch() 在线程池中读写数据库，不阻塞共享的事件循环
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+# 默认缓存配置，可在 system_config.json 的 "response_cache" 中覆盖
+DEFAULT_RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    # 磁盘缓存的最大条数和最大总字节数，超出后按最近最少使用淘汰
+    "max_entries": 500,
+    "max_bytes": 20 * 1024 * 1024,
+    # 只有在这里配置了TTL（秒）的接口路径才会被缓存
+    "endpoints": {}
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    content BLOB NOT NULL,
+    etag TEXT,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL,
+    fetch_seconds REAL NOT NULL DEFAULT 0
+);
+DROP INDEX IF EXISTS idx_responses_access;
+CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses (last_access, size);
+"""
+
+# 淘汰时每次按LRU顺序取出的最少条目数（按总大小淘汰时事先不知道要删除几条）
+_EVICT_BATCH = 16
+
+
+def _default_db_path() -> str:
+    """缓存数据库路径：打包环境放在可执行文件旁边，开发环境放在源码目录下"""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(base_path, 'cache', 'responses.db')
+
+
+class CacheEntry:
+    """一条缓存的响应"""
+
+    def __init__(self, key: str, content: bytes, etag: Optional[str], expires_at: float, fetch_seconds: float):
+        self.key = key
+        self.content = content
+        self.etag = etag
+        self.expires_at = expires_at
+        self.fetch_seconds = fetch_seconds
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class ResponseCache:
+    """
+    响应缓存 - 单例
+
+    - lookup() 查找缓存条目；过期但带ETag的条目可以用来做条件请求
+    - store() / touch() 保存新响应或在304后续期
+    - alookup() / astore() / atouch() 供协程调用，在线程池中执行上面的方法
+    - get_stats() 返回命中/未命中次数以及命中节省的请求耗时
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, db_path: Optional[str] = None, config: Optional[Dict] = None):
+        # 指定数据库路径或配置时创建独立的缓存（测试使用），不影响全局共享的实例
+        if db_path is not None or config is not None:
+            cache = super().__new__(cls)
+            cache._init_cache(db_path, config)
+            return cache
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._init_cache()
+        return cls._instance
+
+    def _init_cache(self, db_path: Optional[str] = None, config: Optional[Dict] = None):
+        self.db_path = db_path or _default_db_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+        self.reload(config)
+
+    def reload(self, config: Optional[Dict] = None):
+        """重新加载缓存配置"""
+        if config is None:
+            from ..system_config.config import SystemConfig
+            config = SystemConfig().get_response_cache_config()
+        merged = dict(DEFAULT_RESPONSE_CACHE_CONFIG)
+        merged.update(config or {})
+        self.config = merged
+        self.enabled = bool(merged.get("enabled", True))
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开数据库连接，退出时提交事务并关闭连接"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def ttl_for(self, url: str) -> Optional[float]:
+        """接口的缓存TTL（秒），未配置表示该接口不缓存"""
+        if not self.enabled:
+            return None
+        rule = self.config["endpoints"].get(urlparse(url).path)
+        if not rule:
+            return None
+        return float(rule.get("ttl", 0)) or None
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict], data: Any, mallid: str) -> str:
+        """由请求方法、URL、参数、请求体和mallid生成缓存key"""
+        body = json.dumps([params, data], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        raw = "\n".join([method, url, mallid, body])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """查找缓存条目（包括已过期的，调用方通过entry.fresh判断）"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT content, etag, expires_at, fetch_seconds FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(key, row[0], row[1], row[2], row[3])
+
+    def store(self, key: str, url: str, content: bytes, ttl: float, etag: Optional[str] = None,
+              fetch_seconds: float = 0.0):
+        """保存响应，并按LRU淘汰超出限制的条目"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, path, content, etag, expires_at, last_access, size, fetch_seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, urlparse(url).path, content, etag, now + ttl, now, len(content), fetch_seconds)
+            )
+            self._evict(conn)
+        with self._stats_lock:
+            self._stats["stores"] += 1
+
+    def touch(self, key: str, ttl: float):
+        """条件请求返回304时为条目续期"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?", (now + ttl, now, key)
+            )
+
+    async def alookup(self, key: str) -> Optional[CacheEntry]:
+        """lookup() 的协程版本"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.lookup, key)
+
+    async def astore(self, key: str, url: str, content: bytes, ttl: float, etag: Optional[str] = None,
+                     fetch_seconds: float = 0.0):
+        """store() 的协程版本"""
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.store, key, url, content, ttl, etag=etag, fetch_seconds=fetch_seconds)
+        )
+
+    async def atouch(self, key: str, ttl: float):
+        """touch() 的协程版本"""
+        await asyncio.get_running_loop().run_in_executor(None, self.touch, key, ttl)
+
+    def _evict(self, conn: sqlite3.Connection):
+        max_entries = int(self.config["max_entries"])
+        max_bytes = int(self.config["max_bytes"])
+        # 条数、总大小和LRU顺序都只读 (last_access, size) 索引，不读取响应内容
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        evicted = 0
+        while count > max_entries or total > max_bytes:
+            rows = conn.execute(
+                "SELECT rowid, size FROM responses ORDER BY last_access LIMIT ?",
+                (max(count - max_entries, _EVICT_BATCH),)
+            ).fetchall()
+            if not rows:
+                break
+            for rowid, size in rows:
+                if count <= max_entries and total <= max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE rowid = ?", (rowid,))
+                count -= 1
+                total -= size
+                evicted += 1
+        if not evicted:
+            return
+        with self._stats_lock:
+            self._stats["evictions"] += evicted
+
+    def clear(self):
+        """清空所有缓存"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def record(self, event: str, saved_seconds: float = 0.0):
+        """记录一次缓存事件：hit / miss / revalidated / bypass"""
+        with self._stats_lock:
+            self._stats[event] += 1
+            self._stats["saved_seconds"] += saved_seconds
+
+    def reset_stats(self):
+        """清零统计计数"""
+        with self._stats_lock:
+            self._stats = {
+                "hit": 0,
+                "miss": 0,
+                "revalidated": 0,
+                "bypass": 0,
+                "stores": 0,
+                "evictions": 0,
+                "saved_seconds": 0.0
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计：命中/未命中次数，以及命中所节省的请求耗时（秒）"""
+        with self._stats_lock:
+            return dict(self._stats)
@@ -0,0 +1,139 @@
+"""
+请求重试策略模块
+失败的请求按指数退避 + 随机抖动自动重试，并受每次调用的总截止时间约束；
+只有标记为幂等的接口才会在请求可能已经到达服务器后重试，避免改库存、提交议价等写操作被重复执行
+"""
+
+import random
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from .engine import ConnectError, HttpStatusError, RequestError
+
+# 默认重试配置，可在 system_config.json 的 "retry" 中覆盖
+DEFAULT_RETRY_CONFIG = {
+    "enabled": True,
+    # 每次调用最多尝试的次数（包括第一次）
+    "max_attempts": 3,
+    # 第n次重试前的等待上限为 min(max_delay, base_delay * 2^(n-1))，实际等待在[0, 上限]内随机
+    "base_delay": 0.5,
+    "max_delay": 8.0,
+    # 每次调用从第一次发出到最后一次重试的总时长上限（秒），超过后不再重试
+    "deadline_seconds": 60.0,
+    # 可以重试的HTTP状态码（403表示Cookie/权限问题，重试没有意义）
+    "retry_statuses": [429, 500, 502, 503, 504],
+    # 默认视为幂等的请求方法；TEMU的查询接口大多是POST，需要在endpoints中单独标记
+    "idempotent_methods": ["GET", "PUT", "DELETE"],
+    # 按接口路径覆盖: {"/api/xxx": {"idempotent": true, "max_attempts": 5, "deadline_seconds": 30}}
+    "endpoints": {}
+}
+
+
+class RetryPolicy:
+    """
+    重试策略 - 单例
+
+    - is_idempotent() 判断接口是否可以安全地重复发送
+    - next_delay() 根据错误类型、已尝试次数和截止时间决定是否重试，以及重试前等待多久
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, config: Optional[Dict] = None):
+        # 传入配置时创建独立的重试策略（测试使用），不影响全局共享的实例
+        if config is not None:
+            policy = super().__new__(cls)
+            policy.reload(config)
+            return policy
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance.reload()
+        return cls._instance
+
+    def reload(self, config: Optional[Dict] = None):
+        """重新加载重试配置"""
+        if config is None:
+            from ..system_config.config import SystemConfig
+            config = SystemConfig().get_retry_config()
+        merged = dict(DEFAULT_RETRY_CONFIG)
+        merged.update(config or {})
+        self.config = merged
+        self.enabled = bool(merged.get("enabled", True))
+        self.retry_statuses = set(int(s) for s in merged["retry_statuses"])
+        self.idempotent_methods = set(m.upper() for m in merged["idempotent_methods"])
+
+    def _rule(self, url: str) -> Dict:
+        return self.config["endpoints"].get(urlparse(url).path) or {}
+
+    def is_idempotent(self, method: str, url: str) -> bool:
+        """接口是否幂等：优先使用endpoints中的标记，否则按请求方法判断"""
+        rule = self._rule(url)
+        if "idempotent" in rule:
+            return bool(rule["idempotent"])
+        return method.upper() in self.idempotent_methods
+
+    def deadline_for(self, url: str) -> float:
+        """接口的单次调用总截止时长（秒）"""
+        return float(self._rule(url).get("deadline_seconds", self.config["deadline_seconds"]))
+
+    def max_attempts_for(self, url: str) -> int:
+        """接口的最大尝试次数"""
+        return max(1, int(self._rule(url).get("max_attempts", self.config["max_attempts"])))
+
+    def backoff(self, attempt: int) -> float:
+        """第attempt次重试前的等待时间（指数退避 + 完全随机抖动）"""
+        cap = min(float(self.config["max_delay"]), float(self.config["base_delay"]) * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    def is_retryable(self, error: RequestError, idempotent: bool) -> bool:
+        """
+        错误是否值得重试
+
+        连接阶段的失败说明请求没有发出，任何接口都可以重试；
+        其余错误（超时、连接中断、5xx等）时服务器可能已经执行了请求，只有幂等接口才重试
+        """
+        if isinstance(error, ConnectError):
+            return True
+        if not idempotent:
+            return False
+        if isinstance(error, HttpStatusError):
+            return error.status_code in self.retry_statuses
+        return True
+
+    def next_delay(self, method: str, url: str, error: RequestError, attempt: int,
+                   elapsed: float, deadline: Optional[float] = None) -> Optional[float]:
+        """
+        决定失败后是否重试
+
+        Args:
+            method: 请求方法
+            url: 请求URL
+            error: 本次失败的错误
+            attempt: 已经尝试的次数（从1开始）
+            elapsed: 从第一次发出到现在经过的秒数
+            deadline: 本次调用的总截止时长（秒），为None时使用配置值
+
+        Returns:
+            重试前需要等待的秒数；不应重试时返回None
+        """
+        if not self.enabled or attempt >= self.max_attempts_for(url):
+            return None
+        if not self.is_retryable(error, self.is_idempotent(method, url)):
+            return None
+        delay = self.backoff(attempt)
+        if isinstance(error, HttpStatusError):
+            # 服务器通过Retry-After明确告知了等待时间时，至少等这么久
+            retry_after = error.response.headers.get("retry-after") or error.response.headers.get("Retry-After")
+            try:
+                delay = max(delay, float(retry_after))
+            except (TypeError, ValueError):
+                pass
+        if deadline is None:
+            deadline = self.deadline_for(url)
+        if elapsed + delay >= deadline:
+            return None
+        return delay
@@ -1,12 +1,18 @@
+import contextvars
 import json
-import time
-import random
 import logging
+import queue
+import threading
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple, Iterator
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
 from ..network.request import NetworkRequest
+from ..network.paginator import iter_pages, iter_unique, page_count
 from ..config.config import category_config
+from ..config.global_config_manager import GlobalConfigManager
+from ..jobs import Job, JobJournal
+from .decision import (ACCEPT, ACTION_NAMES, REBARGAIN, ReviewDecision, ReviewRow, decide, decision_applied,
+                       review_order_of)
 
 # 配置日志
 logging.basicConfig(
@@ -163,8 +169,12 @@ class PriceReviewSuggestion:
     canAppeal: bool
     canAppealTime: Optional[int] = None
 
+# 默认预取核价建议的商品数（global_config.json 中的 "suggestion_prefetch"）
+DEFAULT_SUGGESTION_PREFETCH = 20
+
 class PriceReviewCrawler:
-    def __init__(self, cookie: str, logger: logging.Logger, progress_callback=None, stop_flag_callback=None):
+    def __init__(self, cookie: str, logger: logging.Logger, progress_callback=None, stop_flag_callback=None,
+                 request: Optional[NetworkRequest] = None, journal: Optional[JobJournal] = None):
         # 基础URL
 
 
@@ -175,8 +185,8 @@ class PriceReviewCrawler:
         self.reject_price_url = "https://agentseller.temu.com/api/kiana/mms/magneto/api/price-review-order/no-bom/review"
         self.rebargain_price_url = "https://agentseller.temu.com/api/kiana/mms/magneto/price/bargain-no-bom"  # 重新调价接口
         
-        # 初始化网络请求对象
-        self.request = NetworkRequest()
+        # 初始化网络请求对象（测试时可以传入替身）
+        self.request = request or NetworkRequest()
         
         # 保存参数
         self.cookie = cookie
@@ -187,40 +197,27 @@ class PriceReviewCrawler:
         # 分页参数
         self.page_size = 100  # 增加每页数量，提高效率
         
-        # 延时配置（单位：秒）
-        self.delay_config = {
-            'page_request': (0.5, 1),      # 翻页请求延时范围
-            'review_info': (0.5, 1),       # 获取核价信息延时范围
-            'action': (0.5, 1),            # 同意/拒绝操作延时范围
-            'between_items': (0.3, 0.8)    # 处理商品之间的延时范围
-        }
-        
-    def random_delay(self, delay_type: str):
-        """随机延时
-        
-        Args:
-            delay_type: 延时类型，对应delay_config中的键
-        """
-        if delay_type in self.delay_config:
-            min_delay, max_delay = self.delay_config[delay_type]
-            delay = random.uniform(min_delay, max_delay)
-            self.logger.debug(f"随机延时 {delay:.2f} 秒 ({delay_type})")
-            time.sleep(delay)
+        # 批量核价的任务日志（中断后再次运行时继续）
+        self.journal = journal or JobJournal()
+        self.job: Optional[Job] = None
         
     def stop(self):
         """停止爬取"""
         self._stop_flag = True
         
-    def get_pending_review_count(self) -> int:
+    def get_pending_review_count(self, bypass_cache: bool = False) -> int:
         """获取待核价商品数量
         
+        Args:
+            bypass_cache: 是否跳过响应缓存，批量核价前需要最新的数量
+        
         Returns:
             int: 待核价商品数量，获取失败返回0
         """
         try:
             self.logger.info("正在获取待核价商品数量...")
             
-            result = self.request.post(self.count_url, data={})
+            result = self.request.post(self.count_url, data={}, bypass_cache=bypass_cache)
             
             if not result or not result.get('success'):
                 self.logger.error("获取待核价商品数量失败")
@@ -244,6 +241,10 @@ class PriceReviewCrawler:
         
     def get_page_data(self, page: int, page_size: int) -> Dict:
         """获取指定页码的数据"""
+        return self.request.engine.run(self.aget_page_data(page, page_size))
+        
+    async def aget_page_data(self, page: int, page_size: int) -> Dict:
+        """获取指定页码的数据（协程）"""
         payload = {
             "pageSize": page_size,
             "pageNum": page,
@@ -255,10 +256,7 @@ class PriceReviewCrawler:
             self.logger.debug(f"请求URL: {self.api_url}")
             self.logger.debug(f"请求体: {json.dumps(payload, ensure_ascii=False)}")
             
-            # 添加翻页请求延时
-            self.random_delay('page_request')
-            
-            result = self.request.post(self.api_url, data=payload)
+            result = await self.request.apost(self.api_url, data=payload)
             
             if not result:
                 self.logger.error(f"第 {page} 页数据获取失败")
@@ -270,47 +268,62 @@ class PriceReviewCrawler:
             self.logger.error(f"获取第 {page} 页数据时发生错误: {str(e)}")
             return {}
             
-    def crawl_all_pending_reviews(self) -> List[Dict]:
-        """获取所有待核价商品
+    def iter_pages(self, total_count: Optional[int] = None) -> Iterator[List[Dict]]:
+        """按页产出待核价商品，后续页会提前并发请求
         
-        Returns:
-            List[Dict]: 所有待核价商品数据
+        Args:
+            total_count: 待核价商品总数，不传时先查询一次
+            
+        Yields:
+            List[Dict]: 每一页的商品数据
         """
-        # 获取待核价商品总数
-        total_count = self.get_pending_review_count()
+        if total_count is None:
+            total_count = self.get_pending_review_count()
         if total_count == 0:
             self.logger.info("没有待核价的商品")
-            return []
+            return
             
         # 计算总页数
-        total_pages = (total_count + self.page_size - 1) // self.page_size
+        total_pages = page_count(total_count, self.page_size)
         self.logger.info(f"总共需要获取 {total_pages} 页数据")
         
-        all_data = []
-        
-        for page in range(1, total_pages + 1):
-            if self.stop_flag_callback():
-                self.logger.info("用户手动停止获取商品列表")
-                break
-                
-            result = self.get_page_data(page, self.page_size)
-            
+        for page, result in iter_pages(
+            self.request,
+            lambda page: self.aget_page_data(page, self.page_size),
+            range(1, total_pages + 1),
+            self.stop_flag_callback
+        ):
             if not result:
-                self.logger.error(f"第 {page} 页数据获取失败")
-                break
-                
+                continue
             # 获取商品列表数据
             items = result.get('result', {}).get('dataList', [])
-            if not items:
-                self.logger.info("没有更多数据")
-                break
-                
-            all_data.extend(items)
-            self.logger.info(f"已获取第 {page} 页数据，当前共 {len(all_data)} 条记录")
+            self.logger.info(f"已获取第 {page} 页数据，共 {len(items)} 条记录")
+            yield items
             
-            # 更新进度
-            if self.progress_callback:
-                self.progress_callback(len(all_data), total_count)
+        if self.stop_flag_callback():
+            self.logger.info("用户手动停止获取商品列表")
+            
+    def iter_items(self, total_count: Optional[int] = None) -> Iterator[Dict]:
+        """逐个产出待核价商品，拿到第一页即可开始处理
+        
+        翻页期间有商品核价完成或新增时，同一商品可能出现在相邻两页，这里会去重
+        """
+        items = (item for page_items in self.iter_pages(total_count) for item in page_items)
+        return iter_unique(items, key=lambda item: item.get('productId'))
+            
+    def crawl_all_pending_reviews(self) -> List[Dict]:
+        """获取所有待核价商品
+        
+        Returns:
+            List[Dict]: 所有待核价商品数据
+        """
+        # 获取待核价商品总数
+        total_count = self.get_pending_review_count()
+        all_data = list(self.iter_items(total_count))
+        
+        # 更新进度
+        if self.progress_callback and total_count:
+            self.progress_callback(len(all_data), total_count)
             
         self.logger.info(f"商品列表获取完成，共 {len(all_data)} 条记录")
         return all_data
@@ -331,9 +344,6 @@ class PriceReviewCrawler:
                 "orderId": order_id
             }
             
-            # 添加获取核价信息延时
-            self.random_delay('review_info')
-            
             result = self.request.post(self.price_review_url, data=payload)
             
             if not result or not result.get('success'):
@@ -386,9 +396,6 @@ class PriceReviewCrawler:
                 "bargainReasonList": []
             }
             
-            # 添加操作延时
-            self.random_delay('action')
-            
             result = self.request.post(self.accept_price_url, data=payload)
             
             if not result or not result.get('success'):
@@ -418,9 +425,6 @@ class PriceReviewCrawler:
                 "priceOrderId": price_order_id
             }
             
-            # 添加操作延时
-            self.random_delay('action')
-            
             result = self.request.post(self.reject_price_url, data=payload)
             
             if not result or not result.get('success'):
@@ -463,9 +467,6 @@ class PriceReviewCrawler:
                 "bargainReasonList": []
             }
             
-            # 添加操作延时
-            self.random_delay('action')
-            
             result = self.request.post(self.rebargain_price_url, data=payload)
             
             if not result or not result.get('success'):
@@ -479,13 +480,77 @@ class PriceReviewCrawler:
             self.logger.error(f"重新调价时发生错误: {str(e)}")
             return False
 
-    def process_single_price_review(self, product_data: Dict, use_rebargain: bool = True, max_review_rounds: int = 5) -> Tuple[bool, str]:
-        """处理单个商品的核价（用于多线程）
+    def fetch_review_row(self, product_data: Dict) -> Tuple[Optional[ReviewRow], str]:
+        """获取阶段：找出待核价订单，获取核价建议和价格底线，组成决策输入
+        
+        Args:
+            product_data: 商品数据
+        Returns:
+            Tuple[Optional[ReviewRow], str]: (决策输入, 无法核价时的原因)
+        """
+        order = review_order_of(product_data)
+        if order is None:
+            return None, "没有待核价的订单或SKU"
+        price_order_id, product_sku_ids, review_rounds = order
+        
+        # 🔑 检查停止标志 - 在发送网络请求前检查
+        if self.stop_flag_callback():
+            return None, "任务已被用户停止"
+            
+        # 获取核价建议
+        suggestion = self.get_price_review_suggestion(price_order_id)
+        if not suggestion:
+            return None, "获取核价建议失败"
+            
+        # 获取价格底线 - 通过商品类别ID获取
+        cat_id_list = product_data.get('catIdList', [])
+        threshold = None
+        if cat_id_list:
+            threshold = category_config.get_price_threshold_by_category_ids(cat_id_list)
+            if threshold is not None:
+                self.logger.debug(f"通过类别ID {cat_id_list} 获取到价格阈值: {threshold}元")
+        if threshold is None:
+            cat_info = f"类别ID: {cat_id_list}" if cat_id_list else "无类别ID"
+            return None, f"未找到商品的价格底线规则 ({cat_info})"
+            
+        return ReviewRow(
+            productId=product_data.get('productId'),
+            priceOrderId=price_order_id,
+            supplyPrice=suggestion.supplyPrice,
+            suggestSupplyPrice=suggestion.suggestSupplyPrice,
+            threshold=threshold,
+            reviewRounds=review_rounds,
+            productSkuIds=product_sku_ids
+        ), ""
+        
+    def apply_decision(self, product_data: Dict, row: ReviewRow, decision: ReviewDecision) -> Tuple[bool, str]:
+        """执行阶段：把决定记录到任务日志，然后发出同意/拒绝/重新调价请求
+        
+        Returns:
+            Tuple[bool, str]: (是否成功, 处理结果说明)
+        """
+        self._record_decision(product_data, decision.action, row.priceOrderId, decision.price, row.reviewRounds)
+        if decision.action == ACCEPT:
+            ok = self.accept_price_review(row.priceOrderId, row.productSkuIds, decision.price)
+        elif decision.action == REBARGAIN:
+            ok = self.rebargain_price_review(row.priceOrderId, row.productSkuIds, decision.price)
+        else:
+            ok = self.reject_price_review(row.priceOrderId)
+        if ok:
+            self.logger.info(f"商品 {row.productId} , {decision.message}")
+            return True, decision.message
+        self.logger.error(f"商品 {row.productId} , {decision.failure_message}")
+        return False, decision.failure_message
+        
+    def process_single_price_review(self, product_data: Dict, use_rebargain: bool = True, max_review_rounds: int = 5,
+                                    prefetched: Optional[Future] = None) -> Tuple[bool, str]:
+        """处理单个商品的核价（用于多线程）：获取 → 决策（decision.decide） → 执行
         
         Args:
             product_data: 商品数据
             use_rebargain: 当价格低于底线时是否使用重新调价（True为重新调价，False为拒绝）
             max_review_rounds: 最多核价几轮
+            prefetched: 已经完成的 fetch_review_row 预取结果，为None时在本线程中获取
         Returns:
             Tuple[bool, str]: (是否成功, 处理结果说明)
         """
@@ -494,221 +559,289 @@ class PriceReviewCrawler:
             if self.stop_flag_callback():
                 return False, "任务已被用户停止"
             
-            # 获取核价订单ID和所有SKU ID
-            price_order_id = None
-            product_sku_ids = []  # 改为数组存储所有SKU ID
-            # ext_codes = []  # 存储所有SKU的extCode
-            # 获取核价轮次
-            review_rounds = 0
-            for skc in product_data.get('skcList', []):
-                for review_info in skc.get('supplierPriceReviewInfoList', []):
-                    review_rounds = review_info.get('times', 0)
-                    if review_info.get('status') == 1:  # 待核价状态
-                        price_order_id = review_info.get('priceOrderId')
-                        # 获取所有SKU ID和extCode
-                        if review_info.get('productSkuList'):
-                            for sku in review_info['productSkuList']:
-                                sku_id = sku.get('skuId')
-                                # ext_code = sku.get('extCode')
-                                if sku_id:
-                                    product_sku_ids.append(sku_id)
-                                    # if ext_code:
-                                    #     ext_codes.append(ext_code)
-                        break
-                if price_order_id and product_sku_ids:
-                    break
-                    
-            if not price_order_id or not product_sku_ids:
-                return False, "没有待核价的订单或SKU"
+            if prefetched is not None:
+                row, reason = prefetched.result()
+            else:
+                row, reason = self.fetch_review_row(product_data)
+            if row is None:
+                return False, reason
             
-            # 🔑 检查停止标志 - 在发送网络请求前检查
-            if self.stop_flag_callback():
-                return False, "任务已被用户停止"
-                
-            # 获取核价建议
-            suggestion = self.get_price_review_suggestion(price_order_id)
-            if not suggestion:
-                return False, "获取核价建议失败"
-                
-            # 获取价格底线 - 优先通过商品类别ID获取
-            cat_id_list = product_data.get('catIdList', [])
-            threshold = None
-            
-            # 首先尝试通过类别ID获取价格阈值
-            if cat_id_list:
-                threshold = category_config.get_price_threshold_by_category_ids(cat_id_list)
-                if threshold is not None:
-                    self.logger.debug(f"通过类别ID {cat_id_list} 获取到价格阈值: {threshold}元")
-            
-            # 如果仍然没有找到价格阈值
-            if threshold is None:
-                cat_info = f"类别ID: {cat_id_list}" if cat_id_list else "无类别ID"
-                # sku_info = f"SKU编码: {ext_code}" if ext_code else "无SKU编码"
-                return False, f"未找到商品的价格底线规则 ({cat_info})"
-                
-            # 将价格底线转换为分
-            threshold_cents = int(threshold * 100)
+            decision = decide(row, use_rebargain, max_review_rounds)
             
             # 🔑 检查停止标志 - 在执行操作前检查
             if self.stop_flag_callback():
                 return False, "任务已被用户停止"
             
-            # 比较价格
-            if suggestion.suggestSupplyPrice < threshold_cents:
-                # 价格低于底线
-                if use_rebargain:
-                    # 使用重新调价：当前价格减去1元
-                    current_price_cents = suggestion.supplyPrice
-                    new_price_cents = current_price_cents - 100  # 减去1元（100分）
-                    # 是否达到最大核价轮次
-                    is_max_review_rounds = review_rounds and review_rounds >= max_review_rounds
-                    # 如果减去1元后仍低于底线，则拒绝
-                    if new_price_cents < threshold_cents:
-                        if  self.reject_price_review(price_order_id):
-                            message = f"已拒绝核价建议，建议价格{suggestion.suggestSupplyPrice/100}元 ，当前价格 {current_price_cents/100}元 减去1元后 {new_price_cents/100}元 仍低于底线 {threshold}元"
-                            self.logger.info(f"商品 {product_data.get('productId')} ,{message}")
-                            return True, message
-                        else:
-                            message = "拒绝核价建议失败"
-                            self.logger.error(f"商品 {product_data.get('productId')} ,{message}")
-                            return False, message
-                    else:
-                        # 达到最大核价轮次，拒绝核价建议
-                        if is_max_review_rounds:
-                            if self.reject_price_review(price_order_id):
-                                message = f"已拒绝核价建议，达到最大核价轮次 {max_review_rounds}，建议价格{suggestion.suggestSupplyPrice/100}元，当前价格 {current_price_cents/100}元 减去1元后 {new_price_cents/100}元, 建议价格{suggestion.suggestSupplyPrice}元, 仍低于底线 {threshold}元"
-                                self.logger.info(f"商品 {product_data.get('productId')} ,{message}")
-                                return True, message
-                            else:
-                                message = "拒绝核价建议失败"
-                                self.logger.error(f"商品 {product_data.get('productId')} ,{message}")
-                                return False, message
-
-                        # 减去1元后高于底线，发起重新调价
-                        if self.rebargain_price_review(price_order_id, product_sku_ids, new_price_cents):
-                            message = f"已发起重新调价，建议价格{suggestion.suggestSupplyPrice/100}元，当前价格 {current_price_cents/100}元 调整为 {new_price_cents/100}元（底线 {threshold}元）"
-                            self.logger.info(f"商品 {product_data.get('productId')} , {message}")
-                            return True, message
-                        else:
-                            message = "发起重新调价失败"
-                            self.logger.error(f"商品 {product_data.get('productId')} , {message}")
-                            return False, message
-                else:
-                    # 直接拒绝
-                    if self.reject_price_review(price_order_id):
-                        message = f"已拒绝核价建议，建议价格 {suggestion.suggestSupplyPrice/100}元 低于底线 {threshold}元"
-                        self.logger.info(f"商品 {product_data.get('productId')} , {message}")
-                        return True, message
-                    else:
-                        message = "拒绝核价建议失败"
-                        self.logger.error(f"商品 {product_data.get('productId')} , {message}")
-                        return False, message
-            else:
-                # 价格高于底线，同意
-                if self.accept_price_review(price_order_id, product_sku_ids, suggestion.suggestSupplyPrice):
-                    message = f"已同意核价建议，建议价格 {suggestion.suggestSupplyPrice/100}元 高于底线 {threshold}元"
-                    self.logger.info(f"商品 {product_data.get('productId')} , {message}")
-                    return True, message
-                else:
-                    message = "同意核价建议失败"
-                    self.logger.error(f"商品 {product_data.get('productId')} , {message}")
-                    return False, message
+            return self.apply_decision(product_data, row, decision)
                     
+        except CancelledError:
+            # 停止时预取任务被取消
+            return False, "任务已被用户停止"
         except Exception as e:
             error_message = f"处理核价时发生错误: {str(e)}"
             self.logger.error(f"商品 {product_data.get('productId')} , {error_message}")
             return False, error_message
             
-    def batch_process_price_reviews_mt(self, max_workers: int = 5, use_rebargain: bool = True, max_review_rounds: int = 5) -> List[Dict]:
+    def _record_decision(self, product_data: Dict, action: str, price_order_id: int, price: Optional[int] = None,
+                         review_rounds: Optional[int] = None):
+        """发出核价写请求前把决定记录到任务日志（包括当时的核价轮次，继续任务时用于判断是否已生效）"""
+        if self.job is not None:
+            self.job.mark_decided(product_data.get('productId'), {
+                "action": action,
+                "priceOrderId": price_order_id,
+                "price": price,
+                "reviewRounds": review_rounds
+            })
+            
+    def _process_and_record(self, job: Job, product_data: Dict, use_rebargain: bool, max_review_rounds: int,
+                            prefetched: Optional[Future] = None) -> Tuple[bool, str]:
+        """处理单个商品并立即把结果记录到任务日志（停止后才返回的结果也不会丢失）"""
+        product_id = product_data.get('productId')
+        try:
+            success, message = self.process_single_price_review(product_data, use_rebargain, max_review_rounds, prefetched)
+        except Exception as e:
+            job.mark_failed(product_id, f"处理异常: {str(e)}")
+            raise
+        if success:
+            job.mark_applied(product_id, message)
+        elif not self.stop_flag_callback():
+            # 因停止而没有处理的商品保持原状态，下次继续
+            job.mark_failed(product_id, message)
+        return success, message
+            
+    def _feed_reviews(self, products: Iterator[Dict], prefetcher: Optional[ThreadPoolExecutor],
+                      window: Optional[threading.Semaphore], ready: "queue.Queue", worker_count: int, state: Dict):
+        """生产者线程：按顺序提交核价建议的预取，获取完成后放入就绪队列
+        
+        window 限制已经提交预取、但还没有被执行线程取走的商品数；不预取时商品直接放入就绪队列。
+        结束（或停止、出错）后放入 worker_count 个 None，通知执行线程退出
+        """
+        fetches = []
+        # 每个预取的完成回调把商品放入就绪队列后释放一次
+        delivered = threading.Semaphore(0)
+        
+        def deliver(future: Future, product: Dict):
+            ready.put((product, future))
+            delivered.release()
+        
+        try:
+            for product in products:
+                if self.stop_flag_callback():
+                    break
+                if window is None:
+                    state["total"] += 1
+                    ready.put((product, None))
+                    continue
+                if not self._acquire_window(window):
+                    break
+                state["total"] += 1
+                # 预取线程沿用生产者线程的任务标注
+                future = prefetcher.submit(contextvars.copy_context().run, self.fetch_review_row, product)
+                future.add_done_callback(lambda f, product=product: deliver(f, product))
+                fetches.append(future)
+        except Exception as e:
+            state["error"] = e
+        finally:
+            if self.stop_flag_callback():
+                for future in fetches:
+                    future.cancel()
+            # 所有预取都放入就绪队列后才通知执行线程退出；
+            # wait() 在完成回调执行之前就可能返回，所以等待回调本身
+            for _ in fetches:
+                delivered.acquire()
+            for _ in range(worker_count):
+                ready.put(None)
+                
+    def _acquire_window(self, window: threading.Semaphore) -> bool:
+        """等待预取窗口的空位，被停止时返回False"""
+        while not window.acquire(timeout=0.5):
+            if self.stop_flag_callback():
+                return False
+        return True
+                
+    def _consume_reviews(self, job: Job, ready: "queue.Queue", window: Optional[threading.Semaphore],
+                         done: "queue.Queue", use_rebargain: bool, max_review_rounds: int):
+        """执行线程：只从就绪队列中取已经获取到核价建议的商品，决策并执行，结果放入done队列"""
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    return
+                product, prefetched = item
+                if window is not None:
+                    # 商品被取走后预取窗口空出一个位置，生产者可以继续预取下一个
+                    window.release()
+                if self.stop_flag_callback():
+                    # 停止后只清空队列，商品保持原状态，下次继续
+                    continue
+                try:
+                    outcome = self._process_and_record(job, product, use_rebargain, max_review_rounds, prefetched)
+                except Exception as e:
+                    outcome = e
+                done.put((product, outcome))
+        finally:
+            done.put(None)
+            
+    def _journal_items(self, job: Job, total_count: int) -> Iterator[Dict]:
+        """边获取边记录到任务日志，跳过上次已经完成的商品；完整获取后标记列表已获取完"""
+        for product in self.iter_items(total_count):
+            product_id = product.get('productId')
+            job.add_item(product_id, product)
+            if job.is_applied(product_id):
+                continue
+            yield product
+        if not self.stop_flag_callback():
+            job.set_fetch_complete()
+            
+    def _skip_applied_decisions(self, job: Job, products: Iterator[Dict]) -> Iterator[Dict]:
+        """继续任务时，上次已经做出决定的商品先按最新的列表数据确认写请求是否已生效，已生效的不再重复执行"""
+        for product in products:
+            product_id = product.get('productId')
+            decision = job.decision_of(product_id) if job.resumed else None
+            if decision is not None and decision_applied(product, decision):
+                message = f"上次的操作（{ACTION_NAMES.get(decision.get('action'), decision.get('action'))}）已生效，不再重复执行"
+                job.mark_applied(product_id, message)
+                self.logger.info(f"商品 {product_id} , {message}")
+                continue
+            yield product
+            
+    def batch_process_price_reviews_mt(self, max_workers: Optional[int] = None, use_rebargain: bool = True, max_review_rounds: int = 5,
+                                       resume: bool = True, prefetch: Optional[int] = None) -> List[Dict]:
         """多线程批量处理核价
         
+        每个商品的处理状态记录在任务日志中，任务被停止或中断后再次运行时，
+        跳过已完成的商品，只处理剩余的和失败的商品。
+        生产者线程按顺序提前获取核价建议，获取完成的商品放入就绪队列；
+        执行线程只取已经获取到建议的商品，决策后直接发出写请求，不会阻塞在获取建议上
+        
         Args:
-            max_workers: 最大线程数
+            max_workers: 执行线程数，默认取并发控制器的上限（实际在途请求数由网络层自适应控制）
             use_rebargain: 当价格低于底线时是否使用重新调价（True为重新调价，False为拒绝）
             max_review_rounds: 最多核价几轮
+            resume: 是否继续上次未完成的任务
+            prefetch: 最多提前获取多少个商品的核价建议（正在获取或已获取、但还没有被执行线程取走的商品数），
+                      默认取全局配置中的 suggestion_prefetch，0表示不预取，由执行线程自己获取
         Returns:
             List[Dict]: 处理结果列表
         """
+        job = self.journal.open("price_review", {
+            "use_rebargain": use_rebargain,
+            "max_review_rounds": max_review_rounds
+        }, resume=resume)
+        self.job = job
+        try:
+            # 本线程和各个工作线程发出的请求都记录为属于这个任务，退出时（包括异常）取消标注
+            with job.active():
+                return self._process_review_job(job, max_workers, use_rebargain, max_review_rounds, prefetch)
+        finally:
+            self.job = None
+    
+    def _process_review_job(self, job: Job, max_workers: Optional[int], use_rebargain: bool,
+                            max_review_rounds: int, prefetch: Optional[int]) -> List[Dict]:
+        """执行一次批量核价任务，异常时保留任务日志以便再次运行时继续"""
         results = []
-        
         try:
-            # 获取所有待核价商品
+            if job.resumed:
+                # 日志中的商品数据可能已经过时（价格、核价轮次变化，或已经不在待核价列表中），
+                # 总是重新获取列表，日志只用来跳过已完成的商品，并确认已决定商品的写请求是否已生效
+                self.logger.info("继续上次未完成的核价任务，重新获取列表，跳过已完成的商品")
+            # 获取待核价商品总数
             self.logger.info("开始获取所有待核价商品...")
-            products = self.crawl_all_pending_reviews()
+            total_count = self.get_pending_review_count(bypass_cache=True)
             
-            if not products:
+            if total_count == 0:
                 self.logger.info("没有待核价的商品")
+                job.finish()
                 return results
+            products = self._journal_items(job, total_count)
+            products = self._skip_applied_decisions(job, products)
                 
-            total_products = len(products)
-            self.logger.info(f"开始批量处理 {total_products} 个商品的核价")
-            
             success_count = 0
             failed_count = 0
             
-            # 使用线程池并发处理
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # 提交所有任务
-                future_to_product = {
-                    executor.submit(self.process_single_price_review, product, use_rebargain, max_review_rounds): product 
-                    for product in products
-                }
+            if max_workers is None:
+                max_workers = self.request.concurrency.max_limit
+            if prefetch is None:
+                prefetch = int(GlobalConfigManager().get_config().get("suggestion_prefetch", DEFAULT_SUGGESTION_PREFETCH))
+            window = threading.Semaphore(prefetch) if prefetch > 0 else None
+            ready = queue.Queue()
+            done = queue.Queue()
+            state = {"total": 0, "error": None}
+            
+            self.logger.info(f"开始批量处理核价（{max_workers} 个执行线程，提前获取 {prefetch} 个商品的核价建议）")
+            # 边获取边处理，第一页到达后就开始核价，不必等所有页都获取完
+            with ThreadPoolExecutor(max_workers=max(1, min(prefetch, max_workers))) as prefetcher, \
+                    ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for _ in range(max_workers):
+                    executor.submit(job.bind(self._consume_reviews), job, ready, window, done, use_rebargain,
+                                    max_review_rounds)
+                feeder = threading.Thread(
+                    target=job.bind(self._feed_reviews), args=(products, prefetcher, window, ready, max_workers, state),
+                    name="PriceReviewFeeder", daemon=True
+                )
+                feeder.start()
                 
-                # 处理完成的任务
-                for idx, future in enumerate(as_completed(future_to_product), 1):
-                    product = future_to_product[future]
+                # 收集执行线程的结果，直到所有执行线程退出
+                running = max_workers
+                stop_logged = False
+                while running:
+                    item = done.get()
+                    if item is None:
+                        running -= 1
+                        continue
+                    product, outcome = item
                     
-                    # 检查是否被用户停止
+                    # 检查是否被用户停止，停止后不再统计结果，只等待执行线程退出
                     if self.stop_flag_callback():
-                        self.logger.info("用户手动停止批量处理核价")
-                        self.logger.info("正在取消剩余任务...")
-                        # 取消所有未完成的任务
-                        for f in future_to_product.keys():
-                            if not f.done():
-                                f.cancel()
-                        break
+                        if not stop_logged:
+                            stop_logged = True
+                            self.logger.info("用户手动停止批量处理核价")
+                            self.logger.info("正在取消剩余任务...")
+                        continue
                     
-                    try:
-                        success, message = future.result()
-                        
+                    if isinstance(outcome, Exception):
+                        self.logger.error(f"处理商品 {product.get('productId')} 时发生异常: {str(outcome)}")
+                        results.append({
+                            'productId': product.get('productId'),
+                            'success': False,
+                            'message': f"处理异常: {str(outcome)}"
+                        })
+                        failed_count += 1
+                    else:
+                        success, message = outcome
                         results.append({
                             'productId': product.get('productId'),
                             'success': success,
                             'message': message
                         })
-                        
                         if success:
                             success_count += 1
                         else:
                             failed_count += 1
-                            
-                    except Exception as e:
-                        self.logger.error(f"处理商品 {product.get('productId')} 时发生异常: {str(e)}")
-                        results.append({
-                            'productId': product.get('productId'),
-                            'success': False,
-                            'message': f"处理异常: {str(e)}"
-                        })
-                        failed_count += 1
                     
-                    # 更新进度
+                    # 更新进度（列表还在获取时总数会继续增长）
                     if self.progress_callback:
-                        self.progress_callback(idx, total_products)
+                        self.progress_callback(len(results), max(state["total"], len(results)))
+                feeder.join()
+            if state["error"] is not None:
+                raise state["error"]
+            total_products = state["total"]
                     
-                    # 添加商品之间的延时
-                    self.random_delay('between_items')
-            
             # 显示最终统计信息
             if self.stop_flag_callback():
+                job.finish(stopped=True)
                 self.logger.info("=" * 50)
-                self.logger.info(f"任务已停止！")
+                self.logger.info(f"任务已停止！再次运行时将从中断处继续")
                 self.logger.info(f"已处理: {len(results)}/{total_products} 个商品")
                 self.logger.info(f"成功: {success_count}, 失败: {failed_count}")
                 self.logger.info("=" * 50)
             else:
+                job.finish()
                 self.logger.info(f"批量处理核价完成！成功: {success_count}, 失败: {failed_count}, 总计: {total_products}")
             
         except Exception as e:
+            # 保留任务日志，再次运行时继续
+            job.finish(stopped=True)
             self.logger.error(f"批量处理核价时发生错误: {str(e)}")
             
-        return results
\ No newline at end of file
+        return results
@@ -0,0 +1,156 @@
+"""
+核价决策模块
+根据核价建议和品类价格底线决定同意、拒绝还是重新调价。
+这里只有纯函数，不发请求、不写日志：爬虫负责获取数据（订单、核价建议、价格底线）和执行决定，
+同一套规则也可以直接用于批量回放历史核价数据
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ACCEPT = "accept"
+REJECT = "reject"
+REBARGAIN = "rebargain"
+
+# 重新调价时每次在当前价格上降低的金额（分）
+REBARGAIN_STEP_CENTS = 100
+
+# 执行决定失败时的提示
+FAILURE_MESSAGES = {
+    ACCEPT: "同意核价建议失败",
+    REJECT: "拒绝核价建议失败",
+    REBARGAIN: "发起重新调价失败",
+}
+
+# 操作名称
+ACTION_NAMES = {
+    ACCEPT: "同意核价建议",
+    REJECT: "拒绝核价建议",
+    REBARGAIN: "重新调价",
+}
+
+
+@dataclass
+class ReviewRow:
+    """一个待核价商品的决策输入"""
+    productId: int
+    priceOrderId: int
+    supplyPrice: int  # 当前申报价（分）
+    suggestSupplyPrice: int  # 平台建议价（分）
+    threshold: float  # 价格底线（元）
+    reviewRounds: int = 0  # 已经核价的轮次
+    productSkuIds: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ReviewDecision:
+    """核价决定"""
+    action: str  # accept / reject / rebargain
+    price: Optional[int]  # 同意的价格或重新调价后的价格（分），拒绝时为None
+    message: str  # 执行成功后的说明
+
+    @property
+    def failure_message(self) -> str:
+        return FAILURE_MESSAGES[self.action]
+
+
+def review_order_of(product_data: Dict) -> Optional[Tuple[int, List[int], int]]:
+    """
+    从商品列表数据中找出待核价的订单
+
+    Returns:
+        (核价订单ID, SKU ID列表, 核价轮次)；没有待核价的订单或SKU时返回None
+    """
+    price_order_id = None
+    product_sku_ids = []
+    review_rounds = 0
+    for skc in product_data.get('skcList', []):
+        for review_info in skc.get('supplierPriceReviewInfoList', []):
+            review_rounds = review_info.get('times', 0)
+            if review_info.get('status') == 1:  # 待核价状态
+                price_order_id = review_info.get('priceOrderId')
+                for sku in review_info.get('productSkuList') or []:
+                    sku_id = sku.get('skuId')
+                    if sku_id:
+                        product_sku_ids.append(sku_id)
+                break
+        if price_order_id and product_sku_ids:
+            break
+    if not price_order_id or not product_sku_ids:
+        return None
+    return price_order_id, product_sku_ids, review_rounds
+
+
+def decision_applied(product_data: Dict, decision: Dict) -> bool:
+    """
+    判断任务日志中记录的决定是否已经生效（继续任务时，写请求可能在上次中断前已经发出）
+
+    最新的商品数据中已经没有待核价的订单、待核价的是另一个订单，
+    或者同一个订单已经进入了下一轮核价，都说明上次的写请求已经被处理
+
+    Args:
+        product_data: 最新获取的商品列表数据
+        decision: 任务日志中记录的决定，包含 priceOrderId，以及（新记录的）reviewRounds
+
+    Returns:
+        已经生效返回True，需要重新处理返回False
+    """
+    order = review_order_of(product_data)
+    if order is None:
+        return True
+    price_order_id, _, review_rounds = order
+    if price_order_id != decision.get("priceOrderId"):
+        return True
+    recorded_rounds = decision.get("reviewRounds")
+    return recorded_rounds is not None and review_rounds > recorded_rounds
+
+
+def decide(row: ReviewRow, use_rebargain: bool = True, max_review_rounds: int = 5) -> ReviewDecision:
+    """
+    决定单个商品的核价操作
+
+    - 建议价不低于底线：按建议价同意
+    - 建议价低于底线且不重新调价：拒绝
+    - 建议价低于底线且重新调价：当前价减1元后仍低于底线、或已达到最大核价轮次时拒绝，否则按减1元后的价格重新调价
+
+    Args:
+        row: 决策输入
+        use_rebargain: 当价格低于底线时是否使用重新调价（True为重新调价，False为拒绝）
+        max_review_rounds: 最多核价几轮
+
+    Returns:
+        核价决定
+    """
+    threshold = row.threshold
+    threshold_cents = int(threshold * 100)
+    suggest = row.suggestSupplyPrice
+
+    if suggest >= threshold_cents:
+        return ReviewDecision(ACCEPT, suggest, f"已同意核价建议，建议价格 {suggest/100}元 高于底线 {threshold}元")
+
+    if not use_rebargain:
+        return ReviewDecision(REJECT, None, f"已拒绝核价建议，建议价格 {suggest/100}元 低于底线 {threshold}元")
+
+    current = row.supplyPrice
+    new_price = current - REBARGAIN_STEP_CENTS
+    if new_price < threshold_cents:
+        return ReviewDecision(
+            REJECT, None,
+            f"已拒绝核价建议，建议价格{suggest/100}元 ，当前价格 {current/100}元 减去1元后 {new_price/100}元 仍低于底线 {threshold}元"
+        )
+    if row.reviewRounds and row.reviewRounds >= max_review_rounds:
+        return ReviewDecision(
+            REJECT, None,
+            f"已拒绝核价建议，达到最大核价轮次 {max_review_rounds}，建议价格{suggest/100}元，当前价格 {current/100}元 "
+            f"减去1元后 {new_price/100}元, 建议价格{suggest}元, 仍低于底线 {threshold}元"
+        )
+    return ReviewDecision(
+        REBARGAIN, new_price,
+        f"已发起重新调价，建议价格{suggest/100}元，当前价格 {current/100}元 调整为 {new_price/100}元（底线 {threshold}元）"
+    )
+
+
+def decide_batch(rows: Iterable[ReviewRow], use_rebargain: bool = True,
+                 max_review_rounds: int = 5) -> List[ReviewDecision]:
+    """批量决定核价操作（例如回放历史核价数据），结果与rows一一对应"""
+    return [decide(row, use_rebargain, max_review_rounds) for row in rows]
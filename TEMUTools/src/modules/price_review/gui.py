@@ -10,6 +10,8 @@ from ..config.global_config_manager import GlobalConfigManager
 from ..system_config.config import SystemConfig
 from ..config.config import category_config
 from ..network.event_manager import EventManager
+from ..network.concurrency import ConcurrencyController
+from ..logger.gui import LogHandler
 
 class PriceReviewTab(ttk.Frame):
     def __init__(self, parent):
@@ -138,6 +140,9 @@ class PriceReviewTab(ttk.Frame):
         self.progress_bar.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
         self.progress_label = ttk.Label(parent, text="0/0")
         self.progress_label.grid(row=1, column=2, sticky=tk.W, padx=5)
+        # 网络层当前的自适应并发数
+        self.concurrency_label = ttk.Label(parent, text="")
+        self.concurrency_label.grid(row=1, column=3, sticky=tk.W, padx=5)
         
     def create_log_area(self, parent):
         """创建日志显示区域"""
@@ -178,21 +183,6 @@ class PriceReviewTab(ttk.Frame):
         
     def setup_logging(self):
         """设置日志处理器"""
-        # 创建自定义日志处理器
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                logging.Handler.__init__(self)
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record)
-                def append():
-                    self.text_widget.configure(state='normal')
-                    self.text_widget.insert(tk.END, msg + '\n')
-                    self.text_widget.see(tk.END)
-                    self.text_widget.configure(state='disabled')
-                self.text_widget.after(0, append)
-        
         # 创建独立的logger
         self.logger = logging.getLogger('price_review')
         self.logger.setLevel(logging.INFO)
@@ -202,7 +192,7 @@ class PriceReviewTab(ttk.Frame):
             self.logger.removeHandler(handler)
         
         # 添加文本处理器
-        text_handler = TextHandler(self.log_text)
+        text_handler = LogHandler(self.log_text)
         text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         self.logger.addHandler(text_handler)
         
@@ -350,6 +340,7 @@ class PriceReviewTab(ttk.Frame):
                 args=(thread_num,)
             )
             self.crawler_thread.start()
+            self.refresh_concurrency()
 
         except Exception as e:
             self.logger.error(f"启动批量处理失败: {str(e)}")
@@ -377,6 +368,15 @@ class PriceReviewTab(ttk.Frame):
             self.batch_button.config(state='normal')
             self.stop_button.config(state='disabled')
 
+    def refresh_concurrency(self):
+        """批量处理期间每秒刷新一次当前并发数"""
+        stats = ConcurrencyController().get_stats()
+        self.concurrency_label.config(text=f"并发: {stats['in_flight']}/{stats['limit']}")
+        if self.crawler_thread.is_alive():
+            self.after(1000, self.refresh_concurrency)
+        else:
+            self.concurrency_label.config(text="")
+
     def update_progress_mt(self, current, total):
         if total > 0:
             percentage = (current / total) * 100
@@ -469,19 +469,10 @@ class PriceReviewTab(ttk.Frame):
                         messagebox.showerror("错误", f"类别 '{category.get('name', '')}' 的价格必须是数字")
                         return
                 
-                # 保存到配置文件
-                config_data = {
-                    "categories": updated_categories,
-                    "last_update": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # 直接写入配置文件
-                with open(category_config.config_file, 'w', encoding='utf-8') as f:
-                    json.dump(config_data, f, ensure_ascii=False, indent=2)
-                
-                # 刷新缓存
-                category_config.refresh_cache()
-                
+                # 保存到配置文件（正在运行的任务会立即看到新的价格底线）
+                if not category_config.save_categories(updated_categories):
+                    raise RuntimeError("写入品类配置文件失败")
+
                 messagebox.showinfo("成功", "价格底线配置已保存")
                 self.logger.info("价格底线配置已更新")
                 top.destroy()
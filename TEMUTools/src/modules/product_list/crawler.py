@@ -1,8 +1,10 @@
 import logging
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 from ..network.request import NetworkRequest
+from ..network.paginator import iter_pages, page_count
+from ..catalogue.client import CatalogueClient
 
 # 配置日志
 logging.basicConfig(
@@ -67,10 +69,15 @@ class ProductListCrawler:
         self.page_size = 20
         self.current_page = 1
         self.request = NetworkRequest()
+        self.catalogue = CatalogueClient()
         self.logger = logger or logging.getLogger('product_list')
 
     def get_page_data(self, page: int, page_size: int = None, only_on_sale: bool = False) -> Optional[Dict]:
         """获取指定页码的数据"""
+        return self.request.engine.run(self.aget_page_data(page, page_size, only_on_sale))
+
+    async def aget_page_data(self, page: int, page_size: int = None, only_on_sale: bool = False) -> Optional[Dict]:
+        """获取指定页码的数据（协程）"""
         payload = {
             "page": page,
             "pageSize": page_size or self.page_size
@@ -84,17 +91,45 @@ class ProductListCrawler:
         self.logger.info(f"正在获取第 {page} 页数据")
         self.logger.debug(f"请求URL: {self.api_url}")
         self.logger.debug(f"请求体: {payload}")
-        result = self.request.post(self.api_url, data=payload)
+        result = await self.request.apost(self.api_url, data=payload)
         if not result or not result.get('success', True):
             self.logger.error(f"第 {page} 页数据获取失败: {result}")
             return None
         return result
 
-    def get_all_data(self, max_pages: int = 2, page_size: int = None, only_on_sale: bool = False) -> List[Dict]:
-        """获取指定页数的数据"""
-        all_data = []
-        for page in range(1, max_pages + 1):
-            result = self.get_page_data(page, page_size, only_on_sale)
+    def iter_pages(self, max_pages: int = 2, page_size: int = None, only_on_sale: bool = False) -> Iterator[List[Dict]]:
+        """按页产出商品数据
+        
+        不筛选在售状态时直接从本地商品目录快照中按页切分；
+        否则请求接口，第一页返回的total用来确定实际页数，之后的页会提前并发请求
+        """
+        page_size = page_size or self.page_size
+        if not only_on_sale and self.catalogue.enabled:
+            items = self.catalogue.items()
+            if items is not None:
+                self.logger.info(f"使用商品目录快照，共 {len(items)} 条记录")
+                for start in range(0, min(len(items), max_pages * page_size), page_size):
+                    yield items[start:start + page_size]
+                return
+        
+        result = self.get_page_data(1, page_size, only_on_sale)
+        if not result:
+            self.logger.error("第 1 页数据获取失败")
+            return
+        items = result.get('result', {}).get('pageItems', [])
+        if not items:
+            self.logger.info("没有更多数据")
+            return
+        self.logger.info(f"已获取第 1 页数据，共 {len(items)} 条记录")
+        yield items
+
+        total = result.get('result', {}).get('total')
+        last_page = min(max_pages, page_count(total, page_size)) if total else max_pages
+        for page, result in iter_pages(
+            self.request,
+            lambda page: self.aget_page_data(page, page_size, only_on_sale),
+            range(2, last_page + 1)
+        ):
             if not result:
                 self.logger.error(f"第 {page} 页数据获取失败")
                 break
@@ -102,6 +137,16 @@ class ProductListCrawler:
             if not items:
                 self.logger.info("没有更多数据")
                 break
-            all_data.extend(items)
-            self.logger.info(f"已获取第 {page} 页数据，当前共 {len(all_data)} 条记录")
-        return all_data 
\ No newline at end of file
+            self.logger.info(f"已获取第 {page} 页数据，共 {len(items)} 条记录")
+            yield items
+
+    def iter_items(self, max_pages: int = 2, page_size: int = None, only_on_sale: bool = False) -> Iterator[Dict]:
+        """逐个产出商品数据，下游可以边获取边处理"""
+        for items in self.iter_pages(max_pages, page_size, only_on_sale):
+            yield from items
+
+    def get_all_data(self, max_pages: int = 2, page_size: int = None, only_on_sale: bool = False) -> List[Dict]:
+        """获取指定页数的数据"""
+        all_data = list(self.iter_items(max_pages, page_size, only_on_sale))
+        self.logger.info(f"共获取 {len(all_data)} 条记录")
+        return all_data
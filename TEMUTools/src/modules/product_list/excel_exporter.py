@@ -0,0 +1,331 @@
+"""
+商品列表Excel导出模块
+行数据由生成器按需产出，逐行写入磁盘，内存占用不随行数增长：
+安装了XlsxWriter时使用其constant_memory模式（更快），否则使用openpyxl只写模式，
+两种方式下单元格样式都只创建一次、所有单元格共享；
+两个Excel库都在第一次导出时才导入，不影响程序启动速度
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ..config.config import category_config
+
+# 商品列表的列顺序
+PRODUCT_LIST_COLUMNS = [
+    '商品ID', '商品名称', '商品类型', '来源类型', '商品编码',
+    '类目ID', '类目名称', 'SKU ID', 'SKU编码', '供应商价格',
+    '底线价格', '价格差额', '颜色', '尺码', '主图URL', 'SKU图片', '创建时间'
+]
+
+PRODUCT_CODE_COLUMNS = ['SPUID', '商品识别码']
+
+# 库存模板：第2、3列留空，第2行是导入说明
+INVENTORY_COLUMNS = ['SKU ID', '', '', '修改后库存']
+INVENTORY_NOTE_ROW = ["必填指Temu的SKU ID", None, None, "条件必填指当前的实际总库存，导入成功后将直接覆盖线上已有库存"]
+INVENTORY_DEFAULT_STOCK = 1000
+# 平台导入限制，库存模板每个文件最多1000条
+MAX_INVENTORY_ROWS_PER_FILE = 1000
+
+HEADER_STYLE = "temu_header"
+CELL_STYLE = "temu_cell"
+WRAP_CELL_STYLE = "temu_cell_wrap"
+
+
+def _load_xlsxwriter():
+    """XlsxWriter为可选依赖：写入速度约为openpyxl只写模式的数倍，未安装时返回None（退回openpyxl）"""
+    try:
+        import xlsxwriter
+    except ImportError:
+        return None
+    return xlsxwriter
+
+
+def _thin_border():
+    from openpyxl.styles import Border, Side
+    side = Side(style='thin')
+    return Border(left=side, right=side, top=side, bottom=side)
+
+
+def _register_styles(wb):
+    """在工作簿中注册表头和数据单元格的命名样式，所有单元格共享同一份样式"""
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    wb.add_named_style(NamedStyle(
+        name=HEADER_STYLE,
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        alignment=Alignment(horizontal="center", vertical="center"),
+        border=_thin_border()
+    ))
+    wb.add_named_style(NamedStyle(
+        name=CELL_STYLE,
+        alignment=Alignment(horizontal="left", vertical="center"),
+        border=_thin_border()
+    ))
+    wb.add_named_style(NamedStyle(
+        name=WRAP_CELL_STYLE,
+        alignment=Alignment(horizontal="left", vertical="center", wrap_text=True),
+        border=_thin_border()
+    ))
+
+
+def _write_sheet_xlsxwriter(xlsxwriter, file_path: str, title: str, headers: Sequence[str], rows: Iterable[Sequence[Any]],
+                            wrap_text: bool, preamble: Optional[Sequence[Any]], column_width: int) -> int:
+    # 图片URL按普通文本写入（与openpyxl一致），不自动转成超链接
+    wb = xlsxwriter.Workbook(file_path, {'constant_memory': True, 'strings_to_urls': False})
+    try:
+        header_format = wb.add_format({
+            'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#366092', 'pattern': 1,
+            'align': 'center', 'valign': 'vcenter', 'border': 1
+        })
+        cell_format = wb.add_format({'align': 'left', 'valign': 'vcenter', 'border': 1, 'text_wrap': wrap_text})
+        ws = wb.add_worksheet(title)
+        ws.set_column(0, len(headers) - 1, column_width)
+        ws.write_row(0, 0, headers, header_format)
+        row_index = 1
+        if preamble is not None:
+            for col, value in enumerate(preamble):
+                if value is not None:
+                    ws.write(row_index, col, value)
+            row_index += 1
+        count = 0
+        for values in rows:
+            ws.write_row(row_index, 0, values, cell_format)
+            row_index += 1
+            count += 1
+    finally:
+        wb.close()
+    return count
+
+
+def write_sheet(file_path: str, title: str, headers: Sequence[str], rows: Iterable[Sequence[Any]],
+                wrap_text: bool = False, preamble: Optional[Sequence[Any]] = None,
+                column_width: int = 20) -> int:
+    """
+    把行数据逐行写入一个单工作表的xlsx文件
+
+    Args:
+        file_path: 保存路径
+        title: 工作表名称
+        headers: 表头
+        rows: 数据行（可以是生成器，逐行消费）
+        wrap_text: 数据单元格是否自动换行
+        preamble: 表头之后、数据之前的一行说明（不带样式）
+        column_width: 列宽
+
+    Returns:
+        写入的数据行数
+    """
+    xlsxwriter = _load_xlsxwriter()
+    if xlsxwriter is not None:
+        return _write_sheet_xlsxwriter(xlsxwriter, file_path, title, headers, rows, wrap_text, preamble, column_width)
+
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+    ws = wb.create_sheet(title)
+    for col in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col)].width = column_width
+
+    def _row(values: Sequence[Any], style: str) -> List[Any]:
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            cells.append(cell)
+        return cells
+
+    ws.append(_row(headers, HEADER_STYLE))
+    if preamble is not None:
+        ws.append(list(preamble))
+    cell_style = WRAP_CELL_STYLE if wrap_text else CELL_STYLE
+    count = 0
+    for values in rows:
+        ws.append(_row(values, cell_style))
+        count += 1
+    wb.save(file_path)
+    return count
+
+
+def _product_list_rows(product: Dict) -> Iterator[List[Any]]:
+    """一个商品在商品列表中的数据行，每个SKU一行，按PRODUCT_LIST_COLUMNS的顺序"""
+    # 基本信息
+    base_info = {
+        '商品ID': product['productId'],
+        '商品名称': product['productName'],
+        '商品类型': product['productType'],
+        '来源类型': product['sourceType'],
+        '商品编码': product['goodsId'],
+        '主图URL': product['mainImageUrl'],
+        '创建时间': datetime.fromtimestamp(product['createdAt']/1000).strftime('%Y-%m-%d %H:%M:%S'),
+        '类目ID': product['leafCat']['catId'],
+        '类目名称': product['leafCat']['catName']
+    }
+
+    # 同一商品的SKU属于同一个类目，底线价格只需要查一次
+    cat_id = product.get("leafCat", {}).get("catId")
+    price_threshold = category_config.get_price_threshold_by_category_id(cat_id)
+
+    # 处理SKU信息
+    for sku in product['productSkuSummaries']:
+        sku_info = base_info.copy()
+        supplier_price = sku['supplierPrice'] / 100  # 转换为元
+        price_difference = supplier_price - price_threshold if price_threshold not in (None, 0) else None
+
+        sku_info.update({
+            'SKU ID': sku['productSkuId'],
+            'SKU编码': sku['extCode'],
+            '供应商价格': supplier_price,
+            '底线价格': price_threshold,
+            '价格差额': price_difference,
+            'SKU图片': sku['thumbUrl']
+        })
+
+        # 处理规格信息
+        for spec in sku['productSkuSpecList']:
+            sku_info[f'{spec["parentSpecName"]}'] = spec['specName']
+
+        yield [sku_info.get(column, '') for column in PRODUCT_LIST_COLUMNS]
+
+
+def iter_product_list_rows(products: Iterable[Dict]) -> Iterator[List[Any]]:
+    """商品列表的数据行，每个SKU一行，按PRODUCT_LIST_COLUMNS的顺序"""
+    for product in products:
+        yield from _product_list_rows(product)
+
+
+def product_category_ids(product: Dict) -> List[int]:
+    """商品的类目ID列表：叶子类目以及categories中各级类目"""
+    category_ids = []
+    if 'leafCat' in product and product['leafCat']:
+        category_ids.append(product['leafCat']['catId'])
+
+    # 如果有categories字段，也添加进去
+    if 'categories' in product:
+        categories = product['categories']
+        for cat_key in ['cat1', 'cat2', 'cat3', 'cat4', 'cat5', 'cat6', 'cat7', 'cat8', 'cat9', 'cat10']:
+            if cat_key in categories and categories[cat_key]['catId'] > 0:
+                category_ids.append(categories[cat_key]['catId'])
+    return category_ids
+
+
+def _product_code_row(product: Dict) -> List[Any]:
+    """商品码模板的一行：SPUID和通过类目映射得到的商品识别码"""
+    product_code = category_config.get_code_mapping_by_category_ids(product_category_ids(product))
+    return [product['productId'], product_code or "未定义"]
+
+
+def iter_product_code_rows(products: Iterable[Dict]) -> Iterator[List[Any]]:
+    """商品码模板的数据行"""
+    for product in products:
+        yield _product_code_row(product)
+
+
+def iter_sku_ids(products: Iterable[Dict]) -> Iterator[int]:
+    """所有商品的SKU ID"""
+    for product in products:
+        for sku in product['productSkuSummaries']:
+            yield sku['productSkuId']
+
+
+def iter_inventory_rows(sku_ids: Iterable[int]) -> Iterator[List[Any]]:
+    """库存模板的数据行：SKU ID、两列空白、默认库存"""
+    for sku_id in sku_ids:
+        yield [sku_id, "", "", INVENTORY_DEFAULT_STOCK]
+
+
+def export_product_list(products: Iterable[Dict], file_path: str) -> int:
+    """导出商品列表，返回写入的SKU行数"""
+    return write_sheet(file_path, "商品列表", PRODUCT_LIST_COLUMNS, iter_product_list_rows(products), wrap_text=True)
+
+
+def export_product_code_template(products: Iterable[Dict], file_path: str) -> int:
+    """导出商品码模板，返回写入的行数"""
+    return write_sheet(file_path, "商品码模板", PRODUCT_CODE_COLUMNS, iter_product_code_rows(products))
+
+
+def export_inventory_template(sku_ids: Iterable[int], file_path: str) -> int:
+    """导出库存模板，返回写入的行数"""
+    return write_sheet(file_path, "库存模板", INVENTORY_COLUMNS, iter_inventory_rows(sku_ids),
+                       preamble=INVENTORY_NOTE_ROW)
+
+
+class ProductRows:
+    """
+    商品数据一次展平后的列式存储
+
+    一键导出时三个文件共用：商品列表每个SKU一行，商品码模板每个商品一行，
+    库存模板直接使用商品列表的SKU ID列
+    """
+
+    def __init__(self):
+        self.list_columns: List[List[Any]] = [[] for _ in PRODUCT_LIST_COLUMNS]
+        self.code_columns: List[List[Any]] = [[] for _ in PRODUCT_CODE_COLUMNS]
+
+    @classmethod
+    def from_products(cls, products: Iterable[Dict]) -> 'ProductRows':
+        """遍历一次商品数据，同时生成商品列表和商品码模板的数据"""
+        rows = cls()
+        list_columns = rows.list_columns
+        code_columns = rows.code_columns
+        for product in products:
+            for values in _product_list_rows(product):
+                for column, value in zip(list_columns, values):
+                    column.append(value)
+            for column, value in zip(code_columns, _product_code_row(product)):
+                column.append(value)
+        return rows
+
+    @property
+    def sku_ids(self) -> List[Any]:
+        return self.list_columns[PRODUCT_LIST_COLUMNS.index('SKU ID')]
+
+    def __len__(self) -> int:
+        return len(self.list_columns[0])
+
+
+def export_all_templates(products: Iterable[Dict], save_dir: str, timestamp: str) -> Dict[str, Any]:
+    """
+    一键导出商品列表、商品码模板和库存模板（超过1000条时拆分为多个文件）
+
+    商品数据只展平一次，各个文件在当前线程中依次写入：
+    写入过程是纯Python的CPU计算，多线程受GIL限制没有收益，
+    多进程需要序列化列数据并启动子进程，只写几个文件时得不偿失
+    （见 benchmarks/bench_excel_export.py）
+
+    Args:
+        products: 商品数据
+        save_dir: 保存目录
+        timestamp: 文件名中的时间戳
+
+    Returns:
+        {"files": 生成的文件路径列表, "inventory_file_count": 库存模板文件数}
+    """
+    rows = ProductRows.from_products(products)
+    files = []
+
+    list_file = os.path.join(save_dir, f"商品列表_{timestamp}.xlsx")
+    write_sheet(list_file, "商品列表", PRODUCT_LIST_COLUMNS, zip(*rows.list_columns), wrap_text=True)
+    files.append(list_file)
+
+    code_file = os.path.join(save_dir, f"商品码模板_{timestamp}.xlsx")
+    write_sheet(code_file, "商品码模板", PRODUCT_CODE_COLUMNS, zip(*rows.code_columns))
+    files.append(code_file)
+
+    sku_ids = rows.sku_ids
+    inventory_file_count = (len(sku_ids) + MAX_INVENTORY_ROWS_PER_FILE - 1) // MAX_INVENTORY_ROWS_PER_FILE
+    for i in range(inventory_file_count):
+        chunk = sku_ids[i * MAX_INVENTORY_ROWS_PER_FILE:(i + 1) * MAX_INVENTORY_ROWS_PER_FILE]
+        filename = f"库存模板_{timestamp}.xlsx" if inventory_file_count == 1 else f"库存模板_{timestamp}-{i+1}.xlsx"
+        inventory_file = os.path.join(save_dir, filename)
+        export_inventory_template(chunk, inventory_file)
+        files.append(inventory_file)
+
+    return {
+        "files": files,
+        "inventory_file_count": inventory_file_count
+    }
@@ -4,13 +4,11 @@ import threading
 import os
 import logging
 from datetime import datetime
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
 from .crawler import ProductListCrawler
+from . import excel_exporter
 from ..system_config.config import SystemConfig
-from ..config.config import category_config
 from ..network.event_manager import EventManager
+from ..logger.gui import LogHandler
 
 class ProductListTab(ttk.Frame):
     def __init__(self, parent):
@@ -115,23 +113,11 @@ class ProductListTab(ttk.Frame):
             self.logger.info("已选择爬取所有商品")
 
     def setup_logging(self):
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                logging.Handler.__init__(self)
-                self.text_widget = text_widget
-            def emit(self, record):
-                msg = self.format(record)
-                def append():
-                    self.text_widget.configure(state='normal')
-                    self.text_widget.insert(tk.END, msg + '\n')
-                    self.text_widget.see(tk.END)
-                    self.text_widget.configure(state='disabled')
-                self.text_widget.after(0, append)
         self.logger = logging.getLogger('product_list')
         self.logger.setLevel(logging.INFO)
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
-        text_handler = TextHandler(self.log_text)
+        text_handler = LogHandler(self.log_text)
         text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         self.logger.addHandler(text_handler)
         self.logger.info("商品列表管理工具已初始化")
@@ -166,6 +152,7 @@ class ProductListTab(ttk.Frame):
             # 获取是否只爬取在售商品的选项
             only_on_sale = self.only_on_sale_var.get()
             
+            self._stop_flag = False
             self.crawler_thread = threading.Thread(
                 target=self.run_crawler,
                 args=(pages, page_size, only_on_sale)
@@ -184,7 +171,13 @@ class ProductListTab(ttk.Frame):
             else:
                 self.logger.info(f"开始获取所有商品列表数据，计划获取 {pages} 页...")
                 
-            all_data = crawler.get_all_data(max_pages=pages, page_size=page_size, only_on_sale=only_on_sale)
+            # 逐页获取，点击停止后不再请求剩余的页
+            all_data = []
+            for items in crawler.iter_pages(max_pages=pages, page_size=page_size, only_on_sale=only_on_sale):
+                all_data.extend(items)
+                if self._stop_flag:
+                    self.logger.info("用户手动停止获取商品列表")
+                    break
             if all_data:
                 self.current_data = all_data
                 self.logger.info(f"共获取到 {len(all_data)} 条数据")
@@ -210,6 +203,7 @@ class ProductListTab(ttk.Frame):
             self.after(0, self.reset_ui)
 
     def stop_crawling(self):
+        self._stop_flag = True
         self.stop_button.configure(state='disabled')
         logging.info("正在停止爬取...")
 
@@ -242,91 +236,7 @@ class ProductListTab(ttk.Frame):
             if not file_path:  # 用户取消保存
                 return
                 
-            # 准备Excel数据
-            excel_data = []
-            
-            for product in self.current_data:
-                # 基本信息
-                base_info = {
-                    '商品ID': product['productId'],
-                    '商品名称': product['productName'],
-                    '商品类型': product['productType'],
-                    '来源类型': product['sourceType'],
-                    '商品编码': product['goodsId'],
-                    '主图URL': product['mainImageUrl'],
-                    '创建时间': datetime.fromtimestamp(product['createdAt']/1000).strftime('%Y-%m-%d %H:%M:%S'),
-                    '类目ID': product['leafCat']['catId'],
-                    '类目名称': product['leafCat']['catName']
-                }
-                
-                # 处理SKU信息
-                for sku in product['productSkuSummaries']:
-                    sku_info = base_info.copy()
-                    supplier_price = sku['supplierPrice'] / 100  # 转换为元
-                    
-                    # 计算底线价格和价格差额
-                    cat_id = product.get("leafCat", {}).get("catId")
-                    price_threshold = category_config.get_price_threshold_by_category_id(cat_id)
-                    price_difference = supplier_price - price_threshold if price_threshold not in (None, 0) else None
-
-                    sku_info.update({
-                        'SKU ID': sku['productSkuId'],
-                        'SKU编码': sku['extCode'],
-                        '供应商价格': supplier_price,
-                        '底线价格': price_threshold,
-                        '价格差额': price_difference,
-                        'SKU图片': sku['thumbUrl']
-                    })
-                    
-                    # 处理规格信息
-                    for spec in sku['productSkuSpecList']:
-                        sku_info[f'{spec["parentSpecName"]}'] = spec['specName']
-                    
-                    excel_data.append(sku_info)
-            
-            # 创建工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "商品列表"
-            
-            # 设置样式
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # 设置列顺序
-            columns_order = [
-                '商品ID', '商品名称', '商品类型', '来源类型', '商品编码',
-                '类目ID', '类目名称', 'SKU ID', 'SKU编码', '供应商价格',
-                '底线价格', '价格差额', '颜色', '尺码', '主图URL', 'SKU图片', '创建时间'
-            ]
-            
-            # 写入表头
-            for col, header in enumerate(columns_order, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-                # 设置列宽
-                ws.column_dimensions[get_column_letter(col)].width = 20
-            
-            # 写入数据
-            for row, data in enumerate(excel_data, 2):
-                for col, header in enumerate(columns_order, 1):
-                    value = data.get(header, '')
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
-                    cell.border = border
-            
-            # 保存文件
-            wb.save(file_path)
+            excel_exporter.export_product_list(self.current_data, file_path)
             
             logging.info(f"商品列表已导出到Excel: {file_path}")
             messagebox.showinfo("成功", "商品列表导出成功！")
@@ -354,72 +264,7 @@ class ProductListTab(ttk.Frame):
             if not file_path:  # 用户取消保存
                 return
                 
-            # 准备Excel数据
-            excel_data = []
-            
-            for product in self.current_data:
-                product_id = product['productId']
-                
-                # 获取商品的类别ID列表
-                category_ids = []
-                if 'leafCat' in product and product['leafCat']:
-                    category_ids.append(product['leafCat']['catId'])
-                
-                # 如果有categories字段，也添加进去
-                if 'categories' in product:
-                    categories = product['categories']
-                    for cat_key in ['cat1', 'cat2', 'cat3', 'cat4', 'cat5', 'cat6', 'cat7', 'cat8', 'cat9', 'cat10']:
-                        if cat_key in categories and categories[cat_key]['catId'] > 0:
-                            category_ids.append(categories[cat_key]['catId'])
-                
-                # 通过类别ID获取商品码映射
-                product_code = category_config.get_code_mapping_by_category_ids(category_ids)
-                
-                if not product_code:
-                    product_code = "未定义"
-                
-                excel_data.append({
-                    'SPUID': product_id,
-                    '商品识别码': product_code
-                })
-            
-            # 创建工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "商品码模板"
-            
-            # 设置样式
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # 写入表头
-            headers = ['SPUID', '商品识别码']
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=f"{header}")
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-                # 设置列宽
-                ws.column_dimensions[get_column_letter(col)].width = 20
-            
-            # 写入数据
-            for row, data in enumerate(excel_data, 2):
-                for col, header in enumerate(headers, 1):
-                    value = data.get(header, '')
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.alignment = Alignment(horizontal="left", vertical="center")
-                    cell.border = border
-            
-            # 保存文件
-            wb.save(file_path)
+            excel_exporter.export_product_code_template(self.current_data, file_path)
             
             logging.info(f"商品码模板已导出到Excel: {file_path}")
             messagebox.showinfo("成功", "商品码模板导出成功！")
@@ -437,17 +282,14 @@ class ProductListTab(ttk.Frame):
             
         try:
             # 收集所有SKU ID
-            all_sku_ids = []
-            for product in self.current_data:
-                for sku in product['productSkuSummaries']:
-                    all_sku_ids.append(sku['productSkuId'])
+            all_sku_ids = list(excel_exporter.iter_sku_ids(self.current_data))
             
             if not all_sku_ids:
                 messagebox.showwarning("警告", "没有找到SKU数据")
                 return
             
             # 计算需要拆分的文件数量
-            max_records_per_file = 1000
+            max_records_per_file = excel_exporter.MAX_INVENTORY_ROWS_PER_FILE
             total_sku_count = len(all_sku_ids)
             file_count = (total_sku_count + max_records_per_file - 1) // max_records_per_file
             
@@ -503,62 +345,8 @@ class ProductListTab(ttk.Frame):
         try:
             # 如果没有提供SKU ID列表，则从当前数据中收集
             if sku_ids is None:
-                sku_ids = []
-                for product in self.current_data:
-                    for sku in product['productSkuSummaries']:
-                        sku_ids.append(sku['productSkuId'])
-            
-            # 创建工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "库存模板"
-            
-            # 设置样式
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # 写入表头
-            headers = ['SKU ID', '', '', '修改后库存']
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-                # 设置列宽
-                ws.column_dimensions[get_column_letter(col)].width = 20
-            
-            # 写入说明行
-            ws.cell(row=2, column=1, value="必填指Temu的SKU ID")
-            ws.cell(row=2, column=4, value="条件必填指当前的实际总库存，导入成功后将直接覆盖线上已有库存")
-            
-            # 写入数据
-            for row, sku_id in enumerate(sku_ids, 3):
-                # SKU ID (第1列)
-                cell = ws.cell(row=row, column=1, value=sku_id)
-                cell.alignment = Alignment(horizontal="left", vertical="center")
-                cell.border = border
-                
-                # 第2、3列保持为空
-                for col in [2, 3]:
-                    cell = ws.cell(row=row, column=col, value="")
-                    cell.alignment = Alignment(horizontal="left", vertical="center")
-                    cell.border = border
-                
-                # 默认库存值 (第4列)
-                cell = ws.cell(row=row, column=4, value=1000)
-                cell.alignment = Alignment(horizontal="left", vertical="center")
-                cell.border = border
-            
-            # 保存文件
-            wb.save(file_path)
+                sku_ids = excel_exporter.iter_sku_ids(self.current_data)
+            excel_exporter.export_inventory_template(sku_ids, file_path)
             
         except Exception as e:
             raise Exception(f"导出库存模板失败: {str(e)}")
@@ -578,48 +366,15 @@ class ProductListTab(ttk.Frame):
             # 生成时间戳
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
-            # 导出商品列表
-            list_path = os.path.join(save_dir, f"商品列表_{timestamp}.xlsx")
-            self.export_product_list_to_path(list_path)
-            
-            # 导出商品码模板
-            code_path = os.path.join(save_dir, f"商品码模板_{timestamp}.xlsx")
-            self.export_product_code_template_to_path(code_path)
+            # 商品数据只展平一次，三种模板并行写入
+            result = excel_exporter.export_all_templates(self.current_data, save_dir, timestamp)
+            file_count = result["inventory_file_count"]
             
-            # 导出库存模板（支持拆分）
-            all_sku_ids = []
-            for product in self.current_data:
-                for sku in product['productSkuSummaries']:
-                    all_sku_ids.append(sku['productSkuId'])
-            
-            if all_sku_ids:
-                # 计算需要拆分的文件数量
-                max_records_per_file = 1000
-                total_sku_count = len(all_sku_ids)
-                file_count = (total_sku_count + max_records_per_file - 1) // max_records_per_file
-                
-                # 拆分并导出多个库存模板文件
-                for i in range(file_count):
-                    start_idx = i * max_records_per_file
-                    end_idx = min((i + 1) * max_records_per_file, total_sku_count)
-                    current_sku_ids = all_sku_ids[start_idx:end_idx]
-                    
-                    # 生成文件名
-                    if file_count == 1:
-                        filename = f"库存模板_{timestamp}.xlsx"
-                    else:
-                        filename = f"库存模板_{timestamp}-{i+1}.xlsx"
-                    
-                    inventory_path = os.path.join(save_dir, filename)
-                    self.export_inventory_template_to_path(inventory_path, current_sku_ids)
-                
-                logging.info(f"所有模板已导出到目录: {save_dir}")
-                if file_count > 1:
-                    messagebox.showinfo("成功", f"所有模板导出成功！\n库存模板已拆分为 {file_count} 个文件，每个文件最多包含 {max_records_per_file} 条记录。")
-                else:
-                    messagebox.showinfo("成功", "所有模板导出成功！")
+            logging.info(f"所有模板已导出到目录: {save_dir}")
+            if file_count > 1:
+                max_records_per_file = excel_exporter.MAX_INVENTORY_ROWS_PER_FILE
+                messagebox.showinfo("成功", f"所有模板导出成功！\n库存模板已拆分为 {file_count} 个文件，每个文件最多包含 {max_records_per_file} 条记录。")
             else:
-                logging.info(f"所有模板已导出到目录: {save_dir}")
                 messagebox.showinfo("成功", "所有模板导出成功！")
             
         except Exception as e:
@@ -630,91 +385,7 @@ class ProductListTab(ttk.Frame):
     def export_product_list_to_path(self, file_path):
         """导出商品列表到指定路径"""
         try:
-            # 准备Excel数据
-            excel_data = []
-            
-            for product in self.current_data:
-                # 基本信息
-                base_info = {
-                    '商品ID': product['productId'],
-                    '商品名称': product['productName'],
-                    '商品类型': product['productType'],
-                    '来源类型': product['sourceType'],
-                    '商品编码': product['goodsId'],
-                    '主图URL': product['mainImageUrl'],
-                    '创建时间': datetime.fromtimestamp(product['createdAt']/1000).strftime('%Y-%m-%d %H:%M:%S'),
-                    '类目ID': product['leafCat']['catId'],
-                    '类目名称': product['leafCat']['catName']
-                }
-                
-                # 处理SKU信息
-                for sku in product['productSkuSummaries']:
-                    sku_info = base_info.copy()
-                    supplier_price = sku['supplierPrice'] / 100  # 转换为元
-                    
-                    # 计算底线价格和价格差额
-                    cat_id = product.get("leafCat", {}).get("catId")
-                    price_threshold = category_config.get_price_threshold_by_category_id(cat_id)
-                    price_difference = supplier_price - price_threshold if price_threshold not in (None, 0) else None
-                    
-                    sku_info.update({
-                        'SKU ID': sku['productSkuId'],
-                        'SKU编码': sku['extCode'],
-                        '供应商价格': supplier_price,
-                        '底线价格': price_threshold,
-                        '价格差额': price_difference,
-                        'SKU图片': sku['thumbUrl']
-                    })
-                    
-                    # 处理规格信息
-                    for spec in sku['productSkuSpecList']:
-                        sku_info[f'{spec["parentSpecName"]}'] = spec['specName']
-                    
-                    excel_data.append(sku_info)
-            
-            # 创建工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "商品列表"
-            
-            # 设置样式
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # 设置列顺序
-            columns_order = [
-                '商品ID', '商品名称', '商品类型', '来源类型', '商品编码',
-                '类目ID', '类目名称', 'SKU ID', 'SKU编码', '供应商价格',
-                '底线价格', '价格差额', '颜色', '尺码', '主图URL', 'SKU图片', '创建时间'
-            ]
-            
-            # 写入表头
-            for col, header in enumerate(columns_order, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-                # 设置列宽
-                ws.column_dimensions[get_column_letter(col)].width = 20
-            
-            # 写入数据
-            for row, data in enumerate(excel_data, 2):
-                for col, header in enumerate(columns_order, 1):
-                    value = data.get(header, '')
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
-                    cell.border = border
-            
-            # 保存文件
-            wb.save(file_path)
+            excel_exporter.export_product_list(self.current_data, file_path)
             
         except Exception as e:
             raise Exception(f"导出商品列表失败: {str(e)}")
@@ -722,72 +393,7 @@ class ProductListTab(ttk.Frame):
     def export_product_code_template_to_path(self, file_path):
         """导出商品码模板到指定路径"""
         try:
-            # 准备Excel数据
-            excel_data = []
-            
-            for product in self.current_data:
-                product_id = product['productId']
-                
-                # 获取商品的类别ID列表
-                category_ids = []
-                if 'leafCat' in product and product['leafCat']:
-                    category_ids.append(product['leafCat']['catId'])
-                
-                # 如果有categories字段，也添加进去
-                if 'categories' in product:
-                    categories = product['categories']
-                    for cat_key in ['cat1', 'cat2', 'cat3', 'cat4', 'cat5', 'cat6', 'cat7', 'cat8', 'cat9', 'cat10']:
-                        if cat_key in categories and categories[cat_key]['catId'] > 0:
-                            category_ids.append(categories[cat_key]['catId'])
-                
-                # 通过类别ID获取商品码映射
-                product_code = category_config.get_code_mapping_by_category_ids(category_ids)
-                
-                if not product_code:
-                    product_code = "未定义"
-                
-                excel_data.append({
-                    'SPUID': product_id,
-                    '商品识别码': product_code
-                })
-            
-            # 创建工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "商品码模板"
-            
-            # 设置样式
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # 写入表头
-            headers = ['SPUID', '商品识别码']
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=f"{header}")
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-                # 设置列宽
-                ws.column_dimensions[get_column_letter(col)].width = 20
-            
-            # 写入数据
-            for row, data in enumerate(excel_data, 2):
-                for col, header in enumerate(headers, 1):
-                    value = data.get(header, '')
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.alignment = Alignment(horizontal="left", vertical="center")
-                    cell.border = border
-            
-            # 保存文件
-            wb.save(file_path)
+            excel_exporter.export_product_code_template(self.current_data, file_path)
             
         except Exception as e:
-            raise Exception(f"导出商品码模板失败: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"导出商品码模板失败: {str(e)}")
\ No newline at end of file
@@ -1,6 +1,4 @@
 import logging
-import time
-import random
 import os
 import requests
 import sys
@@ -38,17 +36,10 @@ class RealPictureUploader:
         
         self.images_dir = os.path.join(base_path, 'assets', 'images')
         
-    def random_delay(self, min_sec=0, max_sec=1):
-        """随机延迟，模拟人工操作"""
-        delay = random.uniform(min_sec, max_sec)
-        self.logger.info(f"随机延时 {delay:.2f} 秒")
-        time.sleep(delay)
-        
     def get_pending_products(self, category: Dict[str, Any], page: int = 1, page_size: int = 50) -> List[Dict[str, Any]]:
         """
         获取未上传实拍图的商品列表
         """
-        self.random_delay()
         
         # payload = {
         #     "page": page,
@@ -89,7 +80,6 @@ class RealPictureUploader:
         """
         获取上传签名
         """
-        self.random_delay()
         
         payload = {"tag": "flash-tag"}
         self.logger.info("获取上传签名")
@@ -112,8 +102,6 @@ class RealPictureUploader:
             self.logger.error(f"图片文件不存在: {image_path}")
             return None
             
-        self.random_delay()
-        
         # 准备multipart/form-data请求
         files = {
             'url_width_height': (None, 'true'),
@@ -136,6 +124,8 @@ class RealPictureUploader:
                 
             self.logger.info(f"上传图片: {os.path.basename(image_path)}")
             
+            # multipart上传不经过NetworkRequest，手动走一次限流
+            self.request.rate_limiter.wait(self.upload_url)
             response = requests.post(
                 self.upload_url,
                 params=params,
@@ -167,7 +157,6 @@ class RealPictureUploader:
         """
         批量上传商品实拍图
         """
-        self.random_delay()
         
         payload = {
             "spu_ids": spu_ids,
@@ -297,7 +286,6 @@ class RealPictureUploader:
                 if self.stop_flag_callback():
                     self.logger.info("检测到停止信号，不再处理下一个品类。")
                     break
-                self.random_delay()
                 
         if not self.stop_flag_callback():
             self.logger.info("所有品类处理完成")
@@ -8,6 +8,7 @@ from datetime import datetime
 from .crawler import RealPictureUploader
 from ..config.config import category_config
 from ..network.event_manager import EventManager
+from ..logger.gui import LogHandler
 
 class RealPictureUploaderTab(ttk.Frame):
     def __init__(self, parent):
@@ -125,20 +126,6 @@ class RealPictureUploaderTab(ttk.Frame):
 
     def setup_logging(self):
         """设置日志处理器"""
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                logging.Handler.__init__(self)
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record)
-                def append():
-                    self.text_widget.configure(state='normal')
-                    self.text_widget.insert(tk.END, msg + '\n')
-                    self.text_widget.see(tk.END)
-                    self.text_widget.configure(state='disabled')
-                self.text_widget.after(0, append)
-        
         self.logger = logging.getLogger('real_picture_uploader')
         self.logger.setLevel(logging.INFO)
         
@@ -147,7 +134,7 @@ class RealPictureUploaderTab(ttk.Frame):
             self.logger.removeHandler(handler)
             
         # 添加文本处理器
-        text_handler = TextHandler(self.log_text)
+        text_handler = LogHandler(self.log_text)
         text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         self.logger.addHandler(text_handler)
         
@@ -1,11 +1,11 @@
 import logging
-import time
-import random
-from typing import List, Dict
+from typing import List, Dict, Optional
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from ..network.request import NetworkRequest
+from ..catalogue.client import CatalogueClient
+from ..jobs import Job, JobJournal
 
 @dataclass
 class StockProduct:
@@ -35,19 +35,29 @@ class StockBatchSetter:
         self.query_url = "https://agentseller.temu.com/visage-agent-seller/product/skc/pageQuery"
         self.update_url = "https://agentseller.temu.com/darwin-mms/api/kiana/foredawn/sales/stock/updateMmsSkuSalesStock"
         self.request = NetworkRequest()
+        self.catalogue = CatalogueClient()
         self.page_size = 100
+        # 批量设置库存的任务日志（中断后再次运行时跳过已设置的商品）
+        self.journal = JobJournal()
         
-    def random_delay(self):
-        """随机延时"""
-        time.sleep(random.uniform(0.5, 1.5))
-        
-    def get_all_products(self) -> List[StockProduct]:
+    def get_all_products(self, days: Optional[int] = None) -> List[StockProduct]:
         """获取所有待设置库存的商品
         
+        Args:
+            days: 只需要N天内创建的商品时传入。接口按创建时间倒序返回，
+                  翻到整页都早于截止时间就停止，只会请求前几页
+        
         Returns:
             商品列表
         """
         self.logger.info("开始获取待设置库存的商品列表...")
+        
+        cutoff = None
+        if days is not None:
+            # createdAt 是毫秒时间戳
+            cutoff = (datetime.now() - timedelta(days=days + 1)).timestamp() * 1000
+        
+        # 查到的商品会被直接加库存，"库存为0"必须用接口的实时筛选，不能用商品目录快照中可能过期的库存
         page = 1
         all_products = []
         total_products = 0
@@ -83,13 +93,7 @@ class StockBatchSetter:
                 
                 # 解析商品数据
                 for item in page_items:
-                    all_products.append(StockProduct(
-                        productId=item["productId"],
-                        productSkcId=item["productSkcId"],
-                        productName=item["productName"],
-                        productSkuSummaries=item["productSkuSummaries"],
-                        createdAt=item.get("createdAt", 0)  # 获取创建时间戳
-                    ))
+                    all_products.append(self._to_product(item))
                 
                 self.logger.info(f"第 {page} 页获取到 {len(page_items)} 个商品")
                 
@@ -97,9 +101,12 @@ class StockBatchSetter:
                 if page * self.page_size >= total_products:
                     break
                     
+                # 整页都早于截止时间，后面的页只会更早
+                if cutoff is not None and page_items and all(0 < item.get("createdAt", 0) < cutoff for item in page_items):
+                    self.logger.info(f"第 {page} 页的商品都创建于 {days} 天之前，停止翻页")
+                    break
+                    
                 page += 1
-                # 随机延时，避免请求过于频繁
-                self.random_delay()
                 
             except Exception as e:
                 self.logger.error(f"获取第 {page} 页商品列表异常: {str(e)}")
@@ -108,6 +115,16 @@ class StockBatchSetter:
         self.logger.info(f"商品列表获取完成，共 {len(all_products)} 个商品")
         return all_products
         
+    def _to_product(self, item: Dict) -> StockProduct:
+        """把pageQuery条目转换为商品对象"""
+        return StockProduct(
+            productId=item["productId"],
+            productSkcId=item["productSkcId"],
+            productName=item["productName"],
+            productSkuSummaries=item["productSkuSummaries"],
+            createdAt=item.get("createdAt", 0)  # 获取创建时间戳
+        )
+        
     def set_stock(self, product: StockProduct, stock_num: int) -> Dict:
         """设置单个商品的库存
         
@@ -127,6 +144,8 @@ class StockBatchSetter:
                     "virtualStockDiff": stock_num
                 })
             
+            # 接口每次只能修改一个SKC（productId/productSkcId在顶层），该SKC的所有SKU已经在这一次请求中提交，
+            # 不同SKC的库存变更无法合并成一次请求
             data = {
                 "productId": product.productId,
                 "productSkcId": product.productSkcId,
@@ -140,19 +159,55 @@ class StockBatchSetter:
             self.logger.error(f"设置商品 {product.productName} 库存异常: {str(e)}")
             return {"success": False, "errorMsg": str(e)}
         
-    def batch_set_stock(self, max_workers: int = 5, days: int = 5) -> Dict:
+    def _record_result(self, job: Job, product_skc_id: int, future: Future):
+        """把库存写请求的结果记录到任务日志，被取消（没有发出）的条目保持原状态"""
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            job.mark_failed(product_skc_id, str(e))
+            return
+        if result and result.get("success"):
+            job.mark_applied(product_skc_id)
+        else:
+            job.mark_failed(product_skc_id, result.get('errorMsg', '未知错误') if result else '无返回')
+        
+    def batch_set_stock(self, max_workers: Optional[int] = None, days: int = 5, resume: bool = True) -> Dict:
         """批量设置库存
         
+        每个商品的处理结果记录在任务日志中。库存变更是增量（virtualStockDiff），
+        所以继续上次任务时总是重新查询库存为0的商品列表，并跳过日志中已经设置成功的商品，
+        不会重复增加库存
+        
         Args:
-            max_workers: 最大线程数
+            max_workers: 最大线程数，默认取并发控制器的上限（实际在途请求数由网络层自适应控制）
             days: 只处理N天内创建的商品
+            resume: 是否继续上次未完成的任务
             
         Returns:
             批量处理结果统计
         """
-        # 获取所有商品
-        products = self.get_all_products()
+        stock_num = 1000  # 写死库存数量为1000
+        job = self.journal.open("stock_setter", {"days": days, "stock_num": stock_num}, resume=resume)
+        try:
+            # 本线程和线程池发出的请求都记录为属于这个任务，退出时（包括异常）取消标注
+            with job.active():
+                return self._set_stock_job(job, max_workers, days, stock_num)
+        except Exception:
+            # 保留任务日志，再次运行时继续
+            job.finish(stopped=True)
+            raise
+    
+    def _set_stock_job(self, job: Job, max_workers: Optional[int], days: int, stock_num: int) -> Dict:
+        """执行一次批量设置库存任务"""
+        # 只获取最近几页（N天内创建的商品）
+        products = self.get_all_products(days=days)
+        if self.stop_flag_callback():
+            job.finish(stopped=True)
+            return {"success": 0, "failed": 0, "total": 0, "skipped": 0}
         if not products:
+            job.finish()
             self.logger.warning("没有找到需要设置库存的商品")
             return {"success": 0, "failed": 0, "total": 0, "skipped": 0}
             
@@ -182,24 +237,45 @@ class StockBatchSetter:
                 self.logger.error(f"处理商品 {product.productName} 创建时间时出错: {str(e)}，跳过")
                 skipped_count += 1
         
+        # 上次运行已经设置成功的商品不再重复增加库存
+        applied_count = 0
+        remaining_products = []
+        for product in filtered_products:
+            job.add_item(product.productSkcId, {"productId": product.productId, "productName": product.productName})
+            if job.is_applied(product.productSkcId):
+                applied_count += 1
+            else:
+                remaining_products.append(product)
+        job.set_fetch_complete()
+        if applied_count:
+            self.logger.info(f"继续上次未完成的任务，跳过已设置库存的 {applied_count} 个商品")
+        filtered_products = remaining_products
+        skipped_count += applied_count
+        
         if not filtered_products:
+            job.finish()
             self.logger.warning(f"过滤后没有符合条件的商品（{days}天内创建）")
             return {"success": 0, "failed": 0, "total": 0, "skipped": skipped_count}
             
         total = len(filtered_products)
-        stock_num = 1000  # 写死库存数量为1000
         self.logger.info(f"开始批量设置库存，共 {total} 个商品（跳过 {skipped_count} 个），每个商品设置 {stock_num} 库存")
         
         success_count = 0
         failed_count = 0
         
+        if max_workers is None:
+            max_workers = self.request.concurrency.max_limit
+
         # 使用线程池并发设置库存
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 提交所有任务
             future_to_product = {
-                executor.submit(self.set_stock, product, stock_num): product 
+                executor.submit(job.bind(self.set_stock), product, stock_num): product
                 for product in filtered_products
             }
+            # 请求完成时立即记录到任务日志（停止后才完成的请求也不会丢失）
+            for future, product in future_to_product.items():
+                future.add_done_callback(lambda f, skc_id=product.productSkcId: self._record_result(job, skc_id, f))
             
             # 处理完成的任务
             for idx, future in enumerate(as_completed(future_to_product), 1):
@@ -208,6 +284,9 @@ class StockBatchSetter:
                 # 检查是否被用户停止
                 if self.stop_flag_callback():
                     self.logger.info("用户手动停止批量设置库存。")
+                    # 还没开始的请求不再发出
+                    for f in future_to_product:
+                        f.cancel()
                     break
                 
                 try:
@@ -228,9 +307,12 @@ class StockBatchSetter:
                 if self.progress_callback:
                     self.progress_callback(idx, total)
                 
-                # 随机延时，避免请求过于频繁
-                self.random_delay()
-        
+        # 库存已经变了，快照中的库存数据不再可信
+        if success_count:
+            self.catalogue.invalidate()
+            
+        job.finish(stopped=self.stop_flag_callback())
+            
         # 最终统计
         self.logger.info(f"批量设置库存完成！成功: {success_count}, 失败: {failed_count}, 跳过: {skipped_count}, 总计: {total}")
         
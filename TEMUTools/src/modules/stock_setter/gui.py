@@ -6,6 +6,8 @@ from typing import Optional
 from .crawler import StockBatchSetter
 from ..system_config.config import SystemConfig
 from ..network.event_manager import EventManager
+from ..network.concurrency import ConcurrencyController
+from ..logger.gui import LogHandler
 
 class StockSetterTab(ttk.Frame):
     """批量设置库存标签页"""
@@ -104,6 +106,10 @@ class StockSetterTab(ttk.Frame):
         self.progress_label = ttk.Label(parent, text="0/0")
         self.progress_label.grid(row=1, column=0, columnspan=4, sticky=(tk.W, tk.E, tk.N, tk.S), pady=2)
 
+        # 网络层当前的自适应并发数
+        self.concurrency_label = ttk.Label(parent, text="")
+        self.concurrency_label.grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=2)
+
         parent.columnconfigure(0, weight=1)
         
     def create_log_area(self, parent):
@@ -164,23 +170,7 @@ class StockSetterTab(ttk.Frame):
         self.logger.setLevel(logging.INFO)
         
         # 添加文本处理器
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record)
-                
-                def append():
-                    self.text_widget.configure(state="normal")
-                    self.text_widget.insert("end", msg + "\n")
-                    self.text_widget.configure(state="disabled")
-                    self.text_widget.see("end")
-                    
-                self.text_widget.after(0, append)
-                
-        handler = TextHandler(self.log_text)
+        handler = LogHandler(self.log_text)
         formatter = logging.Formatter(
             "%(asctime)s - %(levelname)s - %(message)s"
         )
@@ -268,6 +258,7 @@ class StockSetterTab(ttk.Frame):
             )
             thread.daemon = True
             thread.start()
+            self.refresh_concurrency(thread)
             
         except Exception as e:
             self.logger.error(f"启动过程发生错误: {str(e)}")
@@ -323,6 +314,19 @@ class StockSetterTab(ttk.Frame):
         self.log_text.configure(state="disabled")
         self.logger.info("日志已清空")
         
+    def refresh_concurrency(self, thread: threading.Thread):
+        """处理期间每秒刷新一次当前并发数
+        
+        Args:
+            thread: 正在运行的处理线程
+        """
+        stats = ConcurrencyController().get_stats()
+        self.concurrency_label.config(text=f"并发: {stats['in_flight']}/{stats['limit']}")
+        if thread.is_alive():
+            self.after(1000, self.refresh_concurrency, thread)
+        else:
+            self.concurrency_label.config(text="")
+            
     def update_progress(self, current: int, total: int):
         """更新进度条
         
@@ -1,10 +1,11 @@
-import json
 import os
 import sys
-import browsercookie
+import threading
 from typing import Dict, Optional, Tuple
 from urllib.parse import urlparse
 
+from ..config.store import ConfigStore, ConfigSnapshot
+
 class SystemConfig:
     """系统配置管理类"""
     
@@ -26,8 +27,16 @@ class SystemConfig:
         else:
             # 开发环境：从源码目录查找配置
             self.config_file = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config', 'system_config.json')
+        self._store = ConfigStore()
         self.config: Dict = self._load_config()
         
+        # 配置版本号：配置每变更一次加1，供请求头缓存判断是否失效
+        self.version = 0
+        self._lock = threading.RLock()
+        
+        # 配置文件被外部修改（手动编辑、其他进程）时替换内存中的配置
+        self._store.subscribe(self.config_file, self._on_file_changed)
+        
         # 统一使用agentseller.temu.com域名
         self.base_url = "https://agentseller.temu.com"
         
@@ -56,35 +65,37 @@ class SystemConfig:
             self._save_config(default_config)
             return default_config
             
-        try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                # 兼容旧版本配置，迁移数据
-                if "seller_cookie" in config or "compliance_cookie" in config:
-                    # 优先使用seller_cookie，如果没有则使用compliance_cookie
-                    cookie = config.get("seller_cookie") or config.get("compliance_cookie", "")
-                    new_config = {
-                        "cookie": cookie,
-                        "mallid": config.get("mallid", ""),
-                        "last_update": config.get("last_update", "")
-                    }
-                    self._save_config(new_config)
-                    return new_config
-                return config
-        except Exception as e:
-            print(f"加载配置文件失败: {str(e)}")
-            return {}
+        # 解析失败时存储返回空配置（与原来一致）；返回副本，self.config可以原地修改
+        config = self._store.snapshot(self.config_file).copy()
+        # 兼容旧版本配置，迁移数据
+        if "seller_cookie" in config or "compliance_cookie" in config:
+            # 优先使用seller_cookie，如果没有则使用compliance_cookie
+            cookie = config.get("seller_cookie") or config.get("compliance_cookie", "")
+            new_config = {
+                "cookie": cookie,
+                "mallid": config.get("mallid", ""),
+                "last_update": config.get("last_update", "")
+            }
+            self._save_config(new_config)
+            return new_config
+        return config
             
     def _save_config(self, config: Dict) -> None:
-        """保存配置文件"""
+        """保存配置文件（存储保存的是副本，之后对config的原地修改不影响存储中的快照）"""
         try:
-            # 确保配置目录存在
-            os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-            
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            self._store.save(self.config_file, config, indent=4)
         except Exception as e:
             print(f"保存配置文件失败: {str(e)}")
+            
+    def _on_file_changed(self, snapshot: ConfigSnapshot) -> None:
+        """配置文件被外部修改后整体替换内存中的配置，并通知订阅者"""
+        with self._lock:
+            self.config = snapshot.copy()
+            self.version += 1
+            version = self.version
+        
+        from ..network.event_manager import EventManager
+        EventManager().publish("system_config_changed", version=version)
     
     def get_website_cookies(self, website_url: str) -> Tuple[str, str]:
         """
@@ -97,7 +108,8 @@ class SystemConfig:
             tuple: (cookie_string, error_message)
         """
         try:
-            # 获取Chrome浏览器的所有cookie
+            # 获取Chrome浏览器的所有cookie（browsercookie导入较慢，用到时才导入）
+            import browsercookie
             all_cookies = browsercookie.chrome()
             
             # 解析URL以获取域名
@@ -159,13 +171,14 @@ class SystemConfig:
             
             # 临时更新配置中的cookie以便使用NetworkRequest
             original_cookie = self.config.get("cookie", "")
-            self.config["cookie"] = cookie
+            self._set_cookie(cookie)
             
-            # 使用NetworkRequest发送POST请求
-            result = request.post(self.test_api_url, data={})
-            
-            # 恢复原始cookie
-            self.config["cookie"] = original_cookie
+            try:
+                # 使用NetworkRequest发送POST请求
+                result = request.post(self.test_api_url, data={})
+            finally:
+                # 恢复原始cookie
+                self._set_cookie(original_cookie)
             
             if not result:
                 return False, "API请求失败，请检查Cookie是否有效", {}
@@ -201,13 +214,66 @@ class SystemConfig:
         """获取mallid"""
         return self.config.get("mallid", "")
         
+    def get_rate_limit_config(self) -> Dict:
+        """获取限流配置（未配置的项使用默认值）"""
+        return self.config.get("rate_limit", {})
+        
+    def get_concurrency_config(self) -> Dict:
+        """获取自适应并发配置（未配置的项使用默认值）"""
+        return self.config.get("concurrency", {})
+        
+    def get_catalogue_config(self) -> Dict:
+        """获取商品目录快照配置（未配置的项使用默认值）"""
+        return self.config.get("catalogue", {})
+        
+    def get_response_cache_config(self) -> Dict:
+        """获取响应缓存配置（未配置的项使用默认值）"""
+        return self.config.get("response_cache", {})
+        
+    def get_retry_config(self) -> Dict:
+        """获取请求重试配置（未配置的项使用默认值）"""
+        return self.config.get("retry", {})
+        
+    def get_jobs_config(self) -> Dict:
+        """获取批量任务日志配置（未配置的项使用默认值）"""
+        return self.config.get("jobs", {})
+        
+    def get_request_log_config(self) -> Dict:
+        """获取请求日志配置（未配置的项使用默认值）"""
+        return self.config.get("request_log", {})
+        
+    def get_replay_config(self) -> Dict:
+        """获取流量录制/回放配置（未配置的项使用默认值）"""
+        return self.config.get("replay", {})
+        
+    def get_bid_history_config(self) -> Dict:
+        """获取竞价历史配置（未配置的项使用默认值）"""
+        return self.config.get("bid_history", {})
+        
+    def get_auth_snapshot(self) -> Tuple[int, str, str]:
+        """原子地获取 (版本号, cookie, mallid)，避免读到更新了一半的配置"""
+        with self._lock:
+            return self.version, self.config.get("cookie", ""), self.config.get("mallid", "")
+        
+    def _set_cookie(self, cookie: str) -> None:
+        """仅在内存中替换cookie（不落盘），并通知请求头缓存失效"""
+        with self._lock:
+            self.config["cookie"] = cookie
+            self.version += 1
+        
     def update_config(self, cookie: str = "", mallid: str = "") -> None:
         """更新配置"""
-        self.config["cookie"] = cookie
-        self.config["mallid"] = mallid
+        with self._lock:
+            self.config["cookie"] = cookie
+            self.config["mallid"] = mallid
             
-        self.config["last_update"] = self._get_current_time()
-        self._save_config(self.config)
+            self.config["last_update"] = self._get_current_time()
+            self._save_config(self.config)
+            self.version += 1
+        
+        # 通知所有订阅者配置已变更（请求头缓存通过版本号自动失效）
+        from ..network.event_manager import EventManager
+        EventManager().publish("system_config_changed", version=self.version)
         
     # 保留兼容性方法，避免其他模块调用报错
     def get_seller_cookie(self) -> str:
@@ -1,10 +1,10 @@
 import json
-import time
 import logging
 from datetime import datetime
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Union, Any, Iterator
 from ..network.request import NetworkRequest
+from ..network.paginator import iter_pages, page_count
 
 # 配置日志
 logging.basicConfig(
@@ -282,6 +282,10 @@ class ViolationListCrawler:
         
     def get_page_data(self, cookie: str, page: int, page_size: int) -> Optional[ViolationListResponse]:
         """获取指定页码的数据"""
+        return self.request.engine.run(self.aget_page_data(cookie, page, page_size))
+        
+    async def aget_page_data(self, cookie: str, page: int, page_size: int) -> Optional[ViolationListResponse]:
+        """获取指定页码的数据（协程）"""
         payload = {
             "page_num": page,
             "page_size": page_size,
@@ -298,7 +302,7 @@ class ViolationListCrawler:
                 logger.error("Cookie未设置")
                 return None
             
-            result = self.request.post(self.api_url, data=payload)
+            result = await self.request.apost(self.api_url, data=payload)
             
             if not result:
                 logger.error(f"第 {page} 页数据获取失败")
@@ -339,9 +343,11 @@ class ViolationListCrawler:
             logger.error(f"获取第 {page} 页数据时发生错误: {str(e)}")
             return None
             
-    def get_all_data(self, cookie: str, start_page: int = 1, end_page: int = 1, page_size: int = 100, 
-                    progress_callback=None, stop_flag_callback=None) -> List[Dict[str, Any]]:
-        """获取指定页数的数据
+    def iter_pages(self, cookie: str, start_page: int = 1, end_page: int = 1, page_size: int = 100,
+                   progress_callback=None, stop_flag_callback=None) -> Iterator[ViolationListResponse]:
+        """按页产出违规商品数据
+        
+        先获取起始页拿到total，再按total截断结束页，之后的页会提前并发请求
         
         Args:
             cookie (str): 卖家Cookie
@@ -351,56 +357,80 @@ class ViolationListCrawler:
             progress_callback: 进度回调函数
             stop_flag_callback: 停止标志回调函数
             
-        Returns:
-            List[Dict[str, Any]]: 违规商品数据列表，每个商品数据为字典格式
+        Yields:
+            ViolationListResponse: 每一页的响应数据
         """
-        all_data = []
         total_pages = end_page - start_page + 1
         
-        for page in range(start_page, end_page + 1):
-            # 检查停止标志
-            if stop_flag_callback and stop_flag_callback():
-                logger.info("用户请求停止，任务已中断")
-                break
-                
-            try:
-                result = self.get_page_data(cookie, page, page_size)
-                
-                if not result:
-                    logger.error(f"第 {page} 页数据获取失败")
-                    break
-                    
-                # 获取违规商品列表数据
-                items = result.result.punish_appeal_entrance_list
-                if not items:
-                    logger.info("没有更多数据")
-                    break
-                    
-                # 将数据类对象转换为字典
-                for item in items:
-                    try:
-                        item_dict = item.to_dict()
-                        all_data.append(item_dict)
-                    except Exception as e:
-                        logger.error(f"转换商品数据为字典时出错: {str(e)}")
-                        continue
-                
-                logger.info(f"已获取第 {page} 页数据，当前共 {len(all_data)} 条记录")
-                
-                # 更新进度
-                if progress_callback:
-                    progress = ((page - start_page + 1) / total_pages) * 100
-                    progress_callback(progress)
-                
-                # 检查是否还有更多数据
-                if len(all_data) >= result.result.total:
-                    logger.info(f"已获取所有数据，共 {result.result.total} 条")
+        def report(page: int):
+            if progress_callback:
+                progress = ((page - start_page + 1) / total_pages) * 100
+                progress_callback(progress)
+        
+        if stop_flag_callback and stop_flag_callback():
+            logger.info("用户请求停止，任务已中断")
+            return
+            
+        first = self.get_page_data(cookie, start_page, page_size)
+        if not first:
+            logger.error(f"第 {start_page} 页数据获取失败")
+            return
+        if not first.result.punish_appeal_entrance_list:
+            logger.info("没有更多数据")
+            return
+        yield first
+        report(start_page)
+        
+        # 根据total计算实际的最后一页，避免请求不存在的页
+        last_page = min(end_page, page_count(first.result.total, page_size))
+        for page, result in iter_pages(
+            self.request,
+            lambda page: self.aget_page_data(cookie, page, page_size),
+            range(start_page + 1, last_page + 1),
+            stop_flag_callback
+        ):
+            if not result:
+                if stop_flag_callback and stop_flag_callback():
+                    logger.info("用户请求停止，任务已中断")
                     break
-                
-                time.sleep(1)  # 添加延迟，避免请求过快
-                
-            except Exception as e:
-                logger.error(f"处理第 {page} 页数据时发生错误: {str(e)}")
+                logger.error(f"第 {page} 页数据获取失败")
                 continue
+            if not result.result.punish_appeal_entrance_list:
+                logger.info("没有更多数据")
+                break
+            yield result
+            report(page)
+        
+        if last_page < end_page:
+            logger.info(f"已获取所有数据，共 {first.result.total} 条")
+    
+    def iter_items(self, cookie: str, start_page: int = 1, end_page: int = 1, page_size: int = 100,
+                   progress_callback=None, stop_flag_callback=None) -> Iterator[Dict[str, Any]]:
+        """逐个产出违规商品数据（字典格式），下游可以边获取边处理"""
+        for result in self.iter_pages(cookie, start_page, end_page, page_size, progress_callback, stop_flag_callback):
+            # 将数据类对象转换为字典
+            for item in result.result.punish_appeal_entrance_list:
+                try:
+                    yield item.to_dict()
+                except Exception as e:
+                    logger.error(f"转换商品数据为字典时出错: {str(e)}")
+                    continue
             
-        return all_data 
\ No newline at end of file
+    def get_all_data(self, cookie: str, start_page: int = 1, end_page: int = 1, page_size: int = 100, 
+                    progress_callback=None, stop_flag_callback=None) -> List[Dict[str, Any]]:
+        """获取指定页数的数据
+        
+        Args:
+            cookie (str): 卖家Cookie
+            start_page (int): 起始页码
+            end_page (int): 结束页码
+            page_size (int): 每页数量
+            progress_callback: 进度回调函数
+            stop_flag_callback: 停止标志回调函数
+            
+        Returns:
+            List[Dict[str, Any]]: 违规商品数据列表，每个商品数据为字典格式
+        """
+        all_data = list(self.iter_items(cookie, start_page, end_page, page_size, progress_callback, stop_flag_callback))
+        logger.info(f"共获取 {len(all_data)} 条记录")
+        return all_data
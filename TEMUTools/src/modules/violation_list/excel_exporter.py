@@ -1,6 +1,3 @@
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
 from datetime import datetime
 from typing import List, Dict, Any
 import logging
@@ -47,6 +44,9 @@ class ViolationListExcelExporter:
             bool: 是否导出成功
         """
         try:
+            # openpyxl在导出时才导入，不拖慢程序启动
+            from openpyxl import Workbook
+
             # 创建工作簿
             wb = Workbook()
             ws = wb.active
@@ -8,6 +8,7 @@ from .crawler import ViolationListCrawler
 from .excel_exporter import ViolationListExcelExporter
 import logging
 from ..system_config.config import SystemConfig
+from ..logger.gui import LogHandler
 
 logger = logging.getLogger(__name__)
 
@@ -217,21 +218,6 @@ class ViolationListTab(ttk.Frame):
         
     def setup_logging(self):
         """设置日志处理器"""
-        # 创建自定义日志处理器
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                logging.Handler.__init__(self)
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record)
-                def append():
-                    self.text_widget.configure(state='normal')
-                    self.text_widget.insert(tk.END, msg + '\n')
-                    self.text_widget.see(tk.END)
-                    self.text_widget.configure(state='disabled')
-                self.text_widget.after(0, append)
-        
         # 创建独立的logger
         self.logger = logging.getLogger('violation_list')
         self.logger.setLevel(logging.INFO)
@@ -241,7 +227,7 @@ class ViolationListTab(ttk.Frame):
             self.logger.removeHandler(handler)
         
         # 添加文本处理器
-        text_handler = TextHandler(self.log_text)
+        text_handler = LogHandler(self.log_text)
         text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         self.logger.addHandler(text_handler)
         
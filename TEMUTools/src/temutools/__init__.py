@@ -0,0 +1,5 @@
+"""
+TEMUTools 命令行模式
+
+python -m temutools run <任务名称>，不导入tkinter，可以在没有图形界面的服务器上运行
+"""
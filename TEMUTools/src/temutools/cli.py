@@ -0,0 +1,244 @@
+"""
+命令行入口
+不启动图形界面，直接运行各模块的批量任务，适合在Linux服务器上用cron或systemd定时执行：
+
+    python -m temutools run price_review --workers 8
+    python -m temutools run stock_setter --days 3
+    python -m temutools run price_review --record traffic.jsonl.gz       # 录制线上流量
+    python -m temutools run price_review --replay traffic.jsonl.gz       # 用录制的流量回放，不访问线上接口
+    python -m temutools list
+
+Cookie和MallID从 config/system_config.json 读取；任务的处理进度记录在任务日志中，
+被停止或中断后再次运行同一任务时从中断处继续
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+# 与main.py一样以src为根目录导入各模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 退出码
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_CONFIG_ERROR = 2
+EXIT_STOPPED = 130
+
+
+class _ProgressLogger:
+    """把进度回调转换为日志，每完成10%记录一次"""
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self._last_step = -1
+
+    def __call__(self, current: int, total: int):
+        if not total:
+            return
+        step = current * 10 // total
+        if step != self._last_step:
+            self._last_step = step
+            self.logger.info(f"进度: {current}/{total} ({current * 100 // total}%)")
+
+
+def _run_price_review(args, logger: logging.Logger, stop_flag: Callable[[], bool]) -> Tuple[int, int]:
+    from modules.price_review.crawler import PriceReviewCrawler
+    from modules.system_config.config import SystemConfig
+    crawler = PriceReviewCrawler(
+        cookie=SystemConfig().get_seller_cookie(),
+        logger=logger,
+        progress_callback=_ProgressLogger(logger),
+        stop_flag_callback=stop_flag
+    )
+    results = crawler.batch_process_price_reviews_mt(
+        args.workers, not args.no_rebargain, args.max_rounds, resume=not args.no_resume, prefetch=args.prefetch
+    )
+    success = sum(1 for r in results if r['success'])
+    return success, len(results) - success
+
+
+def _run_bid_management(args, logger: logging.Logger, stop_flag: Callable[[], bool]) -> Tuple[int, int]:
+    from modules.bid_management.crawler import BidManagementCrawler
+    # 进度消息由爬虫自己记录到日志
+    crawler = BidManagementCrawler(
+        logger=logger,
+        progress_callback=lambda message, current, total: None,
+        stop_flag_callback=stop_flag
+    )
+    results = crawler.process_all_bids(resume=not args.no_resume, max_workers=args.workers)
+    success = sum(1 for r in results if r.success)
+    return success, len(results) - success
+
+
+def _run_stock_setter(args, logger: logging.Logger, stop_flag: Callable[[], bool]) -> Tuple[int, int]:
+    from modules.stock_setter.crawler import StockBatchSetter
+    from modules.system_config.config import SystemConfig
+    crawler = StockBatchSetter(
+        cookie=SystemConfig().get_seller_cookie(),
+        logger=logger,
+        progress_callback=_ProgressLogger(logger),
+        stop_flag_callback=stop_flag
+    )
+    result = crawler.batch_set_stock(max_workers=args.workers, days=args.days, resume=not args.no_resume)
+    return result.get("success", 0), result.get("failed", 0)
+
+
+def _run_cert_checker(args, logger: logging.Logger, stop_flag: Callable[[], bool]) -> Tuple[int, int]:
+    from modules.cert_checker.crawler import CertChecker
+    crawler = CertChecker(logger=logger, progress_callback=_ProgressLogger(logger), stop_flag_callback=stop_flag)
+    result = crawler.batch_set_stock_to_zero(max_workers=args.workers)
+    return result.get("success", 0), result.get("failed", 0)
+
+
+def _run_manual_checker(args, logger: logging.Logger, stop_flag: Callable[[], bool]) -> Tuple[int, int]:
+    from modules.manual_checker.crawler import ManualChecker
+    crawler = ManualChecker(logger=logger, progress_callback=_ProgressLogger(logger), stop_flag_callback=stop_flag)
+    result = crawler.batch_set_stock_to_zero(max_workers=args.workers)
+    return result.get("success", 0), result.get("failed", 0)
+
+
+# 任务名称 -> (说明, 运行函数, 是否支持停止标志)
+# 不支持停止标志的任务收到停止信号时直接中断，任务日志保留，下次运行时继续
+JOBS: Dict[str, Tuple[str, Callable, bool]] = {
+    "price_review": ("批量核价", _run_price_review, True),
+    "bid_management": ("自动竞价", _run_bid_management, True),
+    "stock_setter": ("批量设置库存", _run_stock_setter, True),
+    "cert_checker": ("资质排查（库存设为0）", _run_cert_checker, True),
+    "manual_checker": ("说明书排查（库存设为0）", _run_manual_checker, True),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="temutools", description="TEMUTools 命令行模式（不启动图形界面）")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出调试日志")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="列出可以运行的任务")
+
+    run = subparsers.add_parser("run", help="运行批量任务")
+    run.add_argument("job", choices=sorted(JOBS), help="任务名称")
+    run.add_argument("--workers", type=int, default=None,
+                     help="并发线程数，默认取并发控制器的上限（实际在途请求数由网络层自适应控制）")
+    run.add_argument("--no-resume", action="store_true", help="不继续上次未完成的任务，重新开始")
+    run.add_argument("--days", type=int, default=5, help="stock_setter: 只处理N天内创建的商品（默认5）")
+    run.add_argument("--no-rebargain", action="store_true", help="price_review: 低于底线时直接拒绝，不重新调价")
+    run.add_argument("--max-rounds", type=int, default=None,
+                     help="price_review: 最多核价几轮（默认使用全局配置中的值）")
+    run.add_argument("--prefetch", type=int, default=None,
+                     help="price_review: 最多提前获取多少个商品的核价建议（默认使用全局配置中的值，0表示不预取）")
+    traffic = run.add_mutually_exclusive_group()
+    traffic.add_argument("--record", metavar="ARCHIVE", help="录制请求和响应到文件（gzip压缩的JSONL）")
+    traffic.add_argument("--replay", metavar="ARCHIVE", help="从录制文件回放响应，不访问线上接口")
+    run.add_argument("--replay-latency", type=float, default=0, metavar="MS", help="回放时每个响应额外延迟的毫秒数")
+    run.add_argument("--replay-jitter", type=float, default=0, metavar="MS", help="回放时额外的随机延迟上限（毫秒）")
+    run.add_argument("--replay-error-rate", type=float, default=0.0, metavar="RATE",
+                     help="回放时随机返回503的比例（0~1）")
+    run.add_argument("--no-rate-limit", action="store_true", help="回放时关闭限流，测试最大吞吐（只能和--replay一起使用）")
+    return parser
+
+
+def _install_signal_handlers(stop_event: threading.Event, stoppable: bool, logger: logging.Logger):
+    """第一次SIGINT/SIGTERM设置停止标志（任务处理完在途的请求后退出），第二次直接中断"""
+    def handler(signum, frame):
+        if stop_event.is_set() or not stoppable:
+            raise KeyboardInterrupt
+        stop_event.set()
+        logger.warning("收到停止信号，正在停止任务（再次发送信号将立即中断）...")
+
+    signal.signal(signal.SIGINT, handler)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handler)
+
+
+def run_job(args) -> int:
+    """运行一个批量任务，返回进程退出码"""
+    from modules.logger.logger import Logger
+    Logger()
+    logger = logging.getLogger(f"temutools.{args.job}")
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    from modules.network.event_manager import EventManager
+    from modules.network.request import NetworkRequest
+    from modules.network.replay import TrafficReplay
+    from modules.network.response_cache import ResponseCache
+    from modules.system_config.config import SystemConfig
+
+    # 没有界面可以弹窗，403只记录日志并停止任务
+    NetworkRequest.interactive = False
+
+    replay = TrafficReplay()
+    if args.replay:
+        if not os.path.isfile(args.replay):
+            logger.error(f"录制文件不存在: {args.replay}")
+            return EXIT_CONFIG_ERROR
+        replay.configure({
+            "mode": "replay", "archive": args.replay, "latency_ms": args.replay_latency,
+            "jitter_ms": args.replay_jitter, "error_rate": args.replay_error_rate
+        })
+        if args.no_rate_limit:
+            from modules.network.rate_limiter import RateLimiter
+            RateLimiter().reload({"enabled": False})
+    elif args.record:
+        replay.configure({"mode": "record", "archive": args.record})
+    if args.no_rate_limit and not args.replay:
+        logger.error("--no-rate-limit 只能在回放模式下使用")
+        return EXIT_CONFIG_ERROR
+
+    config = SystemConfig()
+    if not config.get_cookie() and not replay.replaying:
+        logger.error(f"未配置Cookie，请先在 {config.config_file} 中设置 cookie 和 mallid")
+        return EXIT_CONFIG_ERROR
+
+    if args.job == "price_review" and args.max_rounds is None:
+        from modules.config.global_config_manager import GlobalConfigManager
+        args.max_rounds = int(GlobalConfigManager().get_config().get("max_review_rounds", 5))
+
+    description, runner, stoppable = JOBS[args.job]
+    stop_event = threading.Event()
+    config_error = threading.Event()
+
+    def on_config_error(**kwargs):
+        config_error.set()
+        stop_event.set()
+
+    EventManager().subscribe("config_error", on_config_error)
+    _install_signal_handlers(stop_event, stoppable, logger)
+
+    logger.info(f"开始运行任务: {args.job}（{description}）")
+    try:
+        success, failed = runner(args, logger, stop_event.is_set)
+    except KeyboardInterrupt:
+        logger.warning("任务已中断，下次运行时从中断处继续")
+        return EXIT_STOPPED
+    finally:
+        stats = ResponseCache().get_stats()
+        logger.info(f"响应缓存统计: 命中 {stats['hit']} 次, 未命中 {stats['miss']} 次, "
+                    f"304续期 {stats['revalidated']} 次, 共节省请求耗时 {stats['saved_seconds']:.2f} 秒")
+        replay_stats = replay.stats()
+        if replay_stats is not None:
+            logger.info(f"回放统计: 完全匹配 {replay_stats['exact']} 次, 按接口匹配 {replay_stats['fallback']} 次, "
+                        f"未录到 {replay_stats['missing']} 次, 注入错误 {replay_stats['injected']} 次")
+        replay.close()
+
+    logger.info(f"任务结束: {args.job}，成功 {success}，失败 {failed}")
+    if config_error.is_set():
+        logger.error("检测到配置错误（403），任务已停止，请更新Cookie后重新运行")
+        return EXIT_CONFIG_ERROR
+    if stop_event.is_set():
+        return EXIT_STOPPED
+    return EXIT_FAILURES if failed else EXIT_OK
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "list":
+        for name, (description, _, _) in JOBS.items():
+            print(f"{name:<16}{description}")
+        return EXIT_OK
+    return run_job(args)
@@ -0,0 +1,159 @@
+"""
+测试竞价历史：按竞价单判断是否肯定竞不上、定期重新获取详情，以及跳过的竞价单不记为已完成（不访问网络）
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import pytest
+
+from src.modules.bid_management import crawler as crawler_module
+from src.modules.bid_management.models import BidOrderItem, TargetProductVO
+from src.modules.jobs.journal import FETCHED
+
+
+@dataclass
+class FakeDetail:
+    priceComparingOrderId: str
+    winSupplierPrice: Optional[int] = None
+    comparingProductCount: Optional[int] = None
+    endTime: Optional[int] = None
+
+
+CONFIG = {"enabled": True, "store_detail": False, "skip_unwinnable": True, "lookback_hours": 24,
+          "min_observations": 2, "probe_every": 3, "keep_days": 90}
+
+
+@pytest.fixture(autouse=True)
+def config(system_config):
+    """竞价历史配置，用例修改后立即生效"""
+    system_config.sections["bid_history"] = dict(CONFIG)
+    return system_config.sections["bid_history"]
+
+
+def _observe(bid_history, order_id, min_price, product_id=1, current_price=30.0):
+    bid_history.record(product_id, FakeDetail(order_id), current_price, min_price)
+
+
+def _age(bid_history, hours):
+    """把已有的记录提前hours小时"""
+    with bid_history._db_lock:
+        bid_history._conn.execute("UPDATE bid_snapshots SET ts = ts - ?", (hours * 3600,))
+        bid_history._conn.execute("UPDATE bid_skips SET ts = ts - ?", (hours * 3600,))
+
+
+# (说明, 竞价单的竞争最低价记录, 预期跳过时返回的最低价)
+UNWINNABLE_CASES = [
+    ("没有记录", [], None),
+    ("记录不够", [10.0], None),
+    ("每条记录都竞不上", [10.0, 12.0], 12.0),
+    ("有一条记录能竞上", [10.0, 25.0], None),
+    ("减价后正好等于底线，能竞上", [10.0, 21.0], None),
+    ("缺少最低价的记录不计入", [10.0, None], None),
+]
+
+
+@pytest.mark.parametrize("min_prices, expected", [case[1:] for case in UNWINNABLE_CASES],
+                         ids=[case[0] for case in UNWINNABLE_CASES])
+def test_unwinnable(bid_history, min_prices, expected):
+    for min_price in min_prices:
+        _observe(bid_history, "A", min_price)
+    snapshot = bid_history.unwinnable("A", bid_reduction=1.0, price_threshold=20.0)
+    if expected is None:
+        assert snapshot is None
+    else:
+        assert snapshot.priceComparingOrderId == "A" and snapshot.minPrice == expected
+
+
+def test_other_orders_of_the_same_product_are_ignored(bid_history):
+    _observe(bid_history, "A", 10.0)
+    _observe(bid_history, "A", 11.0)
+    _observe(bid_history, "B", 50.0)
+    _observe(bid_history, "B", 50.0)
+    assert bid_history.unwinnable("A", 1.0, 20.0).minPrice == 11.0
+    assert bid_history.unwinnable("B", 1.0, 20.0) is None
+    assert bid_history.unwinnable("C", 1.0, 20.0) is None
+
+
+def test_old_observations_are_ignored(bid_history):
+    _observe(bid_history, "A", 10.0)
+    _observe(bid_history, "A", 10.0)
+    _age(bid_history, 25)
+    assert bid_history.unwinnable("A", 1.0, 20.0) is None
+
+
+def test_disabled(bid_history, config):
+    _observe(bid_history, "A", 10.0)
+    _observe(bid_history, "A", 10.0)
+    config["skip_unwinnable"] = False
+    assert bid_history.unwinnable("A", 1.0, 20.0) is None
+
+
+def test_probe_after_consecutive_skips(bid_history):
+    _observe(bid_history, "A", 10.0)
+    _observe(bid_history, "A", 10.0)
+    # probe_every=3：跳过两次后第三次重新获取详情
+    for _ in range(2):
+        assert bid_history.unwinnable("A", 1.0, 20.0) is not None
+        bid_history.record_skip("A")
+    assert bid_history.unwinnable("A", 1.0, 20.0) is None
+
+    # 重新获取详情后记录新的价格，重新开始计数
+    _observe(bid_history, "A", 10.0)
+    assert bid_history.unwinnable("A", 1.0, 20.0) is not None
+
+
+def test_probe_finds_recovered_price(bid_history):
+    _observe(bid_history, "A", 10.0)
+    _observe(bid_history, "A", 10.0)
+    bid_history.record_skip("A")
+    bid_history.record_skip("A")
+    _observe(bid_history, "A", 30.0)
+    assert bid_history.unwinnable("A", 1.0, 20.0) is None
+
+
+def test_probe_disabled(bid_history, config):
+    config["probe_every"] = 0
+    _observe(bid_history, "A", 10.0)
+    _observe(bid_history, "A", 10.0)
+    for _ in range(10):
+        bid_history.record_skip("A")
+    assert bid_history.unwinnable("A", 1.0, 20.0) is not None
+
+
+def _item(order_id):
+    return BidOrderItem(
+        currencyType="CNY", currentPriceSort=0, productId=1, recommendedPrice=0, goodsId=1,
+        confirmInvitingStatus=0, supplierPrice=None, productCount=1, type=0, minPurchaseCount=1,
+        lowestSupplierPrice=None, skcUnPublishCnt=None, allSkcUnPublish=None, currentPriceFirst="",
+        pdsStatusInfo=None, priceComparingOrderStatus=None, startTime=0, endTime=0,
+        priceComparingOrderId=order_id,
+        targetProductVO=TargetProductVO(productId=1, name="商品", catNameList=[], imageList=[], catIdList=[5]),
+        status=0
+    )
+
+
+def test_skipped_bid_is_not_journaled_as_applied(bid_history, bid_crawler, job_journal, monkeypatch):
+    monkeypatch.setattr(crawler_module.category_config, "get_price_threshold_by_category_ids", lambda ids: 20.0)
+    crawler = bid_crawler
+    crawler.enable_price_threshold_check = True
+    crawler.bid_reduction = 1.0
+    details = []
+    crawler.get_bid_detail = lambda product_id, order_id: details.append(order_id)
+
+    _observe(bid_history, "A", 10.0)
+    _observe(bid_history, "A", 10.0)
+    job = job_journal.open("bid_management", {})
+    crawler.job = job
+    job.add_item("1:A", {})
+
+    result = crawler._process_and_record(job, _item("A"))
+    assert result.skipped and not result.needBid
+    assert details == []
+    assert job.state_of("1:A") == FETCHED
+
+    # 第二次跳过后，第三次获取详情确认最低价
+    crawler._process_and_record(job, _item("A"))
+    assert details == []
+    result = crawler._process_and_record(job, _item("A"))
+    assert details == ["A"]
+    assert not result.skipped
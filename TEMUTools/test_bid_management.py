@@ -0,0 +1,110 @@
+"""
+测试竞价任务：按商品分组并按邀约截止时间排序、同一商品的竞价单按顺序处理、停止后剩余商品留待继续，
+以及继续任务时按重新获取的列表处理（不访问网络）
+"""
+import threading
+import time
+
+from src.modules.bid_management.models import BidOrderItem, BidResult, TargetProductVO
+from src.modules.jobs.journal import APPLIED, FETCHED
+
+
+def _item(order_id, product_id=1, end_time=0):
+    return BidOrderItem(
+        currencyType="CNY", currentPriceSort=0, productId=product_id, recommendedPrice=0, goodsId=1,
+        confirmInvitingStatus=0, supplierPrice=None, productCount=1, type=0, minPurchaseCount=1,
+        lowestSupplierPrice=None, skcUnPublishCnt=None, allSkcUnPublish=None, currentPriceFirst="",
+        pdsStatusInfo=None, priceComparingOrderStatus=None, startTime=0, endTime=end_time,
+        priceComparingOrderId=order_id,
+        targetProductVO=TargetProductVO(productId=product_id, name=f"商品{product_id}", catNameList=[],
+                                        imageList=[], catIdList=[5]),
+        status=0
+    )
+
+
+def test_resume_uses_live_items_and_skips_applied(bid_crawler, job_journal):
+    job = job_journal.open("bid_management", {})
+    job.set_fetch_complete()
+    for order_id in ("A", "B", "C"):
+        job.add_item(f"1:{order_id}", {"stale": True})
+    job.mark_applied("1:A")
+    job.finish(stopped=True)
+
+    # 继续前列表变化：C 已经不需要竞价，B 的截止时间变了，新增 D
+    live = [_item("A"), _item("B", end_time=200), _item("D")]
+    bid_crawler.get_all_pending_and_failed_items = lambda: live
+    resumed = job_journal.open("bid_management", {})
+    assert resumed.resumed and resumed.fetch_complete
+    items = bid_crawler._load_job_items(resumed)
+    assert items == live[1:]
+    assert items[0].endTime == 200
+
+
+class FakeBids:
+    """代替 process_single_bid：记录处理顺序，检查同一商品的竞价单不会同时处理"""
+
+    def __init__(self, delay=0.0, stop_after=None):
+        self.delay = delay
+        self.stop_after = stop_after
+        self.lock = threading.Lock()
+        self.processed = []
+        self.in_flight = set()
+        self.overlapped = False
+
+    def stop_flag(self):
+        return self.stop_after is not None and len(self.processed) >= self.stop_after
+
+    def process_single_bid(self, item):
+        with self.lock:
+            self.overlapped |= item.productId in self.in_flight
+            self.in_flight.add(item.productId)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight.discard(item.productId)
+            self.processed.append(item.priceComparingOrderId)
+        return BidResult(productId=item.productId, productName=item.targetProductVO.name,
+                         priceComparingOrderId=item.priceComparingOrderId, originalPrice=10, bidPrice=9,
+                         minPrice=8, success=True, message="ok", needBid=True)
+
+
+# 商品1有三个竞价单，最早截止；商品2次之；商品3没有截止时间，排在最后
+ITEMS = [_item("1a", 1, end_time=300), _item("2a", 2, end_time=100), _item("1b", 1, end_time=50),
+         _item("3a", 3), _item("1c", 1, end_time=400), _item("2b", 2, end_time=150)]
+
+
+def _run_bids(bid_crawler, fake, max_workers):
+    bid_crawler.get_all_pending_and_failed_items = lambda: list(ITEMS)
+    bid_crawler.process_single_bid = fake.process_single_bid
+    bid_crawler.stop_flag_callback = fake.stop_flag
+    return bid_crawler.process_all_bids(resume=False, max_workers=max_workers)
+
+
+def test_group_by_product_orders_by_earliest_deadline(bid_crawler):
+    groups = bid_crawler._group_by_product(ITEMS)
+    assert [[item.priceComparingOrderId for _, item in group] for group in groups] == [
+        ["1a", "1b", "1c"], ["2a", "2b"], ["3a"]]
+    # 保留每个竞价单在列表中的位置，结果按原顺序排列
+    assert [index for index, _ in groups[0]] == [0, 2, 4]
+
+
+def test_items_of_a_product_are_processed_in_order(bid_crawler):
+    fake = FakeBids(delay=0.02)
+    results = _run_bids(bid_crawler, fake, max_workers=3)
+    assert [result.priceComparingOrderId for result in results] == [item.priceComparingOrderId for item in ITEMS]
+    # 不同商品并发处理，同一商品的竞价单按列表顺序一个接一个处理
+    assert not fake.overlapped
+    for product_orders in (["1a", "1b", "1c"], ["2a", "2b"]):
+        assert [order for order in fake.processed if order in product_orders] == product_orders
+
+
+def test_stop_leaves_remaining_products_for_resume(bid_crawler, job_journal):
+    fake = FakeBids(stop_after=1)
+    results = _run_bids(bid_crawler, fake, max_workers=1)
+    # 截止时间最早的商品先处理，处理完第一个竞价单后停止，剩余的竞价单和商品都不再处理
+    assert fake.processed == ["1a"]
+    assert [result.priceComparingOrderId for result in results] == ["1a"]
+
+    resumed = job_journal.open("bid_management", {"bid_reduction": bid_crawler.bid_reduction})
+    assert resumed.resumed
+    assert resumed.state_of("1:1a") == APPLIED
+    assert all(resumed.state_of(f"{item.productId}:{item.priceComparingOrderId}") == FETCHED for item in ITEMS[1:])
@@ -0,0 +1,131 @@
+"""
+测试商品目录快照的全量/增量同步（不访问网络，用内存中的假目录代替 skc/pageQuery）
+"""
+import time
+
+import pytest
+
+from src.modules.catalogue.client import WRITE_MAX_AGE_SECONDS, sku_stock_total
+
+
+class FakeCatalogue:
+    """按创建时间倒序分页返回的假商品目录"""
+
+    def __init__(self, count):
+        self.items = [self.make(i, created_at=1000 + i, stock=1000) for i in range(count)]
+        self.requested_pages = []
+        self.fail = False
+
+    @staticmethod
+    def make(skc_id, created_at, stock):
+        return {
+            "productId": skc_id,
+            "productSkcId": skc_id,
+            "productName": f"商品{skc_id}",
+            "createdAt": created_at,
+            "productSkuSummaries": [{"productSkuId": skc_id * 10, "virtualStock": stock}],
+        }
+
+    def add(self, skc_id, created_at, stock=0):
+        self.items.append(self.make(skc_id, created_at, stock))
+
+    def set_stock(self, skc_id, stock):
+        for item in self.items:
+            if item["productSkcId"] == skc_id:
+                item["productSkuSummaries"][0]["virtualStock"] = stock
+
+    async def fetch_page(self, page, page_size):
+        self.requested_pages.append(page)
+        if self.fail:
+            return None
+        ordered = sorted(self.items, key=lambda item: item["createdAt"], reverse=True)
+        start = (page - 1) * page_size
+        return {"total": len(ordered), "pageItems": [dict(item) for item in ordered[start:start + page_size]]}
+
+
+@pytest.fixture
+def catalogue(catalogue_client, system_config, monkeypatch):
+    system_config.sections["catalogue"] = {
+        "enabled": True, "ttl_seconds": 600, "page_size": 10,
+        "incremental": True, "full_sync_interval_seconds": 3600
+    }
+    fake = FakeCatalogue(25)
+    monkeypatch.setattr(catalogue_client, "_afetch_page", fake.fetch_page)
+    return catalogue_client, fake
+
+
+def _expire(client):
+    """让快照过期（不影响上次全量同步的时间）"""
+    with client._connect() as conn:
+        conn.execute("UPDATE snapshots SET fetched_at = fetched_at - 100000")
+
+
+def test_full_sync_loads_every_page(catalogue):
+    client, fake = catalogue
+    items = client.items()
+    assert len(items) == 25
+    assert sorted(fake.requested_pages) == [1, 2, 3]
+    # 快照有效期内不再请求
+    fake.requested_pages.clear()
+    assert len(client.items()) == 25
+    assert fake.requested_pages == []
+
+
+def test_incremental_sync_only_fetches_newer_items(catalogue):
+    client, fake = catalogue
+    client.items()
+    fake.add(100, created_at=5000)
+    fake.add(101, created_at=5001)
+    _expire(client)
+    fake.requested_pages.clear()
+
+    items = client.items()
+    assert fake.requested_pages[0] == 1
+    assert 3 not in fake.requested_pages
+    assert [item["productSkcId"] for item in items[:2]] == [101, 100]
+    assert len(items) == 27
+    assert len({item["productSkcId"] for item in items}) == 27
+
+
+def test_incremental_sync_does_not_refresh_existing_stock(catalogue):
+    client, fake = catalogue
+    client.items()
+    fake.set_stock(3, 0)
+    _expire(client)
+    item = next(item for item in client.items() if item["productSkcId"] == 3)
+    # 增量同步只插入新商品，已有商品的库存还是全量同步时的值
+    assert sku_stock_total(item) == 1000
+
+
+def test_select_for_writes_forces_full_sync(catalogue):
+    client, fake = catalogue
+    client.items()
+    fake.set_stock(3, 0)
+    # 模拟上次全量同步已经过了一段时间（快照本身仍在有效期内）
+    with client._connect() as conn:
+        conn.execute("UPDATE snapshots SET full_synced_at = ?", (time.time() - WRITE_MAX_AGE_SECONDS - 1,))
+
+    stale = client.select(lambda item: sku_stock_total(item) == 0)
+    assert stale == []
+
+    fresh = client.select(lambda item: sku_stock_total(item) == 0, max_age=WRITE_MAX_AGE_SECONDS)
+    assert [item["productSkcId"] for item in fresh] == [3]
+
+
+def test_select_for_writes_returns_none_when_full_sync_fails(catalogue):
+    client, fake = catalogue
+    client.items()
+    with client._connect() as conn:
+        conn.execute("UPDATE snapshots SET full_synced_at = ?", (time.time() - WRITE_MAX_AGE_SECONDS - 1,))
+    fake.fail = True
+    # 调用方拿到None后改用服务端查询，不会用旧快照计算写请求
+    assert client.select(lambda item: True, max_age=WRITE_MAX_AGE_SECONDS) is None
+
+
+def test_failed_page_keeps_previous_snapshot(catalogue):
+    client, fake = catalogue
+    client.items()
+    fake.fail = True
+    assert client.items(refresh=True) is None
+    fake.fail = False
+    assert len(client._load(client._mallid())) == 25
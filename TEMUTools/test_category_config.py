@@ -0,0 +1,91 @@
+"""
+测试品类配置索引：按cate_id和内部ID查找、批量查找、保存不修改调用方的数据，以及配置文件变化后重建索引
+"""
+import json
+import time
+
+import pytest
+
+from src.modules.config.category_config_manager import CategoryConfigManager
+
+CATEGORIES = [
+    {"id": 1, "name": "帆布袋", "cate_id": 100, "price_threshold": 10.5, "code_mapping": "CB", "enabled": True},
+    {"id": 2, "name": "冰袖", "cate_id": 200, "price_threshold": 11, "code_mapping": "BE", "enabled": False},
+    # 同一个cate_id配置了两条时取第一条
+    {"id": 3, "name": "冰袖二", "cate_id": 200, "price_threshold": 12, "code_mapping": "BE2", "enabled": True},
+]
+
+
+@pytest.fixture
+def manager(tmp_path, config_store):
+    path = tmp_path / "category_config.json"
+    path.write_text(json.dumps({"categories": CATEGORIES}, ensure_ascii=False), encoding="utf-8")
+    return CategoryConfigManager(config_file=str(path), store=config_store)
+
+
+@pytest.mark.parametrize("cate_id, enable_only, expected", [
+    (100, False, 10.5),
+    (200, False, 11.0),
+    (200, True, 12.0),
+    (300, False, None),
+])
+def test_threshold_lookup(manager, cate_id, enable_only, expected):
+    assert manager.get_price_threshold_by_category_id(cate_id, enable_only=enable_only) == expected
+
+
+def test_threshold_by_ids_returns_first_enabled_match(manager):
+    assert manager.get_price_threshold_by_category_ids([300, 200, 100]) == 12.0
+    assert manager.get_price_threshold_by_category_ids([300]) is None
+    assert manager.get_price_threshold_by_category_ids([]) is None
+
+
+def test_lookup_many(manager):
+    found = manager.lookup_many([200, 300, 100])
+    assert [cat and cat["id"] for cat in found] == [2, None, 1]
+    assert [cat and cat["id"] for cat in manager.lookup_many([200, 300], enabled_only=True)] == [3, None]
+    assert manager.lookup_many([]) == []
+
+
+def test_lookup_by_internal_id(manager):
+    assert manager.get_category_by_id(3)["name"] == "冰袖二"
+    assert manager.get_category_by_id(9) is None
+    assert manager.get_code_mapping_by_category_ids([300, 200]) == "BE"
+
+
+def test_enabled_only(manager):
+    assert [cat["id"] for cat in manager.get_categories(enabled_only=True)] == [1, 3]
+    assert len(manager.get_categories()) == 3
+
+
+def test_save_does_not_modify_caller_list(manager):
+    categories = [dict(cat) for cat in CATEGORIES] + [{"name": "新品类", "cate_id": 400, "price_threshold": 5}]
+    assert manager.save_categories(categories)
+    assert "id" not in categories[-1]
+    assert manager.lookup_many([400])[0]["id"] == 4
+
+    # 调用方之后修改自己的列表，不影响已保存的配置和索引
+    categories[0]["price_threshold"] = 99
+    categories.append({"id": 9, "cate_id": 900})
+    assert manager.get_price_threshold_by_category_id(100) == 10.5
+    assert manager.get_category_by_id(9) is None
+
+
+def test_index_is_rebuilt_after_external_change(manager):
+    assert manager.get_price_threshold_by_category_id(100) == 10.5
+    with open(manager.config_file, "w", encoding="utf-8") as f:
+        json.dump({"categories": [{"id": 1, "cate_id": 100, "price_threshold": 8}]}, f)
+    manager.refresh_cache()
+    assert manager.get_price_threshold_by_category_id(100) == 8.0
+    assert manager.lookup_many([200]) == [None]
+
+
+def test_index_follows_snapshot_version_without_refresh(manager):
+    old_index = manager._get_index()
+    with open(manager.config_file, "w", encoding="utf-8") as f:
+        json.dump({"categories": [{"id": 1, "cate_id": 100, "price_threshold": 7}]}, f)
+    # 监视线程发现文件变化后替换快照，下次查找时按新的版本号重建索引
+    deadline = time.time() + 5
+    while manager.get_price_threshold_by_category_id(100) != 7.0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert manager.get_price_threshold_by_category_id(100) == 7.0
+    assert manager._get_index().version > old_index.version
@@ -0,0 +1,140 @@
+"""
+测试AIMD自适应并发控制：健康时加性增、限流/错误时乘性减、冷却期，以及名额排队（不访问网络）
+"""
+import asyncio
+
+import pytest
+
+
+def _window(controller, latency=0.1, errors=0, size=10):
+    for i in range(size):
+        controller.record(latency, None if i < errors else 200)
+
+
+def _after_cooldown(controller):
+    controller._last_decrease -= float(controller.config["cooldown"])
+
+
+@pytest.mark.parametrize("initial, expected", [(4, 4), (0, 1), (100, 6)])
+def test_initial_limit_is_clamped(concurrency_controller, initial, expected):
+    assert concurrency_controller(initial=initial).current_limit == expected
+
+
+def test_healthy_window_adds_one(concurrency_controller):
+    controller = concurrency_controller()
+    _window(controller, size=9)
+    assert controller.current_limit == 4
+    controller.record(0.1, 200)
+    assert controller.current_limit == 5
+
+
+def test_increase_stops_at_max(concurrency_controller):
+    controller = concurrency_controller()
+    for _ in range(5):
+        _window(controller)
+    assert controller.current_limit == 6
+
+
+def test_slow_window_does_not_increase(concurrency_controller):
+    controller = concurrency_controller()
+    _window(controller, latency=2.0)
+    assert controller.current_limit == 4
+
+
+def test_error_rate_above_threshold_halves(concurrency_controller):
+    controller = concurrency_controller()
+    _window(controller, errors=2)
+    assert controller.current_limit == 2
+
+
+@pytest.mark.parametrize("status", [403, 429, 500, 503])
+def test_backoff_status_halves_immediately(concurrency_controller, status):
+    controller = concurrency_controller()
+    controller.record(0.1, status)
+    assert controller.current_limit == 2
+
+
+def test_cooldown_limits_consecutive_decreases(concurrency_controller):
+    controller = concurrency_controller(initial=6)
+    controller.record(0.1, 429)
+    controller.record(0.1, 429)
+    assert controller.current_limit == 3
+    _after_cooldown(controller)
+    controller.record(0.1, 429)
+    assert controller.current_limit == 1
+    _after_cooldown(controller)
+    controller.record(0.1, 429)
+    assert controller.current_limit == 1
+
+
+def test_decrease_discards_partial_window(concurrency_controller):
+    controller = concurrency_controller()
+    _window(controller, size=9)
+    controller.record(0.1, 503)
+    _window(controller, size=9)
+    assert controller.current_limit == 2
+
+
+def test_disabled_controller_never_changes(concurrency_controller):
+    controller = concurrency_controller(enabled=False)
+    controller.record(0.1, 429)
+    _window(controller)
+    assert controller.current_limit == 4
+
+
+def test_acquire_queues_beyond_limit_and_release_wakes_in_order(concurrency_controller):
+    controller = concurrency_controller(initial=2)
+    order = []
+
+    async def scenario():
+        await controller.acquire()
+        await controller.acquire()
+
+        async def waiter(name):
+            await controller.acquire()
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        assert controller.get_stats() == {"limit": 2, "in_flight": 2, "waiting": 2, "max": 6}
+        controller.release()
+        await asyncio.sleep(0)
+        assert order == ["a"]
+        controller.release()
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b"]
+        assert controller.in_flight == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_gives_up_its_place(concurrency_controller):
+    controller = concurrency_controller(initial=1)
+
+    async def scenario():
+        await controller.acquire()
+        task = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert controller.get_stats()["waiting"] == 0
+        controller.release()
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_increase_wakes_waiters(concurrency_controller):
+    controller = concurrency_controller(initial=1)
+
+    async def scenario():
+        await controller.acquire()
+        task = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert not task.done()
+        _window(controller)
+        await asyncio.wait_for(task, 1)
+        assert controller.in_flight == 2
+
+    asyncio.run(scenario())
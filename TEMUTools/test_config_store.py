@@ -0,0 +1,113 @@
+"""
+测试配置存储：快照缓存、保存、外部修改通知和监视线程的停止
+"""
+import json
+import threading
+
+
+def _write(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_snapshot_is_cached(config_store, tmp_path):
+    path = tmp_path / "a.json"
+    _write(path, {"x": 1})
+    first = config_store.snapshot(str(path))
+    assert first.data == {"x": 1}
+    assert config_store.snapshot(str(path)) is first
+    assert config_store.reload(str(path)) is first
+
+
+def test_missing_file_uses_copy_of_default(config_store, tmp_path):
+    default = {"items": []}
+    data = config_store.get(str(tmp_path / "missing.json"), default=default)
+    assert data == default and data is not default
+
+
+def test_save_keeps_a_private_copy(config_store, tmp_path):
+    path = str(tmp_path / "b.json")
+    data = {"nested": {"value": 1}}
+    snap = config_store.save(path, data)
+    data["nested"]["value"] = 2
+    assert snap.data == {"nested": {"value": 1}}
+    assert config_store.get(path) == {"nested": {"value": 1}}
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {"nested": {"value": 1}}
+
+
+def test_copy_is_independent(config_store, tmp_path):
+    path = str(tmp_path / "c.json")
+    config_store.save(path, {"list": [1]})
+    editable = config_store.snapshot(path).copy()
+    editable["list"].append(2)
+    assert config_store.get(path) == {"list": [1]}
+
+
+def test_external_change_is_picked_up_and_notified(config_store, tmp_path):
+    path = tmp_path / "d.json"
+    _write(path, {"v": 1})
+    first = config_store.snapshot(str(path))
+    changed = threading.Event()
+    received = []
+
+    def on_change(snap):
+        received.append(snap)
+        changed.set()
+
+    config_store.subscribe(str(path), on_change)
+    _write(path, {"v": 22})
+    assert changed.wait(5)
+    assert received[0].data == {"v": 22}
+    assert received[0].version > first.version
+    assert config_store.get(str(path)) == {"v": 22}
+
+
+def test_close_stops_watcher(config_store, tmp_path):
+    path = tmp_path / "e.json"
+    _write(path, {"v": 1})
+    config_store.snapshot(str(path))
+    watcher = config_store._watcher
+    assert watcher.is_alive()
+
+    config_store.close(timeout=5)
+    assert not watcher.is_alive()
+    assert config_store._watcher is None
+
+    # 关闭后不再轮询，外部修改要等到下次reload才会生效
+    _write(path, {"v": 22})
+    assert config_store.get(str(path)) == {"v": 1}
+
+    # 再次加载新文件时重新启动监视线程
+    config_store.snapshot(str(tmp_path / "f.json"), default={})
+    assert config_store._watcher is not None and config_store._watcher.is_alive()
+
+
+def test_old_watcher_exits_after_new_one_starts(config_store, tmp_path):
+    path = tmp_path / "g.json"
+    _write(path, {"v": 1})
+    config_store.snapshot(str(path))
+    entered = threading.Event()
+    release = threading.Event()
+
+    def slow_listener(snap):
+        entered.set()
+        release.wait(5)
+
+    # 监视线程卡在订阅回调里，close()等待超时后返回
+    config_store.subscribe(str(path), slow_listener)
+    _write(path, {"v": 22})
+    assert entered.wait(5)
+    old = config_store._watcher
+    config_store.close(timeout=0.05)
+    assert old.is_alive()
+
+    config_store.snapshot(str(tmp_path / "h.json"), default={})
+    new = config_store._watcher
+    assert new is not old and new.is_alive()
+
+    # 新线程启动后，旧线程仍然看到自己的停止事件并退出
+    release.set()
+    old.join(5)
+    assert not old.is_alive()
+    assert new.is_alive()
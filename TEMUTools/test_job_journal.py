@@ -0,0 +1,157 @@
+"""
+测试批量任务日志的状态流转和继续任务、请求所属任务的标注，以及核价任务继续时对已决定商品的确认（不访问网络）
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.modules.jobs.journal import APPLIED, DECIDED, FAILED, FETCHED, current_job_id
+
+
+def _open_with_items(job_journal, params=None):
+    job = job_journal.open("test", params or {"x": 1})
+    for key in ("a", "b", "c", "d"):
+        job.add_item(key, {"id": key})
+    return job
+
+
+def test_new_job_records_fetched_items(job_journal):
+    job = _open_with_items(job_journal)
+    assert not job.resumed
+    assert job.counts() == {FETCHED: 4, DECIDED: 0, APPLIED: 0, FAILED: 0}
+    assert [key for key, _, _ in job.pending()] == ["a", "b", "c", "d"]
+
+
+def test_stopped_job_resumes_with_states_and_decisions(job_journal):
+    job = _open_with_items(job_journal)
+    job.set_fetch_complete()
+    job.mark_applied("a", "ok")
+    job.mark_decided("b", {"price": 990})
+    job.mark_decided("c", {"price": 880})
+    job.mark_failed("c", "timeout")
+    job.finish(stopped=True)
+
+    resumed = job_journal.open("test", {"x": 1})
+    assert resumed.resumed and resumed.job_id == job.job_id
+    assert resumed.fetch_complete
+    assert resumed.is_applied("a")
+    assert [(key, state) for key, _, state in resumed.pending()] == [("b", DECIDED), ("c", FAILED), ("d", FETCHED)]
+    # 失败的条目保留上次的决定，继续时可以据此确认写请求是否已经生效
+    assert resumed.decision_of("b") == {"price": 990}
+    assert resumed.decision_of("c") == {"price": 880}
+    assert resumed.decision_of("d") is None
+
+
+def test_add_item_keeps_state_on_resume(job_journal):
+    job = _open_with_items(job_journal)
+    job.mark_applied("a")
+    job.finish(stopped=True)
+
+    resumed = job_journal.open("test", {"x": 1})
+    resumed.add_item("a", {"id": "a", "fresh": True})
+    resumed.add_item("e", {"id": "e"})
+    assert resumed.state_of("a") == APPLIED
+    assert resumed.state_of("e") == FETCHED
+    assert [key for key, _, _ in resumed.pending()][-1] == "e"
+
+
+def test_completed_job_is_not_resumed(job_journal):
+    job = _open_with_items(job_journal)
+    job.finish()
+    assert not job_journal.open("test", {"x": 1}).resumed
+
+
+def test_different_params_start_a_new_job(job_journal):
+    job = _open_with_items(job_journal)
+    job.finish(stopped=True)
+    other = job_journal.open("test", {"x": 2})
+    assert not other.resumed
+    # 同类任务只继续最近打开的一个，旧的不再继续
+    assert not job_journal.open("test", {"x": 1}).resumed
+
+
+def test_resume_disabled(job_journal, system_config):
+    job = _open_with_items(job_journal)
+    job.finish(stopped=True)
+    assert not job_journal.open("test", {"x": 1}, resume=False).resumed
+    job = _open_with_items(job_journal)
+    job.finish(stopped=True)
+    system_config.sections["jobs"] = {"resume": False}
+    assert not job_journal.open("test", {"x": 1}).resumed
+
+
+def test_current_job_is_cleared_when_job_raises(job_journal):
+    job = job_journal.open("test", {})
+    with pytest.raises(RuntimeError):
+        with job.active():
+            assert current_job_id() == job.job_id
+            raise RuntimeError("crawler failed before finish()")
+    assert current_job_id() is None
+
+
+def test_current_job_is_per_thread(job_journal):
+    first = job_journal.open("first", {})
+    second = job_journal.open("second", {})
+    seen = {}
+    both_active = threading.Barrier(2)
+
+    def run(job):
+        with job.active():
+            # 两个任务同时运行时各自的线程只看到自己的任务
+            both_active.wait(timeout=5)
+            seen[job.kind] = current_job_id()
+
+    threads = [threading.Thread(target=run, args=(job,)) for job in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen == {"first": first.job_id, "second": second.job_id}
+    assert current_job_id() is None
+
+
+def test_bind_marks_pool_threads(job_journal):
+    job = job_journal.open("test", {})
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(job.bind(current_job_id)).result() == job.job_id
+        # 线程池的线程被复用，任务函数结束后不再带有标注
+        assert executor.submit(current_job_id).result() is None
+
+
+def _review_product(product_id, price_order_id, times, status=1):
+    return {
+        "productId": product_id,
+        "skcList": [{
+            "supplierPriceReviewInfoList": [{
+                "priceOrderId": price_order_id,
+                "times": times,
+                "status": status,
+                "productSkuList": [{"skuId": product_id * 10}]
+            }]
+        }]
+    }
+
+
+def test_price_review_resume_skips_decisions_that_landed(job_journal, price_review_crawler):
+    job = job_journal.open("price_review", {})
+    for product_id in (1, 2, 3, 4):
+        job.add_item(product_id, _review_product(product_id, 100 + product_id, 1))
+    # 1: 降价请求已发出，之后崩溃；2: 已决定，请求没有到达服务器；3: 已决定，订单进入下一轮；4: 未决定
+    for product_id in (1, 2, 3):
+        job.mark_decided(product_id, {"action": "rebargain", "priceOrderId": 100 + product_id,
+                                      "price": 990, "reviewRounds": 1})
+    job.finish(stopped=True)
+
+    resumed = job_journal.open("price_review", {})
+    live = [
+        _review_product(1, 101, 1, status=2),
+        _review_product(2, 102, 1),
+        _review_product(3, 103, 2),
+        _review_product(4, 104, 1),
+    ]
+    remaining = [product["productId"]
+                 for product in price_review_crawler._skip_applied_decisions(resumed, iter(live))]
+    assert remaining == [2, 4]
+    assert resumed.is_applied(1) and resumed.is_applied(3)
+    assert resumed.state_of(2) == DECIDED
@@ -0,0 +1,64 @@
+"""
+测试GUI日志处理器的批量刷新：积压过多时只保留最新的日志，并准确提示省略的条数（不创建窗口）
+"""
+import logging
+
+import pytest
+
+from src.modules.logger.gui import LogHandler
+
+
+class FakeText:
+    """只记录定时回调的文本框替身"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+
+
+@pytest.fixture
+def handler():
+    handler = LogHandler(FakeText(), max_lines=10, busy_threshold=5)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.batches = []
+    handler._append = handler.batches.append
+    return handler
+
+
+def _emit(handler, count, level=logging.INFO, start=0):
+    for i in range(start, start + count):
+        handler.emit(logging.LogRecord("test", level, __file__, 0, str(i), None, None))
+
+
+def test_flush_writes_batch_in_order(handler):
+    _emit(handler, 3)
+    handler._flush()
+    assert handler.batches == [["0", "1", "2"]]
+
+
+def test_overflow_counts_each_dropped_line_once(handler):
+    _emit(handler, 25)
+    handler._flush()
+    batch = handler.batches[0]
+    # 一批日志加上提示正好是 max_lines 行，省略数 + 保留数 = 产生的日志数
+    assert len(batch) == 10
+    assert batch[0] == "（日志过多，已省略 16 条，完整日志请查看日志文件）"
+    assert batch[1:] == [str(i) for i in range(16, 25)]
+
+
+def test_debug_is_dropped_when_busy(handler):
+    _emit(handler, 5)
+    _emit(handler, 3, level=logging.DEBUG, start=5)
+    _emit(handler, 1, start=8)
+    handler._flush()
+    assert handler.batches == [["（日志过多，已省略 3 条，完整日志请查看日志文件）", "0", "1", "2", "3", "4", "8"]]
+
+
+def test_dropped_count_resets_after_flush(handler):
+    _emit(handler, 12)
+    handler._flush()
+    _emit(handler, 2)
+    handler._flush()
+    assert handler.batches[1] == ["0", "1"]
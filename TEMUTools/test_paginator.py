@@ -0,0 +1,140 @@
+"""
+测试分页并发获取：页数计算、按页码返回结果、预取窗口、提前退出时取消、失败页和重复条目的处理
+（不访问网络，用假的分页协程代替接口）
+"""
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+from src.modules.network.paginator import dedupe_items, fetch_pages, iter_pages, iter_unique, page_count
+
+
+class FakePages:
+    """每页随机延迟后返回，记录请求过的页和同时在途的请求数"""
+
+    def __init__(self, fail_pages=(), error_pages=()):
+        self.fail_pages = set(fail_pages)
+        self.error_pages = set(error_pages)
+        self.lock = threading.Lock()
+        self.started = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch_page(self, page):
+        with self.lock:
+            self.started.append(page)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(random.uniform(0, 0.02))
+            if page in self.error_pages:
+                raise RuntimeError(f"page {page}")
+            if page in self.fail_pages:
+                return None
+            return {"page": page}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.mark.parametrize("total, page_size, expected", [
+    (0, 10, 0), (-1, 10, 0), (5, 0, 0), (1, 10, 1), (10, 10, 1), (11, 10, 2), (1000, 100, 10),
+])
+def test_page_count(total, page_size, expected):
+    assert page_count(total, page_size) == expected
+
+
+def test_fetch_pages_returns_every_page_in_order(request_stub):
+    fake = FakePages(fail_pages=[3], error_pages=[5])
+    results = fetch_pages(request_stub, fake.fetch_page, [6, 2, 1, 5, 4, 3])
+    assert list(results) == [1, 2, 3, 4, 5, 6]
+    assert results[1] == {"page": 1}
+    # 失败和异常的页结果为None，不影响其他页
+    assert results[3] is None and results[5] is None
+    assert sorted(fake.started) == [1, 2, 3, 4, 5, 6]
+
+
+def test_fetch_pages_skips_pages_after_stop(request_stub):
+    fake = FakePages()
+    results = fetch_pages(request_stub, fake.fetch_page, range(1, 6), stop_flag_callback=lambda: True)
+    assert fake.started == []
+    assert results == {}
+
+
+@pytest.mark.parametrize("prefetch", [1, 3, 8])
+def test_iter_pages_streams_in_order_within_prefetch(request_stub, prefetch):
+    fake = FakePages()
+    pages = [page for page, _ in iter_pages(request_stub, fake.fetch_page, range(1, 21), prefetch=prefetch)]
+    assert pages == list(range(1, 21))
+    assert fake.max_in_flight <= prefetch
+
+
+def test_iter_pages_first_page_arrives_before_the_rest_are_sent(request_stub):
+    fake = FakePages()
+    pages = iter_pages(request_stub, fake.fetch_page, range(1, 101), prefetch=4)
+    assert next(pages) == (1, {"page": 1})
+    # 只提前发出了预取窗口内的页
+    assert len(fake.started) <= 5
+    pages.close()
+
+
+def test_iter_pages_cancels_pending_requests_on_early_exit(request_stub):
+    fake = FakePages()
+    for page, _ in iter_pages(request_stub, fake.fetch_page, range(1, 101), prefetch=5):
+        if page == 2:
+            break
+    time.sleep(0.1)
+    # 退出时在途的请求被取消，之后不会再发出新的请求
+    started = len(fake.started)
+    assert started <= 2 + 5
+    time.sleep(0.1)
+    assert len(fake.started) == started
+    assert fake.in_flight == 0
+
+
+def test_iter_pages_stop_flag(request_stub):
+    fake = FakePages()
+    stopped = threading.Event()
+    received = []
+    for page, result in iter_pages(request_stub, fake.fetch_page, range(1, 101), stopped.is_set, prefetch=3):
+        received.append((page, result))
+        if page == 3:
+            stopped.set()
+    assert [page for page, _ in received[:3]] == [1, 2, 3]
+    # 停止前已经发出的页仍会产出（排队中的请求在发出前再检查一次停止标志，结果为None）
+    assert len(received) <= 3 + 3
+    assert all(result is None for page, result in received if page not in fake.started)
+    assert len(fake.started) < 100
+
+
+def test_iter_pages_error_page_yields_none(request_stub):
+    fake = FakePages(error_pages=[2])
+    assert list(iter_pages(request_stub, fake.fetch_page, [1, 2, 3])) == [
+        (1, {"page": 1}), (2, None), (3, {"page": 3})
+    ]
+
+
+def test_iter_unique_is_lazy():
+    consumed = []
+
+    def items():
+        for item_id in [1, 2, 2, 3, 1, 4]:
+            consumed.append(item_id)
+            yield {"id": item_id}
+
+    unique = iter_unique(items(), key=lambda item: item["id"])
+    assert next(unique) == {"id": 1}
+    assert consumed == [1]
+    assert [item["id"] for item in unique] == [2, 3, 4]
+
+
+def test_dedupe_keeps_first_occurrence():
+    # 翻页期间新增了一条数据，上一页的最后一条在下一页又出现了一次
+    page1 = [{"id": 1, "v": "a"}, {"id": 2, "v": "a"}, {"id": 3, "v": "a"}]
+    page2 = [{"id": 3, "v": "b"}, {"id": 4, "v": "b"}, {"id": 5, "v": "b"}]
+    items = dedupe_items(page1 + page2, key=lambda item: item["id"])
+    assert [item["id"] for item in items] == [1, 2, 3, 4, 5]
+    assert items[2]["v"] == "a"
@@ -0,0 +1,145 @@
+"""
+测试核价决策规则（decision.decide / review_order_of）和获取阶段缺少价格底线时的处理（不访问网络）
+"""
+import pytest
+
+from src.modules.price_review import crawler as crawler_module
+from src.modules.price_review.crawler import PriceReviewSuggestion
+from src.modules.price_review.decision import (ACCEPT, REBARGAIN, REJECT, ReviewRow, decide, decide_batch,
+                                               decision_applied, review_order_of)
+
+
+def _row(supply, suggest, threshold, rounds=0):
+    return ReviewRow(productId=1, priceOrderId=10, supplyPrice=supply, suggestSupplyPrice=suggest,
+                     threshold=threshold, reviewRounds=rounds, productSkuIds=[100])
+
+
+# (说明, 当前价(分), 建议价(分), 底线(元), 已核价轮次, 重新调价, 最大轮次, 预期操作, 预期价格)
+DECIDE_CASES = [
+    ("建议价高于底线，同意", 3000, 2500, 20, 0, True, 5, ACCEPT, 2500),
+    ("建议价等于底线，同意", 3000, 2000, 20, 0, True, 5, ACCEPT, 2000),
+    ("不重新调价时同意不受轮次影响", 3000, 2500, 20, 9, False, 5, ACCEPT, 2500),
+    ("建议价低于底线，不重新调价，拒绝", 3000, 1999, 20, 0, False, 5, REJECT, None),
+    ("减1元后仍高于底线，重新调价", 3000, 1500, 20, 0, True, 5, REBARGAIN, 2900),
+    ("减1元后正好等于底线，重新调价", 2100, 1500, 20, 1, True, 5, REBARGAIN, 2000),
+    ("减1元后低于底线，拒绝", 2099, 1500, 20, 1, True, 5, REJECT, None),
+    ("未到最大轮次，重新调价", 3000, 1500, 20, 4, True, 5, REBARGAIN, 2900),
+    ("达到最大轮次，拒绝", 3000, 1500, 20, 5, True, 5, REJECT, None),
+    ("超过最大轮次，拒绝", 3000, 1500, 20, 7, True, 5, REJECT, None),
+    ("轮次为0时不受最大轮次限制", 3000, 1500, 20, 0, True, 0, REBARGAIN, 2900),
+    ("底线带小数", 3000, 1950, 19.5, 0, True, 5, ACCEPT, 1950),
+]
+
+
+@pytest.mark.parametrize(
+    "supply, suggest, threshold, rounds, use_rebargain, max_rounds, action, price",
+    [case[1:] for case in DECIDE_CASES],
+    ids=[case[0] for case in DECIDE_CASES]
+)
+def test_decide(supply, suggest, threshold, rounds, use_rebargain, max_rounds, action, price):
+    decision = decide(_row(supply, suggest, threshold, rounds), use_rebargain, max_rounds)
+    assert decision.action == action
+    assert decision.price == price
+    assert decision.message
+    assert decision.failure_message
+
+
+def test_decide_batch_keeps_order():
+    rows = [_row(3000, 2500, 20), _row(3000, 1500, 20), _row(2050, 1500, 20)]
+    assert [d.action for d in decide_batch(rows)] == [ACCEPT, REBARGAIN, REJECT]
+    assert [d.action for d in decide_batch(rows, use_rebargain=False)] == [ACCEPT, REJECT, REJECT]
+
+
+def _review_info(price_order_id, status, times=1, sku_ids=(1001,)):
+    return {
+        "priceOrderId": price_order_id,
+        "status": status,
+        "times": times,
+        "productSkuList": [{"skuId": sku_id} for sku_id in sku_ids]
+    }
+
+
+# (说明, skcList, 预期结果)
+REVIEW_ORDER_CASES = [
+    ("没有SKC", [], None),
+    ("没有待核价的订单", [{"supplierPriceReviewInfoList": [_review_info(1, 2)]}], None),
+    ("待核价订单没有SKU", [{"supplierPriceReviewInfoList": [_review_info(1, 1, sku_ids=())]}], None),
+    ("SKU列表为None", [{"supplierPriceReviewInfoList": [dict(_review_info(1, 1), productSkuList=None)]}], None),
+    ("一个待核价订单", [{"supplierPriceReviewInfoList": [_review_info(7, 1, 2, (1001, 1002))]}], (7, [1001, 1002], 2)),
+    ("跳过已处理的订单", [{"supplierPriceReviewInfoList": [_review_info(6, 2, 1), _review_info(7, 1, 3)]}],
+     (7, [1001], 3)),
+    ("第一个SKC没有待核价订单时看下一个", [
+        {"supplierPriceReviewInfoList": [_review_info(6, 2)]},
+        {"supplierPriceReviewInfoList": [_review_info(8, 1, 1, (2001,))]}
+    ], (8, [2001], 1)),
+]
+
+
+@pytest.mark.parametrize("skc_list, expected", [case[1:] for case in REVIEW_ORDER_CASES],
+                         ids=[case[0] for case in REVIEW_ORDER_CASES])
+def test_review_order_of(skc_list, expected):
+    assert review_order_of({"productId": 1, "skcList": skc_list}) == expected
+
+
+# (说明, 最新的skcList, 记录的决定, 预期是否已生效)
+APPLIED_CASES = [
+    ("订单已不再待核价", [{"supplierPriceReviewInfoList": [_review_info(7, 2)]}], {"priceOrderId": 7}, True),
+    ("换成了另一个订单", [{"supplierPriceReviewInfoList": [_review_info(8, 1)]}], {"priceOrderId": 7}, True),
+    ("同一订单进入下一轮", [{"supplierPriceReviewInfoList": [_review_info(7, 1, 3)]}],
+     {"priceOrderId": 7, "reviewRounds": 2}, True),
+    ("同一订单同一轮，未生效", [{"supplierPriceReviewInfoList": [_review_info(7, 1, 2)]}],
+     {"priceOrderId": 7, "reviewRounds": 2}, False),
+    ("旧记录没有轮次，按未生效处理", [{"supplierPriceReviewInfoList": [_review_info(7, 1, 2)]}],
+     {"priceOrderId": 7}, False),
+]
+
+
+@pytest.mark.parametrize("skc_list, decision, expected", [case[1:] for case in APPLIED_CASES],
+                         ids=[case[0] for case in APPLIED_CASES])
+def test_decision_applied(skc_list, decision, expected):
+    assert decision_applied({"productId": 1, "skcList": skc_list}, decision) is expected
+
+
+@pytest.fixture
+def crawler(price_review_crawler, monkeypatch):
+    suggestion = PriceReviewSuggestion(rejectRemark="", supplyPrice=3000, priceCurrency="CNY",
+                                       suggestSupplyPrice=2500, suggestPriceCurrency="CNY",
+                                       needEditBomInfo=False, canAppeal=False)
+    monkeypatch.setattr(price_review_crawler, "get_price_review_suggestion", lambda order_id: suggestion)
+    return price_review_crawler
+
+
+def _product(cat_ids):
+    product = {"productId": 1, "skcList": [{"supplierPriceReviewInfoList": [_review_info(7, 1, 2)]}]}
+    if cat_ids is not None:
+        product["catIdList"] = cat_ids
+    return product
+
+
+# (说明, 商品的类目ID, 品类配置返回的底线, 预期底线, 无法核价时原因中包含的文字)
+THRESHOLD_CASES = [
+    ("没有类目ID", None, 20.0, None, "无类别ID"),
+    ("类目ID为空", [], 20.0, None, "无类别ID"),
+    ("类目没有配置底线", [1, 2], None, None, "类别ID: [1, 2]"),
+    ("找到底线", [1, 2], 20.0, 20.0, ""),
+]
+
+
+@pytest.mark.parametrize("cat_ids, configured, threshold, reason", [case[1:] for case in THRESHOLD_CASES],
+                         ids=[case[0] for case in THRESHOLD_CASES])
+def test_fetch_review_row_threshold(crawler, monkeypatch, cat_ids, configured, threshold, reason):
+    monkeypatch.setattr(crawler_module.category_config, "get_price_threshold_by_category_ids",
+                        lambda ids: configured)
+    row, message = crawler.fetch_review_row(_product(cat_ids))
+    if threshold is None:
+        assert row is None
+        assert "未找到商品的价格底线规则" in message and reason in message
+    else:
+        assert row.threshold == threshold
+        assert (row.priceOrderId, row.reviewRounds, row.productSkuIds) == (7, 2, [1001])
+        assert (row.supplyPrice, row.suggestSupplyPrice) == (3000, 2500)
+
+
+def test_fetch_review_row_without_pending_order(crawler):
+    row, message = crawler.fetch_review_row({"productId": 1, "skcList": []})
+    assert row is None and message == "没有待核价的订单或SKU"
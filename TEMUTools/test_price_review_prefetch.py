@@ -0,0 +1,138 @@
+"""
+测试批量核价的预取：执行线程只取已经获取到核价建议的商品，提前获取的商品数等于 prefetch；
+以及停止后继续任务时按重新获取的列表处理（不访问网络）
+"""
+import threading
+import time
+
+import pytest
+
+from src.modules.price_review.decision import ReviewRow
+
+
+class FakeReviews:
+    """记录获取建议和执行决定的次数，执行决定时等待放行"""
+
+    def __init__(self, count):
+        self.products = [{"productId": i} for i in range(1, count + 1)]
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.fetched = 0
+        self.applying = 0
+        self.applied = []
+
+    def fetch_review_row(self, product_data):
+        with self.lock:
+            self.fetched += 1
+        return ReviewRow(productId=product_data["productId"], priceOrderId=product_data["productId"],
+                         supplyPrice=3000, suggestSupplyPrice=2500, threshold=20, productSkuIds=[1]), ""
+
+    def apply_decision(self, product_data, row, decision):
+        with self.lock:
+            self.applying += 1
+        assert self.release.wait(10)
+        with self.lock:
+            self.applied.append(product_data["productId"])
+        return True, "ok"
+
+
+def _crawler(crawler, fake, stop=None):
+    """把核价爬虫的列表、获取建议和执行决定换成假的实现"""
+    if stop is not None:
+        crawler.stop_flag_callback = stop
+    crawler.get_pending_review_count = lambda bypass_cache=False: len(fake.products)
+    crawler.iter_items = lambda total_count=None: iter(fake.products)
+    crawler.fetch_review_row = fake.fetch_review_row
+    crawler.apply_decision = fake.apply_decision
+    return crawler
+
+
+def _run(crawler, **kwargs):
+    out = {}
+    kwargs.setdefault("resume", False)
+    thread = threading.Thread(target=lambda: out.setdefault("results", crawler.batch_process_price_reviews_mt(
+        **kwargs)))
+    thread.start()
+    return thread, out
+
+
+def _settle(fake, expected_fetched, expected_applying):
+    """等待获取和执行的次数达到预期，再稍等确认不会继续增长"""
+    deadline = time.time() + 5
+    while time.time() < deadline and (fake.fetched < expected_fetched or fake.applying < expected_applying):
+        time.sleep(0.01)
+    time.sleep(0.3)
+    return fake.fetched, fake.applying
+
+
+@pytest.mark.parametrize("max_workers, prefetch", [(3, 5), (4, 1), (2, 10)])
+def test_look_ahead_matches_prefetch(price_review_crawler, max_workers, prefetch):
+    fake = FakeReviews(40)
+    thread, out = _run(_crawler(price_review_crawler, fake), max_workers=max_workers, prefetch=prefetch)
+    try:
+        # 所有执行线程都在执行决定时，已获取但还没有被取走的商品正好是 prefetch 个
+        fetched, applying = _settle(fake, max_workers + prefetch, max_workers)
+        assert applying == max_workers
+        assert fetched - applying == prefetch
+    finally:
+        fake.release.set()
+        thread.join(10)
+    assert len(out["results"]) == 40
+    assert all(result["success"] for result in out["results"])
+    assert sorted(fake.applied) == list(range(1, 41))
+
+
+def test_without_prefetch_workers_fetch_themselves(price_review_crawler):
+    fake = FakeReviews(10)
+    thread, out = _run(_crawler(price_review_crawler, fake), max_workers=3, prefetch=0)
+    try:
+        fetched, applying = _settle(fake, 3, 3)
+        assert (fetched, applying) == (3, 3)
+    finally:
+        fake.release.set()
+        thread.join(10)
+    assert len(out["results"]) == 10
+
+
+def test_stop_leaves_remaining_items_pending(price_review_crawler, job_journal):
+    fake = FakeReviews(30)
+    stopped = threading.Event()
+    thread, out = _run(_crawler(price_review_crawler, fake, stop=stopped.is_set), max_workers=2, prefetch=3)
+    _settle(fake, 5, 2)
+    stopped.set()
+    fake.release.set()
+    thread.join(10)
+    assert not thread.is_alive()
+
+    resumed = job_journal.open("price_review", {"use_rebargain": True, "max_review_rounds": 5})
+    assert resumed.resumed
+    counts = resumed.counts()
+    # 停止时正在执行的两个商品完成并记录，其余已获取的商品保持未处理状态，列表也没有获取完
+    assert counts["applied"] == len(fake.applied) == 2
+    assert counts["failed"] == 0
+    assert not resumed.fetch_complete
+
+
+def test_resume_processes_the_live_list(price_review_crawler, job_journal):
+    fake = FakeReviews(10)
+    stopped = threading.Event()
+    crawler = _crawler(price_review_crawler, fake, stop=stopped.is_set)
+    thread, _ = _run(crawler, max_workers=2, prefetch=10)
+    _settle(fake, 10, 2)
+    stopped.set()
+    fake.release.set()
+    thread.join(10)
+    done = list(fake.applied)
+    assert len(done) == 2
+    # 上次已经获取完整个列表，日志中有剩余商品的旧数据
+    assert job_journal.open("price_review", {"use_rebargain": True, "max_review_rounds": 5}).fetch_complete
+
+    # 继续前列表变化：第10个商品已经不需要核价，新增第11个商品，已完成的商品仍在列表中
+    resumed = FakeReviews(0)
+    resumed.products = [{"productId": i} for i in range(1, 10)] + [{"productId": 11}]
+    resumed.release.set()
+    stopped.clear()
+    thread, out = _run(_crawler(crawler, resumed), max_workers=2, prefetch=3, resume=True)
+    thread.join(10)
+    assert sorted(resumed.applied) == sorted(set(range(1, 10)) - set(done) | {11})
+    assert len(out["results"]) == 8
@@ -0,0 +1,94 @@
+"""
+测试令牌桶限流：突发容量、排队等待时间、令牌补充，以及按域名和接口路径的限速规则（不访问网络）
+"""
+import pytest
+
+from src.modules.network import rate_limiter as rate_limiter_module
+from src.modules.network.rate_limiter import RateLimiter, TokenBucket
+
+HOST = "https://agentseller.temu.com"
+
+
+def _elapse(bucket, seconds):
+    """模拟距离上次补充令牌已经过去了seconds秒"""
+    bucket._updated -= seconds
+
+
+def test_burst_is_available_immediately():
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+
+def test_requests_queue_behind_each_other():
+    bucket = TokenBucket(rate=2, burst=1)
+    assert bucket.reserve() == 0
+    # 令牌透支，后来的请求依次排在后面
+    waits = [bucket.reserve() for _ in range(3)]
+    assert waits == pytest.approx([0.5, 1.0, 1.5], abs=0.01)
+
+
+def test_tokens_refill_at_rate():
+    bucket = TokenBucket(rate=2, burst=5)
+    for _ in range(5):
+        bucket.reserve()
+    _elapse(bucket, 1.0)
+    assert [bucket.reserve() for _ in range(2)] == [0, 0]
+    assert bucket.reserve() == pytest.approx(0.5, abs=0.01)
+
+
+def test_refill_is_capped_at_burst():
+    bucket = TokenBucket(rate=10, burst=2)
+    _elapse(bucket, 3600)
+    assert [bucket.reserve() for _ in range(2)] == [0, 0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_burst_is_at_least_one():
+    assert TokenBucket(rate=1, burst=0).capacity == 1
+
+
+def test_disabled(rate_limiter):
+    rate_limiter.reload({"enabled": False, "default_qps": 1, "default_burst": 1})
+    assert [rate_limiter.reserve(HOST + "/a") for _ in range(5)] == [0, 0, 0, 0, 0]
+
+
+def test_hosts_have_separate_buckets(rate_limiter):
+    rate_limiter.reload({"default_qps": 1, "default_burst": 1})
+    assert rate_limiter.reserve(HOST + "/a") == 0
+    assert rate_limiter.reserve("https://other.example.com/a") == 0
+    assert rate_limiter.reserve(HOST + "/b") == pytest.approx(1.0, abs=0.01)
+
+
+def test_host_override(rate_limiter):
+    rate_limiter.reload({"default_qps": 1, "default_burst": 1,
+                    "hosts": {"agentseller.temu.com": {"qps": 10, "burst": 2}}})
+    waits = [rate_limiter.reserve(HOST + "/a") for _ in range(3)]
+    assert waits == pytest.approx([0, 0, 0.1], abs=0.01)
+
+
+def test_endpoint_rule_applies_on_top_of_host(rate_limiter):
+    rate_limiter.reload({"default_qps": 100, "default_burst": 100,
+                    "endpoints": {"/slow": {"qps": 1, "burst": 1}}})
+    assert rate_limiter.reserve(HOST + "/slow") == 0
+    assert rate_limiter.reserve(HOST + "/slow") == pytest.approx(1.0, abs=0.01)
+    # 其他接口只受域名限速
+    assert rate_limiter.reserve(HOST + "/fast") == 0
+
+
+def test_jitter_is_added(rate_limiter, monkeypatch):
+    monkeypatch.setattr(rate_limiter_module.random, "uniform", lambda low, high: high)
+    rate_limiter.reload({"default_qps": 100, "default_burst": 100, "jitter_min": 0.1, "jitter_max": 0.3})
+    assert rate_limiter.reserve(HOST + "/a") == pytest.approx(0.3)
+
+
+def test_reload_resets_buckets(rate_limiter):
+    rate_limiter.reload({"default_qps": 1, "default_burst": 1})
+    rate_limiter.reserve(HOST + "/a")
+    assert rate_limiter.reserve(HOST + "/a") > 0
+    rate_limiter.reload({"default_qps": 1, "default_burst": 1})
+    assert rate_limiter.reserve(HOST + "/a") == 0
+
+
+def test_private_limiter_is_not_shared(rate_limiter):
+    assert rate_limiter is not RateLimiter()
+    assert RateLimiter() is RateLimiter()
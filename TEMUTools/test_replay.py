@@ -0,0 +1,135 @@
+"""
+测试流量录制/回放：录制文件的读写、请求体规范化、按请求完全匹配并轮流返回、fallback、404和错误注入
+（桩服务只在本机回环地址上运行，不访问网络）
+"""
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.modules.network.replay import TrafficArchive, _canonical_body
+
+HOST = "https://agentseller.temu.com"
+
+
+def _record(tmp_path, calls):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    archive = TrafficArchive(path)
+    for call in calls:
+        archive.append(*call)
+    archive.close()
+    return path
+
+
+@pytest.fixture
+def recorded(tmp_path, replay_server):
+    """用录制的请求创建桩服务：recorded(calls, **config)"""
+    return lambda calls, **config: replay_server(TrafficArchive.load(_record(tmp_path, calls)), **config)
+
+
+def _lookup(server, method, path, body=None, query=""):
+    return server.lookup(method, path, query, _canonical_body(body))
+
+
+@pytest.mark.parametrize("body, expected", [
+    (None, ""),
+    (b"", ""),
+    ({"b": 1, "a": "中"}, '{"a":"中","b":1}'),
+    ('{"b": 1, "a": 2}', '{"a":2,"b":1}'),
+    (b'{"b": 1, "a": 2}', '{"a":2,"b":1}'),
+    ("not json", "not json"),
+])
+def test_canonical_body(body, expected):
+    assert _canonical_body(body) == expected
+
+
+def test_archive_round_trip(tmp_path):
+    path = _record(tmp_path, [
+        ("post", HOST + "/api/list?b=2", {"a": 1}, {"page": 1}, 200, '{"ok":1}'.encode("utf-8"), "application/json"),
+        ("GET", HOST + "/img", None, None, 200, b"\xff\xd8", "image/jpeg"),
+    ])
+    entries = TrafficArchive.load(path)
+    assert [entry["method"] for entry in entries] == ["POST", "GET"]
+    assert entries[0]["path"] == "/api/list" and entries[0]["query"] == "a=1&b=2"
+    assert entries[0]["body"] == '{"page":1}' and entries[0]["response"] == '{"ok":1}'
+    # 非UTF-8响应按base64保存
+    assert entries[1]["encoding"] == "base64"
+
+
+def test_archive_append_after_reopen(tmp_path):
+    path = _record(tmp_path, [("GET", HOST + "/a", None, None, 200, b"1")])
+    archive = TrafficArchive(path)
+    archive.append("GET", HOST + "/b", None, None, 200, b"2")
+    archive.close()
+    assert [entry["path"] for entry in TrafficArchive.load(path)] == ["/a", "/b"]
+
+
+def test_archive_load_ignores_truncated_tail(tmp_path):
+    path = _record(tmp_path, [("GET", HOST + "/a", None, None, 200, b"1")] * 2)
+    # 程序被中断时最后一次打开写入的gzip成员没有写完
+    archive = TrafficArchive(path)
+    archive.append("GET", HOST + "/b", None, None, 200, b"2")
+    archive.close()
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-10])
+    assert [entry["path"] for entry in TrafficArchive.load(path)] == ["/a", "/a"]
+
+
+def test_exact_match_ignores_body_key_order(recorded):
+    server = recorded([("POST", HOST + "/api", None, {"a": 1, "b": 2}, 200, b"ab")])
+    assert _lookup(server, "POST", "/api", {"b": 2, "a": 1}) == (200, b"ab", None)
+    assert server.stats["exact"] == 1
+
+
+def test_repeated_requests_rotate_through_recordings(recorded):
+    server = recorded([
+        ("POST", HOST + "/api", None, {"page": 1}, 200, b"first"),
+        ("POST", HOST + "/api", None, {"page": 1}, 200, b"second"),
+    ])
+    contents = [_lookup(server, "POST", "/api", {"page": 1})[1] for _ in range(3)]
+    assert contents == [b"first", b"second", b"first"]
+
+
+def test_fallback_to_last_response_of_path(recorded):
+    calls = [
+        ("POST", HOST + "/api", None, {"page": 1}, 200, b"page1"),
+        ("POST", HOST + "/api", None, {"page": 2}, 200, b"page2"),
+    ]
+    server = recorded(calls)
+    assert _lookup(server, "POST", "/api", {"page": 9})[1] == b"page2"
+    assert server.stats["fallback"] == 1
+
+    server = recorded(calls, fallback=False)
+    assert _lookup(server, "POST", "/api", {"page": 9})[0] == 404
+    assert server.stats["missing"] == 1
+
+
+def test_unknown_path_returns_404(recorded):
+    server = recorded([("POST", HOST + "/api", None, {}, 200, b"ok")])
+    status, content, _ = _lookup(server, "GET", "/api")
+    assert status == 404
+    assert json.loads(content)["success"] is False
+    assert server.stats["missing"] == 1
+
+
+def test_error_injection(recorded):
+    server = recorded([("POST", HOST + "/api", None, {}, 200, b"ok")],
+                      error_rate=1.0, error_statuses=[502])
+    assert _lookup(server, "POST", "/api", {}) == (502, b"", None)
+    assert server.stats == {"exact": 0, "fallback": 0, "missing": 0, "injected": 1}
+
+
+def test_server_serves_recorded_response(tmp_path, replay_server):
+    path = _record(tmp_path, [("POST", HOST + "/api?x=1", None, {"a": 1}, 201, b'{"ok":true}', "application/json")])
+    stub = replay_server(TrafficArchive.load(path), start=True)
+    request = urllib.request.Request(stub.base_url + "/api?x=1", data=b'{"a": 1}', method="POST")
+    with urllib.request.urlopen(request, timeout=5) as response:
+        assert response.status == 201
+        assert response.read() == b'{"ok":true}'
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(stub.base_url + "/missing", timeout=5)
+    assert error.value.code == 404
+    error.value.close()
@@ -0,0 +1,71 @@
+"""
+测试请求日志：记录写入指定目录的JSONL文件、所属任务、失败时记录请求内容和截断、队列积压时丢弃并统计条数（不访问网络）
+"""
+import glob
+import json
+import os
+import threading
+
+from src.modules.network.request_log import RequestLog
+
+
+def _entries(request_log):
+    request_log.flush()
+    lines = []
+    for path in glob.glob(os.path.join(request_log.log_dir, "requests_*.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            lines.extend(json.loads(line) for line in f)
+    return lines
+
+
+def _submit(request_log, status=200, job=None, **payloads):
+    record = request_log.new_record("POST", "https://agentseller.temu.com/api/list?page=1", job)
+    record.status = status
+    record.attempts = 2
+    record.latency = 0.25
+    request_log.submit(record, **payloads)
+
+
+def test_writes_record_to_log_dir(request_log):
+    _submit(request_log, job="job-1", request_payload={"page": 1})
+    [entry] = _entries(request_log)
+    assert entry["endpoint"] == "/api/list" and entry["host"] == "agentseller.temu.com"
+    assert (entry["status"], entry["retries"], entry["latency_ms"], entry["job"]) == (200, 1, 250.0, "job-1")
+    # 成功且未被采样的请求不记录请求内容
+    assert "request" not in entry
+
+
+def test_failed_request_records_truncated_payload(request_log):
+    request_log.reload({"max_payload_chars": 5})
+    _submit(request_log, status=500, request_payload={"page": 1}, response_payload="服务器内部错误啊")
+    [entry] = _entries(request_log)
+    assert entry["request"] == '{"pag...(truncated)'
+    assert entry["response"] == "服务器内部...(truncated)"
+
+
+def test_disabled_log_writes_nothing(request_log):
+    request_log.reload({"enabled": False})
+    _submit(request_log)
+    request_log.flush()
+    assert not os.path.exists(request_log.log_dir)
+
+
+def test_dropped_records_are_counted_across_threads(request_log, monkeypatch):
+    # 模拟队列已满：所有记录都被丢弃，多个线程同时丢弃时计数不能丢失
+    monkeypatch.setattr(request_log._queue, "qsize", lambda: request_log.max_queue)
+    threads = [threading.Thread(target=lambda: [_submit(request_log) for _ in range(500)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert request_log._dropped == 4000
+
+    monkeypatch.undo()
+    _submit(request_log)
+    entries = _entries(request_log)
+    assert [entry["dropped"] for entry in entries if "dropped" in entry] == [4000]
+    assert request_log._dropped == 0
+
+
+def test_private_log_is_not_shared(request_log, tmp_path):
+    assert RequestLog(log_dir=str(tmp_path / "other")) is not request_log
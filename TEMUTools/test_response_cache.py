@@ -0,0 +1,201 @@
+"""
+测试响应缓存：按接口配置TTL、缓存key的组成、过期与304续期、按条数和总大小的LRU淘汰，
+以及协程版本的读写不在事件循环线程中执行（不访问网络）
+"""
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from src.modules.network import response_cache as response_cache_module
+from src.modules.network.response_cache import ResponseCache
+
+HOST = "https://agentseller.temu.com"
+URL = HOST + "/api/enum"
+
+CONFIG = {"enabled": True, "max_entries": 3, "max_bytes": 1000,
+          "endpoints": {"/api/enum": {"ttl": 60}, "/api/zero": {"ttl": 0}}}
+
+
+class Clock:
+    """可手动拨动的时钟，避免用例依赖真实时间"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(response_cache, clock):
+    response_cache.reload(dict(CONFIG))
+    return response_cache
+
+
+def _store(cache, clock, key, content=b"x", ttl=60):
+    clock.now += 1
+    cache.store(key, URL, content, ttl)
+
+
+@pytest.mark.parametrize("url, expected", [
+    (URL, 60.0),
+    (URL + "?page=2", 60.0),
+    (HOST + "/api/zero", None),
+    (HOST + "/api/other", None),
+])
+def test_ttl_for(cache, url, expected):
+    assert cache.ttl_for(url) == expected
+
+
+def test_disabled_cache_has_no_ttl(cache):
+    cache.reload(dict(CONFIG, enabled=False))
+    assert cache.ttl_for(URL) is None
+
+
+def test_make_key_ignores_dict_order():
+    first = ResponseCache.make_key("POST", URL, None, {"a": 1, "b": [1, 2]}, "mall-1")
+    second = ResponseCache.make_key("POST", URL, None, {"b": [1, 2], "a": 1}, "mall-1")
+    assert first == second
+
+
+@pytest.mark.parametrize("changed", [
+    ("GET", URL, None, {"a": 1}, "mall-1"),
+    ("POST", HOST + "/api/other", None, {"a": 1}, "mall-1"),
+    ("POST", URL, {"a": 1}, None, "mall-1"),
+    ("POST", URL, None, {"a": 2}, "mall-1"),
+    ("POST", URL, None, {"a": 1}, "mall-2"),
+])
+def test_make_key_differs(changed):
+    assert ResponseCache.make_key(*changed) != ResponseCache.make_key("POST", URL, None, {"a": 1}, "mall-1")
+
+
+def test_store_and_lookup(cache, clock):
+    cache.store("k", URL, "枚举".encode("utf-8"), 60, etag="v1", fetch_seconds=0.5)
+    entry = cache.lookup("k")
+    assert entry.content == "枚举".encode("utf-8")
+    assert entry.etag == "v1" and entry.fetch_seconds == 0.5
+    assert entry.fresh
+    assert cache.lookup("missing") is None
+
+
+def test_expired_entry_is_returned_for_revalidation(cache, clock):
+    cache.store("k", URL, b"x", 60, etag="v1")
+    clock.now += 61
+    entry = cache.lookup("k")
+    assert entry is not None and not entry.fresh
+    assert entry.etag == "v1"
+
+
+def test_touch_extends_expiry(cache, clock):
+    cache.store("k", URL, b"x", 60)
+    clock.now += 61
+    cache.touch("k", 60)
+    assert cache.lookup("k").fresh
+    clock.now += 61
+    assert not cache.lookup("k").fresh
+
+
+def test_evicts_least_recently_used_by_count(cache, clock):
+    for key in ("a", "b", "c"):
+        _store(cache, clock, key)
+    # 访问a后，最近最少使用的是b
+    clock.now += 1
+    cache.lookup("a")
+    _store(cache, clock, "d")
+    assert cache.lookup("b") is None
+    assert all(cache.lookup(key) is not None for key in ("a", "c", "d"))
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_evicts_by_total_size(cache, clock):
+    _store(cache, clock, "a", b"x" * 400)
+    _store(cache, clock, "b", b"x" * 400)
+    _store(cache, clock, "c", b"x" * 400)
+    assert cache.lookup("a") is None
+    assert cache.lookup("b") is not None and cache.lookup("c") is not None
+
+
+def test_evicts_many_entries_at_once(cache, clock):
+    cache.reload(dict(CONFIG, max_entries=100))
+    for i in range(40):
+        _store(cache, clock, str(i))
+    cache.reload(dict(CONFIG, max_entries=5))
+    _store(cache, clock, "new")
+    assert [key for key in map(str, range(40)) if cache.lookup(key) is not None] == ["36", "37", "38", "39"]
+    assert cache.get_stats()["evictions"] == 36
+
+
+def test_eviction_reads_only_the_lru_index(cache):
+    conn = sqlite3.connect(cache.db_path)
+    try:
+        plans = [" ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+                 for sql in ("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses",
+                             "SELECT rowid, size FROM responses ORDER BY last_access LIMIT 16")]
+    finally:
+        conn.close()
+    assert all("COVERING INDEX idx_responses_lru" in plan for plan in plans)
+
+
+def test_async_methods_run_off_the_event_loop(cache, monkeypatch):
+    threads = []
+
+    def recording(method):
+        def run(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return method(*args, **kwargs)
+        return run
+
+    for name in ("lookup", "store", "touch"):
+        monkeypatch.setattr(cache, name, recording(getattr(cache, name)))
+
+    async def run():
+        await cache.astore("k", URL, b"x", 60, etag="v1")
+        await cache.atouch("k", 60)
+        return threading.get_ident(), await cache.alookup("k")
+
+    loop_thread, entry = asyncio.run(run())
+    assert entry.etag == "v1"
+    assert len(threads) == 3 and loop_thread not in threads
+
+
+def test_slow_store_does_not_block_other_requests(cache, monkeypatch):
+    released = threading.Event()
+    monkeypatch.setattr(cache, "store", lambda *args, **kwargs: released.wait(5))
+
+    async def run():
+        store = asyncio.ensure_future(cache.astore("k", URL, b"x", 60))
+        # 写入还在等待时，事件循环上的其他协程照常运行
+        await asyncio.sleep(0.01)
+        blocked = not store.done()
+        released.set()
+        await store
+        return blocked
+
+    assert asyncio.run(run())
+
+
+def test_stats(cache, clock):
+    cache.store("k", URL, b"x", 60)
+    cache.record("hit", 0.5)
+    cache.record("hit", 0.25)
+    cache.record("miss")
+    stats = cache.get_stats()
+    assert (stats["stores"], stats["hit"], stats["miss"]) == (1, 2, 1)
+    assert stats["saved_seconds"] == pytest.approx(0.75)
+    cache.reset_stats()
+    assert cache.get_stats()["hit"] == 0
+
+
+def test_clear(cache, clock):
+    cache.store("k", URL, b"x", 60)
+    cache.clear()
+    assert cache.lookup("k") is None
@@ -0,0 +1,115 @@
+"""
+测试请求重试策略：哪些接口可以重试、退避和截止时间（不访问网络）
+"""
+import json
+import os
+
+import pytest
+
+from src.modules.network import retry as retry_module
+from src.modules.network.engine import ConnectError, HttpResponse, HttpStatusError, RequestError
+from src.modules.network.retry import DEFAULT_RETRY_CONFIG
+
+BASE = "https://agentseller.temu.com"
+SYSTEM_CONFIG = os.path.join(os.path.dirname(__file__), "src", "config", "system_config.json")
+
+# 只读的POST查询接口：请求可能已经到达服务器后也可以安全重试
+READ_ENDPOINTS = [
+    "/visage-agent-seller/product/skc/pageQuery",
+    "/api/kiana/mms/robin/searchForChainSupplier",
+    "/api/kiana/mms/robin/querySupplierQuickFilterCount",
+    "/api/kiana/mms/magneto/api/price-review-order/no-bom/reject-remark",
+    "/api/kiana/zoro/PriceComparingOrderSupplierRpcService/searchForSupplier",
+    "/api/kiana/zoro/PriceComparingOrderSupplierRpcService/queryPriceComparingOrderDetail",
+]
+
+# 改库存、核价、竞价等写接口：重复发送会重复执行
+WRITE_ENDPOINTS = [
+    "/darwin-mms/api/kiana/foredawn/sales/stock/updateMmsSkuSalesStock",
+    "/api/kiana/mms/magneto/price/bargain-no-bom",
+    "/api/kiana/mms/magneto/api/price-review-order/no-bom/review",
+    "/api/kiana/zoro/PriceComparingOrderSupplierRpcService/confirmInvitation",
+    "/api/kiana/mms/gmp/bg/magneto/api/price/priceAdjust/gmpProductBatchAdjustPrice",
+]
+
+
+def _status_error(status, headers=None):
+    return HttpStatusError(HttpResponse(status, b"", headers or {}, BASE))
+
+
+@pytest.fixture
+def policy(retry_policy, monkeypatch):
+    # 退避时间取上限，结果可预测
+    monkeypatch.setattr(retry_module.random, "uniform", lambda low, high: high)
+    return retry_policy
+
+
+@pytest.fixture
+def shipped(policy):
+    with open(SYSTEM_CONFIG, encoding="utf-8") as f:
+        policy.reload(json.load(f)["retry"])
+    return policy
+
+
+@pytest.mark.parametrize("path", READ_ENDPOINTS)
+def test_read_post_endpoints_are_idempotent(shipped, path):
+    assert shipped.is_idempotent("POST", BASE + path)
+    assert shipped.next_delay("POST", BASE + path, RequestError("timeout"), 1, 0) is not None
+    assert shipped.next_delay("POST", BASE + path, _status_error(503), 1, 0) is not None
+
+
+@pytest.mark.parametrize("path", WRITE_ENDPOINTS)
+def test_write_endpoints_are_not_retried_after_sending(shipped, path):
+    assert not shipped.is_idempotent("POST", BASE + path)
+    assert shipped.next_delay("POST", BASE + path, RequestError("timeout"), 1, 0) is None
+    assert shipped.next_delay("POST", BASE + path, _status_error(503), 1, 0) is None
+    # 连接没有建立，请求一定没有发出，写接口也可以重试
+    assert shipped.next_delay("POST", BASE + path, ConnectError("refused"), 1, 0) is not None
+
+
+@pytest.mark.parametrize("method, expected", [("GET", True), ("PUT", True), ("DELETE", True), ("POST", False)])
+def test_methods_default_idempotency(policy, method, expected):
+    policy.reload({})
+    assert policy.is_idempotent(method, BASE + "/unknown") is expected
+
+
+def test_non_retryable_status(policy):
+    policy.reload({})
+    assert policy.next_delay("GET", BASE + "/x", _status_error(403), 1, 0) is None
+    assert policy.next_delay("GET", BASE + "/x", _status_error(404), 1, 0) is None
+    assert policy.next_delay("GET", BASE + "/x", _status_error(502), 1, 0) is not None
+
+
+def test_exponential_backoff_is_capped(policy):
+    policy.reload({"base_delay": 0.5, "max_delay": 3.0})
+    assert [policy.backoff(n) for n in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_max_attempts(policy):
+    policy.reload({"max_attempts": 3, "endpoints": {"/slow": {"max_attempts": 5}}})
+    assert policy.next_delay("GET", BASE + "/x", RequestError("timeout"), 2, 0) is not None
+    assert policy.next_delay("GET", BASE + "/x", RequestError("timeout"), 3, 0) is None
+    assert policy.next_delay("GET", BASE + "/slow", RequestError("timeout"), 4, 0) is not None
+
+
+def test_deadline_stops_retrying(policy):
+    policy.reload({"base_delay": 1.0, "deadline_seconds": 10.0})
+    assert policy.next_delay("GET", BASE + "/x", RequestError("timeout"), 1, 8.0) == 1.0
+    assert policy.next_delay("GET", BASE + "/x", RequestError("timeout"), 1, 9.5) is None
+    # 调用方传入的截止时间优先
+    assert policy.next_delay("GET", BASE + "/x", RequestError("timeout"), 1, 8.0, deadline=5.0) is None
+
+
+def test_retry_after_header(policy):
+    policy.reload({"base_delay": 0.5})
+    error = _status_error(429, {"retry-after": "4"})
+    assert policy.next_delay("GET", BASE + "/x", error, 1, 0) == 4.0
+
+
+def test_disabled(policy):
+    policy.reload({"enabled": False})
+    assert policy.next_delay("GET", BASE + "/x", ConnectError("refused"), 1, 0) is None
+
+
+def test_defaults_do_not_mark_any_post_idempotent():
+    assert "POST" not in DEFAULT_RETRY_CONFIG["idempotent_methods"]
@@ -1,7 +1,9 @@
 import requests
 import os
 import json
+import time
 from typing import Dict, Optional, Any
+from urllib.parse import urlparse
 
 
 class NetworkRequest:
@@ -11,6 +13,13 @@ class NetworkRequest:
     def __init__(self):
         self.session = requests.Session()
 
+    @staticmethod
+    def _log_request(method: str, url: str, response: Optional[requests.Response], start: float):
+        """每个请求只打印一行摘要（接口、状态码、耗时、字节数），不打印请求头（含cookie）和完整请求体"""
+        status = response.status_code if response is not None else "-"
+        size = len(response.content) if response is not None else 0
+        print(f"{method} {urlparse(url).path} -> {status} {(time.monotonic() - start) * 1000:.0f}ms {size}B")
+
     def _get_headers(self, cookie=None, mallid=None, origin=None) -> Dict[str, str]:
         return {
             "accept": "*/*",
@@ -35,12 +44,9 @@ class NetworkRequest:
     def get(self, url: str, params: Optional[Dict] = None, cookie: Optional[str] = None, mallid: Optional[str] = None, origin: Optional[str] = None) -> Optional[Dict]:
         try:
             headers = self._get_headers(cookie, mallid, origin)
-            
-            print(f"请求头: {headers}")
-            print(f"发送GET请求到: {url}")
-            print(f"请求参数: {params}")
-
+            start = time.monotonic()
             response = self.session.get(url, params=params, headers=headers)
+            self._log_request("GET", url, response, start)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -50,37 +56,19 @@ class NetworkRequest:
     def post(self, url: str, data: Dict[str, Any], cookie: Optional[str] = None, mallid: Optional[str] = None, origin: Optional[str] = None) -> Optional[Dict]:
         try:
             headers = self._get_headers(cookie, mallid, origin)
-            
-            # 调试信息（简化版）
-            print(f"请求头: {headers}")
-            print(f"发送POST请求到: {url}")
-            print(f"请求数据: {json.dumps(data, ensure_ascii=False, indent=2)}")
-            
+            start = time.monotonic()
             response = self.session.post(url, json=data, headers=headers)
+            self._log_request("POST", url, response, start)
             
-            # 详细的错误处理
+            # 出错时只打印响应开头，便于排查
             if response.status_code != 200:
-                print(f"HTTP错误: {response.status_code}")
-                print(f"响应内容: {response.text[:500]}...")
-                
-                # 尝试解析错误响应
-                try:
-                    error_data = response.json()
-                    print(f"错误详情: {json.dumps(error_data, ensure_ascii=False, indent=2)}")
-                except:
-                    print(f"无法解析错误响应为JSON")
-                
+                print(f"HTTP错误: {response.status_code}, 响应内容: {response.text[:500]}")
                 response.raise_for_status()
             
-            result = response.json()
-            print(f"请求成功")
-            return result
+            return response.json()
             
         except requests.exceptions.HTTPError as e:
             print(f"HTTP错误: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"状态码: {e.response.status_code}")
-                print(f"响应内容: {e.response.text[:500]}...")
             return None
         except requests.exceptions.RequestException as e:
             print(f"网络请求异常: {e}")